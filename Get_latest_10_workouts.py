@@ -2,7 +2,12 @@
 """
 Download the last 10 workouts from Garmin Connect and save them as .FIT files.
 
+The workouts are stored in the compressed archive in workouts/archive (see
+fit_archive.py); pass --keep-files to also save loose .FIT files in workouts/.
+
 Usage:
+    python Get_latest_10_workouts.py [--keep-files]
+
     Set your Garmin Connect credentials as environment variables:
     EMAIL=<your garmin email>
     PASSWORD=<your garmin password>
@@ -14,11 +19,10 @@ Usage:
     Or enter them when prompted.
 """
 
+import argparse
 import os
 import sys
 import logging
-import zipfile
-import io
 from datetime import datetime
 from getpass import getpass
 
@@ -28,6 +32,8 @@ from garminconnect import (
     GarminConnectConnectionError,
     GarminConnectTooManyRequestsError,
 )
+from fit_archive import FitArchive
+from fit_downloads import download_activities
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -84,62 +90,36 @@ def init_api(email, password):
         logger.error("Unknown error: %s", err)
         sys.exit(1)
 
-def extract_fit_from_zip(zip_data, output_path):
-    """Extract the FIT file from a ZIP archive."""
-    try:
-        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
-            # Find the .fit file in the ZIP
-            fit_files = [f for f in zip_file.namelist() if f.lower().endswith('.fit')]
-            if not fit_files:
-                logger.error("No FIT file found in the ZIP archive")
-                return False
-            
-            # Extract the first FIT file
-            fit_file = fit_files[0]
-            with zip_file.open(fit_file) as source, open(output_path, 'wb') as target:
-                target.write(source.read())
-            return True
-    except Exception as e:
-        logger.error(f"Error extracting FIT file from ZIP: {e}")
-        return False
-
-def download_workouts(api, limit=10):
-    """Download the last N workouts and save them as .FIT files."""
+def download_workouts(api, limit=10, output_dir="workouts", workers=4, archive=None, keep_files=False):
+    """
+    Download the last N workouts, 'workers' at a time, into 'archive' (a
+    FitArchive) when given, and as .FIT files in output_dir without one or
+    with 'keep_files'.
+    """
     try:
         # Get the last N activities
         activities = api.get_activities(0, limit)
         
         # Create a directory for the workouts if it doesn't exist
-        output_dir = "workouts"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
         
-        # Download each activity
+        # Name each file after the activity's start time and type
+        loose = archive is None or keep_files
+        jobs = []
         for activity in activities:
-            activity_id = activity["activityId"]
             activity_type = activity["activityType"]["typeKey"]
             start_time = datetime.fromisoformat(activity["startTimeLocal"].replace("Z", "+00:00"))
-            filename = f"{output_dir}/{start_time.strftime('%Y%m%d_%H%M%S')}_{activity_type}.fit"
-            
-            logger.info(f"Downloading activity {activity_id} to {filename}")
-            
-            # Download the activity data (which might be a ZIP file containing the FIT file)
-            activity_data = api.download_activity(activity_id, dl_fmt=api.ActivityDownloadFormat.ORIGINAL)
-            
-            # Check if the data is a ZIP file (common for Garmin Connect downloads)
-            if activity_data.startswith(b'PK\x03\x04'):  # ZIP file signature
-                logger.info(f"Activity data is a ZIP file, extracting FIT file...")
-                if extract_fit_from_zip(activity_data, filename):
-                    logger.info(f"Successfully extracted and saved {filename}")
-                else:
-                    logger.error(f"Failed to extract FIT file from ZIP for activity {activity_id}")
-            else:
-                # If it's not a ZIP, assume it's a FIT file and save it directly
-                with open(filename, "wb") as fit_file:
-                    fit_file.write(activity_data)
-                logger.info(f"Successfully saved {filename}")
+            filename = f"{output_dir}/{start_time.strftime('%Y%m%d_%H%M%S')}_{activity_type}.fit" if loose else None
+            jobs.append((activity["activityId"], filename, activity_type, activity["startTimeLocal"]))
+        
+        # Download the activities concurrently, skipping existing copies
+        report = download_activities(api, jobs, workers=workers, archive=archive)
         
-        logger.info(f"Downloaded {len(activities)} workouts to the '{output_dir}' directory")
+        destination = f"the '{output_dir}' directory" if loose else f"the archive in '{archive.root}'"
+        logger.info(
+            f"Downloaded {report['downloaded']} workouts to {destination} "
+            f"({report['skipped']} already present, {report['failed']} failed)"
+        )
         
     except Exception as err:
         logger.error("Error downloading workouts: %s", err)
@@ -147,14 +127,19 @@ def download_workouts(api, limit=10):
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keep-files", action="store_true", help="also save loose .FIT files in workouts/")
+    args = parser.parse_args()
+    
     # Get credentials
     email, password = get_credentials()
     
     # Initialize API
     api = init_api(email, password)
     
-    # Download workouts
-    download_workouts(api)
+    # Download workouts into the compressed archive
+    with FitArchive(os.path.join("workouts", "archive")) as archive:
+        download_workouts(api, archive=archive, keep_files=args.keep_files)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
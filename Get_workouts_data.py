@@ -3,7 +3,12 @@
 Download workouts from Garmin Connect and save them as .FIT files.
 Allows selecting specific workout types (Run, Cycling, Swim) and customizing the number of workouts to download.
 
+The workouts are stored in the compressed archive in workouts/archive (see
+fit_archive.py); pass --keep-files to also save loose .FIT files in workouts/.
+
 Usage:
+    python Get_workouts_data.py [--keep-files]
+
     Set your Garmin Connect credentials as environment variables:
     EMAIL=<your garmin email>
     PASSWORD=<your garmin password>
@@ -15,13 +20,12 @@ Usage:
     Or enter them when prompted.
 """
 
+import argparse
 import os
 import sys
 import logging
-import zipfile
-import io
-from datetime import datetime
 from getpass import getpass
+from itertools import islice
 
 from garminconnect import (
     Garmin,
@@ -29,6 +33,8 @@ from garminconnect import (
     GarminConnectConnectionError,
     GarminConnectTooManyRequestsError,
 )
+from fit_archive import FitArchive
+from fit_downloads import download_activities
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -133,26 +139,7 @@ def init_api(email, password):
         logger.error("Unknown error: %s", err)
         raise
 
-def extract_fit_from_zip(zip_data, output_path):
-    """Extract the FIT file from a ZIP archive."""
-    try:
-        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
-            # Find the .fit file in the ZIP
-            fit_files = [f for f in zip_file.namelist() if f.lower().endswith('.fit')]
-            if not fit_files:
-                logger.error("No FIT file found in the ZIP archive")
-                return False
-            
-            # Extract the first FIT file
-            fit_file = fit_files[0]
-            with zip_file.open(fit_file) as source, open(output_path, 'wb') as target:
-                target.write(source.read())
-            return True
-    except Exception as e:
-        logger.error(f"Error extracting FIT file from ZIP: {e}")
-        return False
-
-def download_workouts(api, workout_type, workout_count):
+def download_workouts(api, workout_type, workout_count, output_dir="workouts", workers=4, archive=None, keep_files=False):
     """
     Download the specified number of workouts of a given type and save them as .FIT files.
     
@@ -160,65 +147,50 @@ def download_workouts(api, workout_type, workout_count):
         api: Garmin Connect API client
         workout_type (str): Type of workout to download (running, cycling, swimming)
         workout_count (int): Number of workouts to download
+        output_dir (str): Directory the .FIT files are saved in
+        workers (int): Maximum number of concurrent downloads
+        archive (FitArchive): (Optional) Store the downloaded workouts in this
+            archive instead of as .FIT files in output_dir
+        keep_files (bool): Also save .FIT files in output_dir with an archive
         
     Returns:
-        int: Number of workouts successfully downloaded
+        int: Number of workouts downloaded or already present
     """
     try:
-        # Get activities with a buffer (3x requested count) to ensure we find enough of the right type
-        buffer_count = workout_count * 3
-        activities = api.get_activities(0, buffer_count)
-        
-        # Filter activities by type
-        filtered_activities = [
-            activity for activity in activities 
-            if activity["activityType"]["typeKey"].lower() == workout_type
-        ]
-
-        if not filtered_activities:
-            logger.error(f"No {workout_type} activities found in the last {buffer_count} activities")
+        # Let the server filter by type and page only until enough are found;
+        # the exact typeKey check drops subtypes the server groups with it
+        activities_to_download = list(islice(
+            api.iter_activities(
+                page_size=workout_count,
+                activitytype=workout_type,
+                predicate=lambda activity: activity["activityType"]["typeKey"].lower() == workout_type,
+            ),
+            workout_count,
+        ))
+
+        if not activities_to_download:
+            logger.error(f"No {workout_type} activities found")
             return 0
-
-        # Take only the requested number of activities
-        activities_to_download = filtered_activities[:workout_count]
         
         # Create a directory for the workouts if it doesn't exist
-        output_dir = "workouts"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
         
-        # Download each activity
-        downloaded_count = 0
-        for activity in activities_to_download:
-            activity_id = activity["activityId"]
-            start_time = datetime.fromisoformat(activity["startTimeLocal"].replace("Z", "+00:00"))
-            filename = f"{output_dir}/{workout_type}_{activity_id}.fit"
-            
-            logger.info(f"Downloading {workout_type} activity {activity_id} to {filename}")
-            
-            try:
-                # Download the activity data
-                activity_data = api.download_activity(activity_id, dl_fmt=api.ActivityDownloadFormat.ORIGINAL)
-                
-                # Check if the data is a ZIP file
-                if activity_data.startswith(b'PK\x03\x04'):
-                    logger.info(f"Activity data is a ZIP file, extracting FIT file...")
-                    if extract_fit_from_zip(activity_data, filename):
-                        logger.info(f"Successfully extracted and saved {filename}")
-                        downloaded_count += 1
-                    else:
-                        logger.error(f"Failed to extract FIT file from ZIP for activity {activity_id}")
-                else:
-                    # Save FIT file directly
-                    with open(filename, "wb") as fit_file:
-                        fit_file.write(activity_data)
-                    logger.info(f"Successfully saved {filename}")
-                    downloaded_count += 1
-            except Exception as e:
-                logger.error(f"Error downloading activity {activity_id}: {e}")
-                continue
+        # Download the activities concurrently, skipping existing copies
+        loose = archive is None or keep_files
+        jobs = [
+            (
+                activity["activityId"],
+                f"{output_dir}/{workout_type}_{activity['activityId']}.fit" if loose else None,
+                workout_type,
+                activity["startTimeLocal"],
+            )
+            for activity in activities_to_download
+        ]
+        report = download_activities(api, jobs, workers=workers, archive=archive)
+        downloaded_count = report["downloaded"] + report["skipped"]
         
-        logger.info(f"Successfully downloaded {downloaded_count} {workout_type} workouts to the '{output_dir}' directory")
+        destination = f"the '{output_dir}' directory" if loose else f"the archive in '{archive.root}'"
+        logger.info(f"Successfully downloaded {downloaded_count} {workout_type} workouts to {destination}")
         return downloaded_count
         
     except Exception as err:
@@ -227,6 +199,10 @@ def download_workouts(api, workout_type, workout_count):
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keep-files", action="store_true", help="also save loose .FIT files in workouts/")
+    args = parser.parse_args()
+    
     # Get credentials and initialize API
     email, password = get_credentials()
     api = init_api(email, password)
@@ -235,8 +211,9 @@ def main():
     workout_type = get_workout_type()
     workout_count = get_workout_count()
     
-    # Download workouts
-    downloaded_count = download_workouts(api, workout_type, workout_count)
+    # Download workouts into the compressed archive
+    with FitArchive(os.path.join("workouts", "archive")) as archive:
+        downloaded_count = download_workouts(api, workout_type, workout_count, archive=archive, keep_files=args.keep_files)
     if downloaded_count == 0:
         print("No workouts downloaded. Exiting.")
         sys.exit(1)
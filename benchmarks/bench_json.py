@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark response decoding for large Garmin Connect payloads.
+
+Compares the time and peak memory of keeping the raw bytes
+(`connectapi(..., raw=True)`), decoding with the standard library `json`
+module and decoding with `orjson` (what `connectapi` uses when it is
+installed), on a synthetic activity list and activity details payload.
+
+Usage:
+    python benchmarks/bench_json.py [--activities 1000] [--samples 4000]
+        [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def activity_list(count):
+    """Build an activity search response of 'count' activities."""
+    rng = random.Random(0)
+    return [
+        {
+            "activityId": 10_000_000 + n,
+            "activityName": f"Morning run {n}",
+            "activityType": {"typeId": 1, "typeKey": "running"},
+            "startTimeLocal": "2024-01-01 07:00:00",
+            "startTimeGMT": "2024-01-01 06:00:00",
+            "distance": rng.uniform(3000, 20000),
+            "duration": rng.uniform(900, 7200),
+            "averageHR": rng.uniform(120, 170),
+            "maxHR": rng.uniform(150, 195),
+            "calories": rng.uniform(200, 1500),
+            "splitSummaries": [
+                {"splitType": "INTERVAL_ACTIVE", "distance": 1000.0}
+            ]
+            * 5,
+        }
+        for n in range(count)
+    ]
+
+
+def activity_details(samples, metrics=20):
+    """Build an activity details response of 'samples' x 'metrics'."""
+    rng = random.Random(0)
+    return {
+        "metricDescriptors": [
+            {"metricsIndex": i, "key": f"metric{i}"} for i in range(metrics)
+        ],
+        "activityDetailMetrics": [
+            {"metrics": [rng.uniform(0, 200) for _ in range(metrics)]}
+            for _ in range(samples)
+        ],
+        "geoPolylineDTO": {
+            "polyline": [
+                {"lat": 52 + rng.random(), "lon": 4 + rng.random()}
+                for _ in range(samples)
+            ]
+        },
+    }
+
+
+def measure(decode, body, repeat):
+    """Return the median seconds and peak bytes of decode(body)."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(body)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    decode(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--activities", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    decoders = {"raw bytes": lambda body: body, "json": json.loads}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    else:
+        print("orjson is not installed, pip install garminconnect[fast]")
+
+    payloads = {
+        f"activity list ({args.activities})": activity_list(args.activities),
+        f"activity details ({args.samples}x20)": activity_details(
+            args.samples
+        ),
+    }
+    for name, payload in payloads.items():
+        body = json.dumps(payload).encode()
+        print(f"{name}: {len(body) / 1e6:.1f} MB")
+        for decoder, decode in decoders.items():
+            seconds, peak = measure(decode, body, args.repeat)
+            print(
+                f"  {decoder:<10} {seconds * 1000:8.1f} ms "
+                f"{peak / 1e6:8.1f} MB peak"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark sync throughput against the local Garmin Connect stand-in.
+
+Lists a year of activities and downloads their FIT files through a
+`Garmin` client attached to `garminconnect.standin.StandIn`, with injected
+latency and 429s, so throughput and retry changes can be compared
+offline and in CI without credentials.
+
+Usage:
+    python benchmarks/bench_standin.py [--activities 200] [--latency 0.02]
+        [--throttle-rate 0.02] [--workers 8]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from garminconnect import Garmin, RetryPolicy  # noqa: E402
+from garminconnect.standin import StandIn  # noqa: E402
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--activities", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--throttle-rate", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with StandIn(
+        activities=args.activities,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+    ) as api:
+        garmin = api.attach(Garmin(retry_policy=RetryPolicy(backoff=0.05)))
+
+        started = time.perf_counter()
+        activities = garmin.get_activities_by_date("2000-01-01", "2100-01-01")
+        listed = time.perf_counter()
+
+        with tempfile.TemporaryDirectory() as target:
+
+            def download(activity):
+                activity_id = activity["activityId"]
+                return garmin.download_activity_to(
+                    activity_id, Path(target) / f"{activity_id}.fit"
+                )
+
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                written = sum(pool.map(download, activities))
+        finished = time.perf_counter()
+
+        requests = sum(api.hits.values())
+        print(
+            f"activities: {len(activities)}, "
+            f"latency: {args.latency * 1000:.0f} ms, workers: {args.workers}"
+        )
+        print(f"list:      {listed - started:.2f} s")
+        print(
+            f"download:  {finished - listed:.2f} s, "
+            f"{len(activities) / (finished - listed):.1f} files/s, "
+            f"{written / (finished - listed) / 1e6:.1f} MB/s"
+        )
+        print(f"requests:  {requests}, throttled: {api.throttled}")
+
+
+if __name__ == "__main__":
+    main()
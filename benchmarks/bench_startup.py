@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup cost of the Garmin Connect client.
+
+Measures, in fresh interpreters, the time to `import garminconnect` and the
+time to construct `Garmin()` instances, which is what every CLI run and
+short-lived worker pays before its first request.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--instances 1000]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import garminconnect
+imported = time.perf_counter()
+for _ in range({instances}):
+    garminconnect.Garmin()
+built = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "construct_us": (built - imported) / {instances} * 1e6,
+    "withings_loaded": "withings_sync" in sys.modules,
+}}))
+"""
+
+
+def run_probe(instances):
+    """Run one measurement in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(instances=instances)],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--instances", type=int, default=1000)
+    args = parser.parse_args()
+
+    samples = [run_probe(args.instances) for _ in range(args.runs)]
+    imports = [s["import_ms"] for s in samples]
+    constructs = [s["construct_us"] for s in samples]
+
+    print(f"runs: {args.runs}, Garmin() instances per run: {args.instances}")
+    print(
+        f"import garminconnect: median {statistics.median(imports):.1f} ms, "
+        f"min {min(imports):.1f} ms"
+    )
+    print(
+        f"Garmin():             median {statistics.median(constructs):.1f} us, "
+        f"min {min(constructs):.1f} us"
+    )
+    print(
+        f"withings_sync imported at startup: {samples[0]['withings_loaded']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
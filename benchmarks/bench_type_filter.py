@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark request counts for finding the N most recent activities of a type.
+
+Runs against the local Garmin Connect stand-in, where only one in
+'--every' activities has the wanted type, and compares:
+
+- the old heuristic: list N * 3 activities and filter them locally,
+  which misses matches when the type is rarer than one in three
+- client-side paging: page through every activity until N matches
+- server-side filtering: pass activityType and take the first N
+
+Usage:
+    python benchmarks/bench_type_filter.py [--activities 1000] [--every 10]
+        [--count 20] [--latency 0.01]
+"""
+
+import argparse
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from garminconnect import Garmin  # noqa: E402
+from garminconnect.standin import StandIn  # noqa: E402
+
+SEARCH = "/activitylist-service/activities/search/activities"
+WANTED = "lap_swimming"
+
+
+def is_wanted(activity):
+    return activity["activityType"]["typeKey"] == WANTED
+
+
+def heuristic(garmin, count):
+    activities = garmin.get_activities(0, count * 3)
+    return [activity for activity in activities if is_wanted(activity)][:count]
+
+
+def client_side(garmin, count):
+    return list(islice(garmin.iter_activities(predicate=is_wanted), count))
+
+
+def server_side(garmin, count):
+    return list(
+        islice(
+            garmin.iter_activities(page_size=count, activitytype=WANTED),
+            count,
+        )
+    )
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--activities", type=int, default=1000)
+    parser.add_argument("--every", type=int, default=10)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with StandIn(activities=args.activities, latency=args.latency) as api:
+        for n, activity in enumerate(api.activities):
+            activity["activityType"]["typeKey"] = (
+                WANTED if n % args.every == 0 else "running"
+            )
+        garmin = api.attach(Garmin())
+
+        print(
+            f"activities: {args.activities}, one in {args.every} wanted, "
+            f"count: {args.count}"
+        )
+        for name, find in (
+            ("heuristic", heuristic),
+            ("client-side", client_side),
+            ("server-side", server_side),
+        ):
+            api.hits.clear()
+            started = time.perf_counter()
+            found = find(garmin, args.count)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name + ':':13}found {len(found):4}, "
+                f"requests {api.hits[SEARCH]:4}, {elapsed:.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
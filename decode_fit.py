@@ -5,6 +5,8 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 import logging
 
+from fit_archive import BY_ID, BY_TIME, FitArchive, open_fit
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,23 +23,57 @@ def ensure_output_directory():
     return csv_dir
 
 def get_fit_files():
-    """Get list of all .FIT files in workouts directory."""
+    """Get list of all .FIT and compressed .FIT.GZ files in workouts directory."""
     workouts_dir = "workouts"
     if not os.path.exists(workouts_dir):
         logger.error(f"Workouts directory '{workouts_dir}' not found")
         return []
     
     fit_files = [f for f in os.listdir(workouts_dir) 
-                 if f.lower().endswith('.fit') and os.path.isfile(os.path.join(workouts_dir, f))]
+                 if f.lower().endswith(('.fit', '.fit.gz')) and os.path.isfile(os.path.join(workouts_dir, f))]
     logger.info(f"Found {len(fit_files)} .FIT files in {workouts_dir}")
     return fit_files
 
+def get_archived_fits(fit_files):
+    """
+    Get the index entries of archived activities (workouts/archive) that have
+    no loose copy among fit_files in workouts directory, matching the names
+    the download scripts give them against the activity ID or start time
+    and type in the index.
+    """
+    archive_dir = os.path.join("workouts", "archive")
+    if not os.path.exists(os.path.join(archive_dir, "index.sqlite")):
+        return []
+    
+    loose_ids = set()
+    loose_times = set()
+    for fit_file in fit_files:
+        name = fit_file[:-3] if fit_file.lower().endswith('.gz') else fit_file
+        match = BY_ID.match(name)
+        if match:
+            loose_ids.add(int(match["id"]))
+            continue
+        match = BY_TIME.match(name)
+        if match:
+            start_time = datetime.strptime(match["time"], "%Y%m%d_%H%M%S")
+            loose_times.add((start_time.strftime("%Y-%m-%d %H:%M:%S"), match["type"]))
+    
+    with FitArchive(archive_dir) as archive:
+        entries = [
+            entry for entry in archive.entries()
+            if entry["activity_id"] not in loose_ids
+            and (str(entry["start_time"])[:19].replace("T", " "), entry["activity_type"]) not in loose_times
+        ]
+    logger.info(f"Found {len(entries)} archived activities without a .FIT file in workouts")
+    return entries
+
 def decode_fit_file(input_path, output_path):
     """
     Decode a .fit file and save as CSV.
     
     Args:
-        input_path (str): Path to the input .fit file
+        input_path (str): Path to the input .fit or .fit.gz file, or a file
+            object such as FitArchive.open(activity_id)
         output_path (str): Path where to save the CSV file
         
     Returns:
@@ -48,7 +84,7 @@ def decode_fit_file(input_path, output_path):
     try:
         # Load the .fit file
         logger.debug("Creating FitFile object")
-        fitfile = FitFile(input_path)
+        fitfile = FitFile(open_fit(input_path))
         
         # Get all data messages that are of type "record"
         logger.debug("Getting record messages")
@@ -105,30 +141,40 @@ def decode_fit_file(input_path, output_path):
         logger.error(f"Error type: {type(e)}")
         raise
 
+def decode_to_csv(name, source, csv_dir):
+    """Decode one FIT file or archive entry to csv_dir, logging failures."""
+    output_file = name.replace('.gz', '').replace('.fit', '.csv')
+    output_path = os.path.join(csv_dir, output_file)
+    
+    try:
+        logger.info(f"Processing {name}...")
+        decode_fit_file(source, output_path)
+        logger.info(f"Successfully decoded {name} to {output_file}")
+    except Exception as e:
+        logger.error(f"Error processing {name}: {e}")
+
 def process_fit_files():
-    """Process all FIT files in workouts directory."""
+    """Process all FIT files in workouts directory and its archive."""
     # Ensure output directory exists
     csv_dir = ensure_output_directory()
     
-    # Get list of FIT files
+    # Get list of FIT files, and archived activities without one
     fit_files = get_fit_files()
-    if not fit_files:
+    archived = get_archived_fits(fit_files)
+    if not fit_files and not archived:
         logger.info("No .FIT files found in workouts directory")
         return
     
     # Process each file
     for fit_file in fit_files:
-        input_path = os.path.join("workouts", fit_file)
-        output_file = fit_file.replace('.fit', '.csv')
-        output_path = os.path.join(csv_dir, output_file)
-        
-        try:
-            logger.info(f"Processing {fit_file}...")
-            decode_fit_file(input_path, output_path)
-            logger.info(f"Successfully decoded {fit_file} to {output_file}")
-        except Exception as e:
-            logger.error(f"Error processing {fit_file}: {e}")
-            continue
+        decode_to_csv(fit_file, os.path.join("workouts", fit_file), csv_dir)
+    
+    # Process each archived activity
+    if archived:
+        with FitArchive(os.path.join("workouts", "archive")) as archive:
+            for entry in archived:
+                name = f"{entry['activity_type']}_{entry['activity_id']}.fit"
+                decode_to_csv(name, archive.open(entry["activity_id"]), csv_dir)
 
 def main():
     """Main function to process all FIT files."""
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, compressed archive of .FIT files.
+
+Each FIT file is stored once, gzip-compressed, under the SHA-256 of its
+uncompressed content (objects/ab/abcdef....fit.gz), so the same activity
+saved under two names takes the space of one. A SQLite index maps the
+activity ID, type and start time to its blob. The download scripts
+store what they download here, writing loose .FIT files only with
+--keep-files; decode_fit.py processes archived activities, and
+decode_fit_file reads archive entries and .fit.gz files transparently
+through open_fit().
+
+Usage:
+    Import the loose .FIT files of a directory (named {type}_{id}.fit or
+    {timestamp}_{type}.fit by the download scripts) into the archive:
+
+    python fit_archive.py [--archive workouts/archive] [--remove] workouts
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+BY_ID = re.compile(r"^(?P<type>.+)_(?P<id>\d+)\.fit$", re.IGNORECASE)
+BY_TIME = re.compile(
+    r"^(?P<time>\d{8}_\d{6})_(?P<type>.+)\.fit$", re.IGNORECASE
+)
+
+
+def open_fit(source):
+    """
+    Return something FitFile can read from a path, a .fit.gz path or a
+    file object (e.g. from FitArchive.open()).
+    """
+    if hasattr(source, "read"):
+        return source
+    if str(source).lower().endswith(".gz"):
+        with gzip.open(source, "rb") as f:
+            return io.BytesIO(f.read())
+    return source
+
+
+class FitArchive:
+    """Content-addressed store of gzip-compressed FIT files with an index."""
+
+    def __init__(self, root=os.path.join("workouts", "archive"), level=9):
+        self.root = root
+        self.level = level
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS activities ("
+            "activity_id INTEGER PRIMARY KEY, activity_type TEXT, "
+            "start_time TEXT, sha256 TEXT NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS activities_sha256 "
+            "ON activities (sha256)"
+        )
+        self._db.commit()
+
+    def blob_path(self, sha256):
+        """Return the path of the blob holding content 'sha256'."""
+        return os.path.join(
+            self.root, "objects", sha256[:2], f"{sha256}.fit.gz"
+        )
+
+    def add_bytes(
+        self, data, activity_id=None, activity_type=None, start_time=None
+    ):
+        """
+        Store FIT bytes, once per content, and index them under
+        'activity_id' when given.
+
+        Returns:
+            str: SHA-256 of the content
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.part"
+            # mtime=0 keeps blobs byte-identical for identical content
+            with open(partial, "wb") as raw:
+                with gzip.GzipFile(
+                    fileobj=raw, mode="wb", compresslevel=self.level, mtime=0
+                ) as f:
+                    f.write(data)
+            os.replace(partial, path)
+        if activity_id is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO activities VALUES (?, ?, ?, ?, ?)",
+                (
+                    int(activity_id),
+                    activity_type,
+                    start_time,
+                    sha256,
+                    len(data),
+                ),
+            )
+            self._db.commit()
+        return sha256
+
+    def add_file(
+        self, path, activity_id=None, activity_type=None, start_time=None
+    ):
+        """Store a .FIT file; see add_bytes()."""
+        with open(path, "rb") as f:
+            return self.add_bytes(
+                f.read(), activity_id, activity_type, start_time
+            )
+
+    def _sha256(self, key):
+        if isinstance(key, str) and len(key) == 64:
+            return key
+        row = self._db.execute(
+            "SELECT sha256 FROM activities WHERE activity_id = ?", (int(key),)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def open(self, key):
+        """Open the FIT file of an activity ID or SHA-256 for reading."""
+        with gzip.open(self.blob_path(self._sha256(key)), "rb") as f:
+            return io.BytesIO(f.read())
+
+    def read(self, key):
+        """Return the FIT bytes of an activity ID or SHA-256."""
+        return self.open(key).getvalue()
+
+    def is_indexed(self, sha256):
+        """Whether any activity in the index refers to content 'sha256'."""
+        return (
+            self._db.execute(
+                "SELECT 1 FROM activities WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            is not None
+        )
+
+    def __contains__(self, activity_id):
+        return (
+            self._db.execute(
+                "SELECT 1 FROM activities WHERE activity_id = ?",
+                (int(activity_id),),
+            ).fetchone()
+            is not None
+        )
+
+    def __len__(self):
+        (count,) = self._db.execute(
+            "SELECT COUNT(*) FROM activities"
+        ).fetchone()
+        return count
+
+    def entries(self, activity_type=None):
+        """Return index rows as dicts, most recent first."""
+        query = "SELECT * FROM activities"
+        params = ()
+        if activity_type:
+            query += " WHERE activity_type = ?"
+            params = (activity_type,)
+        cursor = self._db.execute(query + " ORDER BY start_time DESC", params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def stats(self):
+        """Return activity and blob counts, raw and stored bytes."""
+        activities, blobs, size = self._db.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT sha256), "
+            "(SELECT SUM(size) FROM (SELECT DISTINCT sha256, size "
+            "FROM activities)) FROM activities"
+        ).fetchone()
+        stored = sum(
+            os.path.getsize(self.blob_path(sha256))
+            for (sha256,) in self._db.execute(
+                "SELECT DISTINCT sha256 FROM activities"
+            )
+        )
+        return {
+            "activities": activities,
+            "blobs": blobs,
+            "bytes": size or 0,
+            "stored_bytes": stored,
+        }
+
+    def import_directory(self, directory, remove=False):
+        """
+        Archive the .FIT files in 'directory' named by the download scripts,
+        taking the activity ID, type and start time from the file names.
+        With 'remove' a file is deleted once an index row refers to its
+        content; files without one (e.g. {timestamp}_{type}.fit never
+        archived by a download script) are kept, since the index could
+        not find them again.
+
+        Returns:
+            int: Number of files imported
+        """
+        imported = 0
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.lower().endswith(".fit") or not os.path.isfile(path):
+                continue
+            activity_id = activity_type = start_time = None
+            match = BY_ID.match(name)
+            if match:
+                activity_id = int(match["id"])
+                activity_type = match["type"]
+            else:
+                match = BY_TIME.match(name)
+                if match:
+                    activity_type = match["type"]
+                    start_time = datetime.strptime(
+                        match["time"], "%Y%m%d_%H%M%S"
+                    ).strftime("%Y-%m-%d %H:%M:%S")
+            sha256 = self.add_file(
+                path, activity_id, activity_type, start_time
+            )
+            if remove:
+                if self.is_indexed(sha256):
+                    os.remove(path)
+                else:
+                    logger.warning(
+                        f"Keeping {path}: no activity ID to index it under"
+                    )
+            imported += 1
+        logger.info(f"Imported {imported} .FIT files from {directory}")
+        return imported
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("directory")
+    parser.add_argument(
+        "--archive", default=os.path.join("workouts", "archive")
+    )
+    parser.add_argument(
+        "--remove", action="store_true", help="delete files once archived"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with FitArchive(args.archive) as archive:
+        archive.import_directory(args.directory, remove=args.remove)
+        stats = archive.stats()
+    logger.info(
+        f"{stats['activities']} activities in {stats['blobs']} blobs, "
+        f"{stats['bytes']} bytes stored as {stats['stored_bytes']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Download activities as .FIT files with a bounded worker pool.
+
+Shared by Get_workouts_data.py and Get_latest_10_workouts.py. Every file
+is streamed to disk by one of 'workers' threads with
+Garmin.download_activity_to, which extracts the FIT file from the zip,
+writes it to a temporary file and renames it into place on success.
+Files with a valid copy already on disk, or already in the FitArchive
+passed as 'archive', are skipped. With an archive every file is added
+to it, and jobs without a filename are stored in the archive only. The
+client's RetryPolicy retries failed requests; a file is only downloaded
+again after a connection error, throttling or server error that
+outlasted it, or a connection that broke off mid-download. Progress and
+throughput are logged as files complete.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from garth.exc import GarthHTTPError
+
+from garminconnect import (
+    GarminConnectConnectionError,
+    GarminConnectServiceUnavailableError,
+    GarminConnectTooManyRequestsError,
+)
+from garminconnect.ratelimit import status_code
+
+logger = logging.getLogger(__name__)
+
+FIT_SIGNATURE = b".FIT"
+
+
+def is_valid_fit(path):
+    """Whether 'path' exists and starts with a FIT file header."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(12)
+    except OSError:
+        return False
+    return len(header) == 12 and header[8:12] == FIT_SIGNATURE
+
+
+def is_transient(error):
+    """
+    Whether downloading the file again may succeed: after a connection
+    error, throttling or a server error, but not while the circuit breaker
+    is open or after a client error such as a 404.
+    """
+    if isinstance(error, GarminConnectServiceUnavailableError):
+        return False
+    if isinstance(error, GarthHTTPError):
+        status = status_code(error)
+        return status is not None and (status == 429 or status >= 500)
+    return isinstance(
+        error,
+        (
+            GarminConnectConnectionError,
+            GarminConnectTooManyRequestsError,
+            requests.RequestException,
+        ),
+    )
+
+
+def download_with_retry(api, activity_id, filename, retries=2, backoff=1.0):
+    """
+    Download one activity, downloading it again after a transient error
+    (see is_transient) with a backoff of 'backoff', 2x 'backoff'...
+
+    Returns:
+        int: Number of bytes written, or None if the download failed
+    """
+    for attempt in range(retries + 1):
+        try:
+            return api.download_activity_to(activity_id, filename)
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                logger.error(f"Error downloading activity {activity_id}: {e}")
+                return None
+            delay = backoff * 2**attempt
+            logger.warning(
+                f"Download of activity {activity_id} failed ({e}), "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def download_activities(
+    api, jobs, workers=4, retries=2, backoff=1.0, archive=None
+):
+    """
+    Download (activity_id, filename) jobs concurrently.
+
+    Args:
+        api: Garmin Connect API client
+        jobs (list): (activity_id, filename) pairs, or (activity_id,
+            filename, activity_type, start_time) to index them in 'archive'.
+            With an archive, a filename of None stores the activity in the
+            archive only, without a loose .FIT file
+        workers (int): Maximum number of concurrent downloads
+        retries (int): Extra downloads of a file after a transient error
+        backoff (float): Seconds before the first retry, doubling each time
+        archive (FitArchive): (Optional) Add every downloaded or present
+            file to this archive; activities already in it are not
+            downloaded again
+
+    Returns:
+        dict: Counts of downloaded, skipped and failed files, and bytes
+    """
+    if archive is None and any(job[1] is None for job in jobs):
+        raise ValueError("Jobs without a filename need an archive")
+    report = {"downloaded": 0, "skipped": 0, "failed": 0, "bytes": 0}
+    pending = []
+    for activity_id, filename, *meta in jobs:
+        if archive is not None and activity_id in archive:
+            logger.info(f"Skipping {activity_id}, already archived")
+            report["skipped"] += 1
+            if filename is not None and not is_valid_fit(filename):
+                with open(filename, "wb") as f:
+                    f.write(archive.read(activity_id))
+        elif filename is not None and is_valid_fit(filename):
+            logger.info(f"Skipping {filename}, already downloaded")
+            report["skipped"] += 1
+            if archive is not None:
+                archive.add_file(filename, activity_id, *meta)
+        else:
+            pending.append((activity_id, filename, meta))
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {}
+        for activity_id, filename, meta in pending:
+            # Archive-only downloads are staged next to the archive's blobs
+            target = filename or os.path.join(
+                archive.root, f"download_{activity_id}.fit"
+            )
+            future = pool.submit(
+                download_with_retry,
+                api,
+                activity_id,
+                target,
+                retries,
+                backoff,
+            )
+            futures[future] = (activity_id, filename, target, meta)
+        for done, future in enumerate(as_completed(futures), 1):
+            written = future.result()
+            if written is None:
+                report["failed"] += 1
+                continue
+            activity_id, filename, target, meta = futures[future]
+            # The archive's SQLite index is only used from this thread
+            if archive is not None:
+                archive.add_file(target, activity_id, *meta)
+            if filename is None:
+                os.remove(target)
+            report["downloaded"] += 1
+            report["bytes"] += written
+            elapsed = max(time.monotonic() - started, 1e-9)
+            saved = (
+                f"Saved {filename}" if filename else f"Archived {activity_id}"
+            )
+            logger.info(
+                f"[{done}/{len(pending)}] {saved} "
+                f"({report['downloaded'] / elapsed:.1f} files/s, "
+                f"{report['bytes'] / elapsed / 1e6:.2f} MB/s)"
+            )
+    return report
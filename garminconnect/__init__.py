@@ -1,13 +1,39 @@
 """Python 3 API wrapper for Garmin Connect."""
 
+import contextlib
+import hashlib
+import itertools
+import json
 import logging
 import os
-from datetime import date, datetime, timezone
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from enum import Enum, auto
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+from urllib.parse import urljoin
 
 import garth
-from withings_sync import fit
+import requests
+from garth.exc import GarthHTTPError
+
+_json_loads: Callable[[Union[bytes, str]], Any]
+try:
+    # Several times faster than json on large payloads, when installed
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+from . import details, graphql, ranges, ratelimit, stream, telemetry
+from .breaker import CircuitBreaker, service_family
+from .cache import CacheRule, ResponseCache  # noqa: F401
+from .ratelimit import RateLimiter, RetryPolicy  # noqa: F401
+from .telemetry import RequestMetrics
+from .upload import UploadLedger, file_sha256
 
 logger = logging.getLogger(__name__)
 
@@ -15,235 +41,649 @@ logger = logging.getLogger(__name__)
 garth.http.USER_AGENT = {"User-Agent": "GCM-iOS-5.7.2.1"}
 
 
+class _GarthClient(garth.Client):
+    """
+    garth.Client that several threads can share: each request returns its
+    own response instead of the shared 'last_resp', and an expired OAuth2
+    token is refreshed once however many requests find it expired.
+    """
+
+    # Failed requests are retried by Garmin._request and its RetryPolicy,
+    # which knows about 429s, rather than by urllib3
+    retries = 0
+    status_forcelist = ()
+
+    def __init__(self, *args, **kwargs):
+        self._refresh_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        subdomain: str,
+        path: str,
+        /,
+        api: bool = False,
+        referrer: Union[str, bool] = False,
+        headers: Optional[dict] = None,
+        **kwargs,
+    ) -> requests.Response:
+        url = urljoin(f"https://{subdomain}.{self.domain}", path)
+        headers = dict(headers or {})
+        last = getattr(self, "last_resp", None)
+        if referrer is True and last is not None:
+            headers["referer"] = last.url
+        if api:
+            assert (
+                self.oauth1_token
+            ), "OAuth1 token is required for API requests"
+            token = self.oauth2_token
+            if not token or token.expired:
+                self.refresh_oauth2()
+            headers["Authorization"] = str(self.oauth2_token)
+        response = self.sess.request(
+            method, url, headers=headers, timeout=self.timeout, **kwargs
+        )
+        # Still kept for garth's login flow, which runs on one thread
+        self.last_resp = response
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as err:
+            raise GarthHTTPError(msg="Error in request", error=err)
+        return response
+
+    def refresh_oauth2(self):
+        expired = self.oauth2_token
+        with self._refresh_lock:
+            # Another thread may have refreshed it while this one waited
+            token = self.oauth2_token
+            if token is not expired and token and not token.expired:
+                return
+            super().refresh_oauth2()
+
+
 class Garmin:
     """Class for fetching data from Garmin Connect."""
 
+    # Methods taking a single 'cdate' that fetch_range can fan out over
+    DAILY_METRICS = frozenset(
+        {
+            "get_stats",
+            "get_user_summary",
+            "get_steps_data",
+            "get_floors",
+            "get_heart_rates",
+            "get_daily_weigh_ins",
+            "get_body_battery_events",
+            "get_max_metrics",
+            "get_hydration_data",
+            "get_respiration_data",
+            "get_spo2_data",
+            "get_intensity_minutes_data",
+            "get_all_day_stress",
+            "get_all_day_events",
+            "get_sleep_data",
+            "get_stress_data",
+            "get_rhr_day",
+            "get_hrv_data",
+            "get_training_readiness",
+            "get_training_status",
+            "get_fitnessage_data",
+            "get_activities_fordate",
+            "get_menstrual_data_for_date",
+        }
+    )
+
+    # Longest span in days, and chunk alignment, the server accepts for
+    # range methods; longer ranges are split and fetched concurrently
+    RANGE_LIMITS = MappingProxyType(
+        {
+            "get_daily_steps": (28, None),
+            "get_body_battery": (28, None),
+            "get_weigh_ins": (365, None),
+            "get_body_composition": (365, None),
+            "get_blood_pressure": (365, None),
+            "get_race_predictions": (365, "month"),
+            "get_endurance_score": (364, "week"),
+            "get_hill_score": (365, None),
+        }
+    )
+
+    # Parts of an activity that hydrate_activities can fetch, by method
+    ACTIVITY_PARTS = MappingProxyType(
+        {
+            "summary": "get_activity",
+            "splits": "get_activity_splits",
+            "typed_splits": "get_activity_typed_splits",
+            "split_summaries": "get_activity_split_summaries",
+            "weather": "get_activity_weather",
+            "hr_zones": "get_activity_hr_in_timezones",
+            "gear": "get_activity_gear",
+            "exercise_sets": "get_activity_exercise_sets",
+            "details": "get_activity_details",
+        }
+    )
+    DEFAULT_ACTIVITY_PARTS = (
+        "summary",
+        "splits",
+        "split_summaries",
+        "weather",
+        "hr_zones",
+        "gear",
+    )
+
+    # Profile data saved next to the OAuth tokens in a tokenstore directory
+    # so that login() can resume without any network calls
+    PROFILE_FILE = "profile.json"
+    PROFILE_MAX_AGE = timedelta(days=7)
+
+    garmin_connect_user_settings_url = (
+        "/userprofile-service/userprofile/user-settings"
+    )
+    garmin_connect_userprofile_settings_url = (
+        "/userprofile-service/userprofile/settings"
+    )
+    garmin_connect_devices_url = "/device-service/deviceregistration/devices"
+    garmin_connect_device_url = "/device-service/deviceservice"
+
+    garmin_connect_primary_device_url = (
+        "/web-gateway/device-info/primary-training-device"
+    )
+
+    garmin_connect_solar_url = "/web-gateway/solar"
+    garmin_connect_weight_url = "/weight-service"
+    garmin_connect_daily_summary_url = "/usersummary-service/usersummary/daily"
+    garmin_connect_metrics_url = "/metrics-service/metrics/maxmet/daily"
+    garmin_connect_daily_hydration_url = (
+        "/usersummary-service/usersummary/hydration/daily"
+    )
+    garmin_connect_set_hydration_url = (
+        "usersummary-service/usersummary/hydration/log"
+    )
+    garmin_connect_daily_stats_steps_url = (
+        "/usersummary-service/stats/steps/daily"
+    )
+    garmin_connect_personal_record_url = (
+        "/personalrecord-service/personalrecord/prs"
+    )
+    garmin_connect_earned_badges_url = "/badge-service/badge/earned"
+    garmin_connect_adhoc_challenges_url = (
+        "/adhocchallenge-service/adHocChallenge/historical"
+    )
+    garmin_connect_adhoc_challenge_url = (
+        "/adhocchallenge-service/adHocChallenge/"
+    )
+    garmin_connect_badge_challenges_url = (
+        "/badgechallenge-service/badgeChallenge/completed"
+    )
+    garmin_connect_available_badge_challenges_url = (
+        "/badgechallenge-service/badgeChallenge/available"
+    )
+    garmin_connect_non_completed_badge_challenges_url = (
+        "/badgechallenge-service/badgeChallenge/non-completed"
+    )
+    garmin_connect_inprogress_virtual_challenges_url = (
+        "/badgechallenge-service/virtualChallenge/inProgress"
+    )
+    garmin_connect_daily_sleep_url = (
+        "/wellness-service/wellness/dailySleepData"
+    )
+    garmin_connect_daily_stress_url = "/wellness-service/wellness/dailyStress"
+    garmin_connect_hill_score_url = "/metrics-service/metrics/hillscore"
+
+    garmin_connect_daily_body_battery_url = (
+        "/wellness-service/wellness/bodyBattery/reports/daily"
+    )
+
+    garmin_connect_body_battery_events_url = (
+        "/wellness-service/wellness/bodyBattery/events"
+    )
+
+    garmin_connect_blood_pressure_endpoint = (
+        "/bloodpressure-service/bloodpressure/range"
+    )
+
+    garmin_connect_set_blood_pressure_endpoint = (
+        "/bloodpressure-service/bloodpressure"
+    )
+
+    garmin_connect_endurance_score_url = (
+        "/metrics-service/metrics/endurancescore"
+    )
+    garmin_connect_menstrual_calendar_url = (
+        "/periodichealth-service/menstrualcycle/calendar"
+    )
+
+    garmin_connect_menstrual_dayview_url = (
+        "/periodichealth-service/menstrualcycle/dayview"
+    )
+    garmin_connect_pregnancy_snapshot_url = (
+        "periodichealth-service/menstrualcycle/pregnancysnapshot"
+    )
+    garmin_connect_goals_url = "/goal-service/goal/goals"
+
+    garmin_connect_rhr_url = "/userstats-service/wellness/daily"
+
+    garmin_connect_hrv_url = "/hrv-service/hrv"
+
+    garmin_connect_training_readiness_url = (
+        "/metrics-service/metrics/trainingreadiness"
+    )
+
+    garmin_connect_race_predictor_url = (
+        "/metrics-service/metrics/racepredictions"
+    )
+    garmin_connect_training_status_url = (
+        "/metrics-service/metrics/trainingstatus/aggregated"
+    )
+    garmin_connect_user_summary_chart = (
+        "/wellness-service/wellness/dailySummaryChart"
+    )
+    garmin_connect_floors_chart_daily_url = (
+        "/wellness-service/wellness/floorsChartData/daily"
+    )
+    garmin_connect_heartrates_daily_url = (
+        "/wellness-service/wellness/dailyHeartRate"
+    )
+    garmin_connect_daily_respiration_url = (
+        "/wellness-service/wellness/daily/respiration"
+    )
+    garmin_connect_daily_spo2_url = "/wellness-service/wellness/daily/spo2"
+    garmin_connect_daily_intensity_minutes = (
+        "/wellness-service/wellness/daily/im"
+    )
+    garmin_all_day_stress_url = "/wellness-service/wellness/dailyStress"
+    garmin_daily_events_url = "/wellness-service/wellness/dailyEvents"
+    garmin_connect_activities = (
+        "/activitylist-service/activities/search/activities"
+    )
+    garmin_connect_activities_baseurl = "/activitylist-service/activities/"
+    garmin_connect_activity = "/activity-service/activity"
+    garmin_connect_activity_types = "/activity-service/activity/activityTypes"
+    garmin_connect_activity_fordate = "/mobile-gateway/heartRate/forDate"
+    garmin_connect_fitnessstats = "/fitnessstats-service/activity"
+    garmin_connect_fitnessage = "/fitnessage-service/fitnessage"
+
+    garmin_connect_fit_download = "/download-service/files/activity"
+    garmin_connect_tcx_download = "/download-service/export/tcx/activity"
+    garmin_connect_gpx_download = "/download-service/export/gpx/activity"
+    garmin_connect_kml_download = "/download-service/export/kml/activity"
+    garmin_connect_csv_download = "/download-service/export/csv/activity"
+
+    garmin_connect_upload = "/upload-service/upload"
+
+    garmin_connect_gear = "/gear-service/gear/filterGear"
+    garmin_connect_gear_baseurl = "/gear-service/gear/"
+
+    garmin_request_reload_url = "/wellness-service/wellness/epoch/request"
+
+    garmin_workouts = "/workout-service"
+
+    garmin_connect_delete_activity_url = "/activity-service/activity"
+
+    garmin_graphql_endpoint = "graphql-gateway/graphql"
+
+    # Read-only registry of the endpoint attributes above, shared by every
+    # instance instead of being rebuilt per client
+    ENDPOINTS = MappingProxyType(
+        {k: v for k, v in dict(locals()).items() if k.startswith("garmin_")}
+    )
+    # Service families the circuit breaker tracks, e.g. 'wellness-service'
+    SERVICE_FAMILIES = frozenset(map(service_family, ENDPOINTS.values()))
+
     def __init__(
-        self, email=None, password=None, is_cn=False, prompt_mfa=None
+        self,
+        email=None,
+        password=None,
+        is_cn=False,
+        prompt_mfa=None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        telemetry: Optional[RequestMetrics] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
-        """Create a new class instance."""
+        """
+        Create a new class instance. Pass a ResponseCache as 'cache' to
+        serve repeated connectapi calls from local disk, and a RateLimiter
+        (which may be shared between instances) to pace requests.
+        Transient failures are retried according to 'retry_policy'.
+        Per-endpoint request statistics go to 'telemetry', a new
+        RequestMetrics unless one is passed in to share. Requests to a
+        service family that keeps failing are refused by 'circuit_breaker'
+        until it recovers.
+        """
         self.username = email
         self.password = password
         self.is_cn = is_cn
         self.prompt_mfa = prompt_mfa
-
-        self.garmin_connect_user_settings_url = (
-            "/userprofile-service/userprofile/user-settings"
-        )
-        self.garmin_connect_userprofile_settings_url = (
-            "/userprofile-service/userprofile/settings"
-        )
-        self.garmin_connect_devices_url = (
-            "/device-service/deviceregistration/devices"
-        )
-        self.garmin_connect_device_url = "/device-service/deviceservice"
-
-        self.garmin_connect_primary_device_url = (
-            "/web-gateway/device-info/primary-training-device"
-        )
-
-        self.garmin_connect_solar_url = "/web-gateway/solar"
-        self.garmin_connect_weight_url = "/weight-service"
-        self.garmin_connect_daily_summary_url = (
-            "/usersummary-service/usersummary/daily"
-        )
-        self.garmin_connect_metrics_url = (
-            "/metrics-service/metrics/maxmet/daily"
-        )
-        self.garmin_connect_daily_hydration_url = (
-            "/usersummary-service/usersummary/hydration/daily"
-        )
-        self.garmin_connect_set_hydration_url = (
-            "usersummary-service/usersummary/hydration/log"
-        )
-        self.garmin_connect_daily_stats_steps_url = (
-            "/usersummary-service/stats/steps/daily"
-        )
-        self.garmin_connect_personal_record_url = (
-            "/personalrecord-service/personalrecord/prs"
-        )
-        self.garmin_connect_earned_badges_url = "/badge-service/badge/earned"
-        self.garmin_connect_adhoc_challenges_url = (
-            "/adhocchallenge-service/adHocChallenge/historical"
-        )
-        self.garmin_connect_adhoc_challenges_url = (
-            "/adhocchallenge-service/adHocChallenge/historical"
-        )
-        self.garmin_connect_adhoc_challenge_url = (
-            "/adhocchallenge-service/adHocChallenge/"
-        )
-        self.garmin_connect_badge_challenges_url = (
-            "/badgechallenge-service/badgeChallenge/completed"
-        )
-        self.garmin_connect_available_badge_challenges_url = (
-            "/badgechallenge-service/badgeChallenge/available"
-        )
-        self.garmin_connect_non_completed_badge_challenges_url = (
-            "/badgechallenge-service/badgeChallenge/non-completed"
-        )
-        self.garmin_connect_inprogress_virtual_challenges_url = (
-            "/badgechallenge-service/virtualChallenge/inProgress"
-        )
-        self.garmin_connect_daily_sleep_url = (
-            "/wellness-service/wellness/dailySleepData"
-        )
-        self.garmin_connect_daily_stress_url = (
-            "/wellness-service/wellness/dailyStress"
-        )
-        self.garmin_connect_hill_score_url = (
-            "/metrics-service/metrics/hillscore"
-        )
-
-        self.garmin_connect_daily_body_battery_url = (
-            "/wellness-service/wellness/bodyBattery/reports/daily"
-        )
-
-        self.garmin_connect_body_battery_events_url = (
-            "/wellness-service/wellness/bodyBattery/events"
-        )
-
-        self.garmin_connect_blood_pressure_endpoint = (
-            "/bloodpressure-service/bloodpressure/range"
-        )
-
-        self.garmin_connect_set_blood_pressure_endpoint = (
-            "/bloodpressure-service/bloodpressure"
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.telemetry = telemetry or RequestMetrics()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._inflight: Dict[tuple, "_Flight"] = {}
+
+        self.garth = _GarthClient(
+            domain="garmin.cn" if is_cn else "garmin.com",
+            pool_connections=20,
+            pool_maxsize=20,
         )
 
-        self.garmin_connect_endurance_score_url = (
-            "/metrics-service/metrics/endurancescore"
-        )
-        self.garmin_connect_menstrual_calendar_url = (
-            "/periodichealth-service/menstrualcycle/calendar"
-        )
+        self.display_name = None
+        self.full_name = None
+        self.unit_system = None
 
-        self.garmin_connect_menstrual_dayview_url = (
-            "/periodichealth-service/menstrualcycle/dayview"
-        )
-        self.garmin_connect_pregnancy_snapshot_url = (
-            "periodichealth-service/menstrualcycle/pregnancysnapshot"
-        )
-        self.garmin_connect_goals_url = "/goal-service/goal/goals"
+    def connectapi(self, path, raw=False, **kwargs):
+        """
+        Send a connectapi request and return the decoded JSON response, or
+        with raw=True the undecoded response body as bytes, which skips
+        parsing when the response is only archived. Raw responses are not
+        cached.
+        """
 
-        self.garmin_connect_rhr_url = "/userstats-service/wellness/daily"
+        if raw:
+            method = kwargs.pop("method", "GET")
+            return self._request(method, path, **kwargs).content
+
+        # Only plain GETs (path and params) are coalesced and cached
+        if set(kwargs) - {"params"}:
+            return self._connectapi(path, **kwargs)
+
+        # Single-flight: concurrent identical calls share one request. The
+        # uncontended path takes no lock, dict.setdefault is atomic.
+        params = kwargs.get("params")
+        key = (
+            path,
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+        )
+        flight = _Flight()
+        leader = self._inflight.setdefault(key, flight)
+        if leader is not flight:
+            leader.done.wait()
+            if leader.error is not None:
+                raise leader.error
+            return leader.result
+
+        try:
+            flight.result = self._cached_get(path, **kwargs)
+            return flight.result
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            del self._inflight[key]
+            flight.done.set()
+
+    def _cached_get(self, path, **kwargs):
+        if self.cache is None:
+            return self._connectapi(path, **kwargs)
+
+        params = kwargs.get("params")
+        namespace = self.display_name or ""
+        hit, response = self.cache.lookup(path, params, namespace)
+        if not hit:
+            response = self._connectapi(path, **kwargs)
+            self.cache.store(path, params, response, namespace)
+        return response
 
-        self.garmin_connect_hrv_url = "/hrv-service/hrv"
+    def _connectapi(self, path, method="GET", **kwargs):
+        response = self._request(method, path, **kwargs)
+        if response.status_code == 204:
+            return None
+        return _json_loads(response.content)
 
-        self.garmin_connect_training_readiness_url = (
-            "/metrics-service/metrics/trainingreadiness"
-        )
+    def download(self, path, **kwargs):
+        return self._request("GET", path, **kwargs).content
 
-        self.garmin_connect_race_predictor_url = (
-            "/metrics-service/metrics/racepredictions"
-        )
-        self.garmin_connect_training_status_url = (
-            "/metrics-service/metrics/trainingstatus/aggregated"
-        )
-        self.garmin_connect_user_summary_chart = (
-            "/wellness-service/wellness/dailySummaryChart"
-        )
-        self.garmin_connect_floors_chart_daily_url = (
-            "/wellness-service/wellness/floorsChartData/daily"
-        )
-        self.garmin_connect_heartrates_daily_url = (
-            "/wellness-service/wellness/dailyHeartRate"
-        )
-        self.garmin_connect_daily_respiration_url = (
-            "/wellness-service/wellness/daily/respiration"
-        )
-        self.garmin_connect_daily_spo2_url = (
-            "/wellness-service/wellness/daily/spo2"
-        )
-        self.garmin_connect_daily_intensity_minutes = (
-            "/wellness-service/wellness/daily/im"
-        )
-        self.garmin_all_day_stress_url = (
-            "/wellness-service/wellness/dailyStress"
-        )
-        self.garmin_daily_events_url = "/wellness-service/wellness/dailyEvents"
-        self.garmin_connect_activities = (
-            "/activitylist-service/activities/search/activities"
-        )
-        self.garmin_connect_activities_baseurl = (
-            "/activitylist-service/activities/"
-        )
-        self.garmin_connect_activity = "/activity-service/activity"
-        self.garmin_connect_activity_types = (
-            "/activity-service/activity/activityTypes"
-        )
-        self.garmin_connect_activity_fordate = (
-            "/mobile-gateway/heartRate/forDate"
-        )
-        self.garmin_connect_fitnessstats = "/fitnessstats-service/activity"
-        self.garmin_connect_fitnessage = "/fitnessage-service/fitnessage"
+    def _request(self, method, path, /, **kwargs):
+        """
+        Send an authenticated request to connectapi through the rate
+        limiter, retrying failures the retry policy classifies as
+        transient. Raises GarminConnectTooManyRequestsError once 429
+        responses exhaust the retries or ask to wait longer than the
+        policy's max_backoff, and fails fast with
+        GarminConnectServiceUnavailableError while the circuit breaker
+        holds the service family open.
+        """
 
-        self.garmin_connect_fit_download = "/download-service/files/activity"
-        self.garmin_connect_tcx_download = (
-            "/download-service/export/tcx/activity"
-        )
-        self.garmin_connect_gpx_download = (
-            "/download-service/export/gpx/activity"
-        )
-        self.garmin_connect_kml_download = (
-            "/download-service/export/kml/activity"
-        )
-        self.garmin_connect_csv_download = (
-            "/download-service/export/csv/activity"
-        )
+        limiter, policy = self.rate_limiter, self.retry_policy
+        breaker = self.circuit_breaker
+        endpoint = telemetry.endpoint_template(path, self.display_name)
+        family = service_family(path)
+        attempt = 0
+        while True:
+            wait = breaker.allow(family)
+            if wait is not None:
+                raise GarminConnectServiceUnavailableError(
+                    f"{family} is failing, next probe in {wait:.0f}s"
+                )
+            if limiter is not None:
+                limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.garth.request(
+                    method, "connectapi", path, api=True, headers={}, **kwargs
+                )
+            except (GarthHTTPError, requests.RequestException) as err:
+                status = ratelimit.status_code(err)
+                delay = ratelimit.retry_after(err)
+                if breaker.is_failure(status):
+                    breaker.record_failure(family)
+                else:
+                    breaker.record_success(family)
+                if status == 429 and limiter is not None:
+                    # Other callers wait at most as long as a retry would
+                    limiter.on_throttle(
+                        None if delay is None else policy.delay(0, delay)
+                    )
+                # A Retry-After past the longest backoff is not waited out
+                retry = (
+                    attempt < policy.max_retries
+                    and policy.is_retryable(err, method)
+                    and (delay is None or delay <= policy.max_backoff)
+                )
+                self.telemetry.record(
+                    method,
+                    endpoint,
+                    time.perf_counter() - started,
+                    status,
+                    retried=retry,
+                )
+                if not retry:
+                    if status == 429:
+                        raise GarminConnectTooManyRequestsError(
+                            f"Too many requests for {path}"
+                        ) from err
+                    raise
+                delay = policy.delay(attempt, delay)
+                attempt += 1
+                logger.warning(
+                    "%s %s failed (%s), retry %d in %.1fs",
+                    method,
+                    path,
+                    status or type(err).__name__,
+                    attempt,
+                    delay,
+                )
+                _rewind_files(kwargs.get("files"))
+                time.sleep(delay)
+                continue
+            if kwargs.get("stream"):
+                nbytes = int(response.headers.get("Content-Length") or 0)
+            else:
+                nbytes = len(response.content)
+            self.telemetry.record(
+                method,
+                endpoint,
+                time.perf_counter() - started,
+                response.status_code,
+                nbytes,
+            )
+            breaker.record_success(family)
+            if limiter is not None:
+                limiter.on_success()
+            return response
 
-        self.garmin_connect_upload = "/upload-service/upload"
+    def service_health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the circuit breaker state of every service family: 'state'
+        ('closed', 'open' or 'half_open'), consecutive 'failures' and
+        'retry_in', the seconds until an open family is probed again.
+        """
 
-        self.garmin_connect_gear = "/gear-service/gear/filterGear"
-        self.garmin_connect_gear_baseurl = "/gear-service/gear/"
+        closed = {"state": "closed", "failures": 0, "retry_in": 0.0}
+        health = {family: dict(closed) for family in self.SERVICE_FAMILIES}
+        health.update(self.circuit_breaker.health())
+        return dict(sorted(health.items()))
 
-        self.garmin_request_reload_url = (
-            "/wellness-service/wellness/epoch/request"
-        )
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a snapshot of per-endpoint request statistics keyed by
+        'METHOD /endpoint/{template}': request and retry counts, response
+        bytes, status codes and a latency histogram.
+        """
 
-        self.garmin_workouts = "/workout-service"
+        return self.telemetry.snapshot()
 
-        self.garmin_connect_delete_activity_url = "/activity-service/activity"
+    def dump_metrics(self, path: str):
+        """Write the request statistics to 'path' in Prometheus text format."""
 
-        self.garmin_graphql_endpoint = "graphql-gateway/graphql"
+        self.telemetry.write_prometheus(path)
 
-        self.garth = garth.Client(
-            domain="garmin.cn" if is_cn else "garmin.com",
-            pool_connections=20,
-            pool_maxsize=20,
-        )
+    def _iter_pages(self, url, params, start=0, page_size=20, prefetch=1):
+        """
+        Yield the non-empty pages of a start/limit paginated endpoint in
+        server order, stopping at the first empty page. With 'prefetch'
+        above 1 a sliding window of that many pages is requested
+        concurrently.
+        """
 
-        self.display_name = None
-        self.full_name = None
-        self.unit_system = None
+        params = {**params, "limit": str(page_size)}
 
-    def connectapi(self, path, **kwargs):
-        return self.garth.connectapi(path, **kwargs)
+        def fetch(offset):
+            logger.debug(f"Requesting page {offset} to {offset + page_size}")
+            return self.connectapi(
+                url, params={**params, "start": str(offset)}
+            )
 
-    def download(self, path, **kwargs):
-        return self.garth.download(path, **kwargs)
+        if prefetch <= 1:
+            while True:
+                page = fetch(start)
+                if not page:
+                    return
+                yield page
+                start += page_size
+
+        pool = ThreadPoolExecutor(max_workers=prefetch)
+        try:
+            window = deque()
+            for _ in range(prefetch):
+                window.append(pool.submit(fetch, start))
+                start += page_size
+            while window:
+                page = window.popleft().result()
+                if not page:
+                    return
+                yield page
+                window.append(pool.submit(fetch, start))
+                start += page_size
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def login(
+        self, /, tokenstore: Optional[str] = None, refresh_profile=False
+    ):
+        """
+        Log in using Garth.
 
-    def login(self, /, tokenstore: Optional[str] = None):
-        """Log in using Garth."""
+        When resuming from a tokenstore directory, the profile, display name
+        and unit system saved there by an earlier login are reused, so no
+        request is made while they are younger than PROFILE_MAX_AGE and
+        belong to the stored tokens. Pass refresh_profile=True to fetch
+        them again.
+        """
         tokenstore = tokenstore or os.getenv("GARMINTOKENS")
+        profile_dir = None
 
         if tokenstore:
             if len(tokenstore) > 512:
                 self.garth.loads(tokenstore)
             else:
                 self.garth.load(tokenstore)
+                profile_dir = os.path.expanduser(tokenstore)
         else:
             self.garth.login(
                 self.username, self.password, prompt_mfa=self.prompt_mfa
             )
 
+        if (
+            profile_dir
+            and not refresh_profile
+            and self._load_profile(profile_dir)
+        ):
+            return True
+
         self.display_name = self.garth.profile["displayName"]
         self.full_name = self.garth.profile["fullName"]
 
-        settings = self.garth.connectapi(self.garmin_connect_user_settings_url)
+        settings = self.connectapi(self.garmin_connect_user_settings_url)
         self.unit_system = settings["userData"]["measurementSystem"]
 
+        if profile_dir:
+            self._save_profile(profile_dir)
+
+        return True
+
+    def _token_fingerprint(self) -> Optional[str]:
+        token = self.garth.oauth1_token
+        if token is None:
+            return None
+        secret = f"{token.oauth_token}:{token.oauth_token_secret}"
+        return hashlib.sha256(secret.encode()).hexdigest()
+
+    def _load_profile(self, dir_path: str) -> bool:
+        """Restore the saved profile, returning False if it is unusable."""
+
+        try:
+            with open(os.path.join(dir_path, self.PROFILE_FILE)) as f:
+                saved = json.load(f)
+            saved_at = datetime.fromisoformat(saved["saved_at"])
+            fresh = (
+                datetime.now(timezone.utc) - saved_at < self.PROFILE_MAX_AGE
+            )
+            if not fresh or saved["token"] != self._token_fingerprint():
+                return False
+            profile = saved["profile"]
+            display_name = profile["displayName"]
+            full_name = profile["fullName"]
+            unit_system = saved["unit_system"]
+        except (OSError, ValueError, TypeError, KeyError) as err:
+            logger.debug(f"Ignoring saved profile in {dir_path}: {err}")
+            return False
+
+        self.garth._user_profile = profile
+        self.display_name = display_name
+        self.full_name = full_name
+        self.unit_system = unit_system
         return True
 
+    def _save_profile(self, dir_path: str):
+        saved = {
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "token": self._token_fingerprint(),
+            "profile": self.garth.profile,
+            "unit_system": self.unit_system,
+        }
+        path = os.path.join(dir_path, self.PROFILE_FILE)
+        partial = f"{path}.tmp"
+        try:
+            with open(partial, "w") as f:
+                json.dump(saved, f, indent=4)
+            os.replace(partial, path)
+        except OSError as err:
+            logger.warning(f"Could not save profile to {dir_path}: {err}")
+
     def get_full_name(self):
         """Return full name."""
 
@@ -296,10 +736,13 @@ class Garmin:
     def get_daily_steps(self, start, end):
         """Fetch available steps data 'start' and 'end' format 'YYYY-MM-DD'."""
 
-        url = f"{self.garmin_connect_daily_stats_steps_url}/{start}/{end}"
+        def fetch(start, end):
+            url = f"{self.garmin_connect_daily_stats_steps_url}/{start}/{end}"
+            return self.connectapi(url)
+
         logger.debug("Requesting daily steps data")
 
-        return self.connectapi(url)
+        return self._fetch_range_chunks("get_daily_steps", fetch, start, end)
 
     def get_heart_rates(self, cdate):
         """Fetch available heart rates data 'cDate' format 'YYYY-MM-DD'."""
@@ -328,11 +771,17 @@ class Garmin:
 
         if enddate is None:
             enddate = startdate
-        url = f"{self.garmin_connect_weight_url}/weight/dateRange"
-        params = {"startDate": str(startdate), "endDate": str(enddate)}
+
+        def fetch(start, end):
+            url = f"{self.garmin_connect_weight_url}/weight/dateRange"
+            params = {"startDate": start, "endDate": end}
+            return self.connectapi(url, params=params)
+
         logger.debug("Requesting body composition")
 
-        return self.connectapi(url, params=params)
+        return self._fetch_range_chunks(
+            "get_body_composition", fetch, startdate, enddate
+        )
 
     def add_body_composition(
         self,
@@ -350,6 +799,9 @@ class Garmin:
         visceral_fat_rating: Optional[float] = None,
         bmi: Optional[float] = None,
     ):
+        # Only needed here, so keep it off the import path of the package
+        from withings_sync import fit
+
         dt = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
         fitEncoder = fit.FitEncoderWeight()
         fitEncoder.write_file_info()
@@ -376,7 +828,7 @@ class Garmin:
         files = {
             "file": ("body_composition.fit", fitEncoder.getvalue()),
         }
-        return self.garth.post("connectapi", url, files=files, api=True)
+        return self._request("POST", url, files=files)
 
     def add_weigh_in(
         self, weight: int, unitKey: str = "kg", timestamp: str = ""
@@ -396,7 +848,7 @@ class Garmin:
         }
         logger.debug("Adding weigh-in")
 
-        return self.garth.post("connectapi", url, json=payload)
+        return self._request("POST", url, json=payload)
 
     def add_weigh_in_with_timestamps(
         self,
@@ -434,16 +886,23 @@ class Garmin:
         logger.debug(f"Adding weigh-in with explicit timestamps: {payload}")
 
         # Make the POST request
-        return self.garth.post("connectapi", url, json=payload)
+        return self._request("POST", url, json=payload)
 
     def get_weigh_ins(self, startdate: str, enddate: str):
         """Get weigh-ins between startdate and enddate using format 'YYYY-MM-DD'."""
 
-        url = f"{self.garmin_connect_weight_url}/weight/range/{startdate}/{enddate}"
-        params = {"includeAll": True}
+        def fetch(start, end):
+            url = (
+                f"{self.garmin_connect_weight_url}/weight/range/{start}/{end}"
+            )
+            params = {"includeAll": True}
+            return self.connectapi(url, params=params)
+
         logger.debug("Requesting weigh-ins")
 
-        return self.connectapi(url, params=params)
+        return self._fetch_range_chunks(
+            "get_weigh_ins", fetch, startdate, enddate
+        )
 
     def get_daily_weigh_ins(self, cdate: str):
         """Get weigh-ins for 'cdate' format 'YYYY-MM-DD'."""
@@ -459,12 +918,7 @@ class Garmin:
         url = f"{self.garmin_connect_weight_url}/weight/{cdate}/byversion/{weight_pk}"
         logger.debug("Deleting weigh-in")
 
-        return self.garth.request(
-            "DELETE",
-            "connectapi",
-            url,
-            api=True,
-        )
+        return self._request("DELETE", url)
 
     def delete_weigh_ins(self, cdate: str, delete_all: bool = False):
         """
@@ -500,11 +954,17 @@ class Garmin:
 
         if enddate is None:
             enddate = startdate
-        url = self.garmin_connect_daily_body_battery_url
-        params = {"startDate": str(startdate), "endDate": str(enddate)}
+
+        def fetch(start, end):
+            url = self.garmin_connect_daily_body_battery_url
+            params = {"startDate": start, "endDate": end}
+            return self.connectapi(url, params=params)
+
         logger.debug("Requesting body battery data")
 
-        return self.connectapi(url, params=params)
+        return self._fetch_range_chunks(
+            "get_body_battery", fetch, startdate, enddate
+        )
 
     def get_body_battery_events(self, cdate: str) -> List[Dict[str, Any]]:
         """
@@ -546,7 +1006,7 @@ class Garmin:
 
         logger.debug("Adding blood pressure")
 
-        return self.garth.post("connectapi", url, json=payload)
+        return self._request("POST", url, json=payload)
 
     def get_blood_pressure(
         self, startdate: str, enddate=None
@@ -558,23 +1018,26 @@ class Garmin:
 
         if enddate is None:
             enddate = startdate
-        url = f"{self.garmin_connect_blood_pressure_endpoint}/{startdate}/{enddate}"
-        params = {"includeAll": True}
+
+        def fetch(start, end):
+            url = (
+                f"{self.garmin_connect_blood_pressure_endpoint}/{start}/{end}"
+            )
+            params = {"includeAll": True}
+            return self.connectapi(url, params=params)
+
         logger.debug("Requesting blood pressure data")
 
-        return self.connectapi(url, params=params)
+        return self._fetch_range_chunks(
+            "get_blood_pressure", fetch, startdate, enddate
+        )
 
     def delete_blood_pressure(self, version: str, cdate: str):
         """Delete specific blood pressure measurement."""
         url = f"{self.garmin_connect_set_blood_pressure_endpoint}/{cdate}/{version}"
         logger.debug("Deleting blood pressure measurement")
 
-        return self.garth.request(
-            "DELETE",
-            "connectapi",
-            url,
-            api=True,
-        )
+        return self._request("DELETE", url)
 
     def get_max_metrics(self, cdate: str) -> Dict[str, Any]:
         """Return available max metric data for 'cdate' format 'YYYY-MM-DD'."""
@@ -621,7 +1084,7 @@ class Garmin:
 
         logger.debug("Adding hydration data")
 
-        return self.garth.put("connectapi", url, json=payload)
+        return self._request("PUT", url, json=payload)
 
     def get_hydration_data(self, cdate: str) -> Dict[str, Any]:
         """Return available hydration data 'cdate' format 'YYYY-MM-DD'."""
@@ -674,6 +1137,65 @@ class Garmin:
 
         return self.connectapi(url)
 
+    def fetch_range(self, metric: str, start, end, workers: int = 8):
+        """
+        Call a per-day method such as 'get_sleep_data' for every date from
+        'start' through 'end' (format 'YYYY-MM-DD') on a pool of 'workers'
+        threads.
+        Returns a (results, failures) tuple of dicts keyed by 'YYYY-MM-DD'
+        in date order; a day that raised is reported in failures with its
+        exception instead of aborting the range.
+        """
+
+        if metric not in self.DAILY_METRICS:
+            raise ValueError(
+                f"metric must be one of {sorted(self.DAILY_METRICS)}"
+            )
+        first = date.fromisoformat(str(start))
+        last = date.fromisoformat(str(end))
+        days = [
+            str(first + timedelta(days=n))
+            for n in range((last - first).days + 1)
+        ]
+        method = getattr(self, metric)
+        logger.debug(f"Requesting {metric} from {start} to {end}")
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {day: pool.submit(method, day) for day in days}
+
+        results, failures = {}, {}
+        for day, future in futures.items():
+            error = future.exception()
+            if error is None:
+                results[day] = future.result()
+            else:
+                logger.warning(f"Failed to fetch {metric} for {day}: {error}")
+                failures[day] = error
+
+        return results, failures
+
+    def _fetch_range_chunks(self, method, fetch, start, end, workers=4):
+        """
+        Call fetch(start, end) for each server-legal chunk of the range per
+        RANGE_LIMITS[method], concurrently, and merge the chunk responses
+        in date order (see ranges.merge_chunks).
+        """
+
+        max_days, align = self.RANGE_LIMITS[method]
+        try:
+            spans = ranges.split_range(start, end, max_days, align)
+        except ValueError:
+            spans = []
+        if len(spans) <= 1:
+            return fetch(str(start), str(end))
+
+        logger.debug(f"Splitting {method} into {len(spans)} chunks")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(
+                pool.map(lambda span: fetch(str(span[0]), str(span[1])), spans)
+            )
+        return ranges.merge_chunks(results)
+
     def get_personal_record(self) -> Dict[str, Any]:
         """Return personal records for current user."""
 
@@ -800,15 +1322,21 @@ class Garmin:
 
             return self.connectapi(url, params=params)
         else:
-            url = f"{self.garmin_connect_endurance_score_url}/stats"
-            params = {
-                "startDate": str(startdate),
-                "endDate": str(enddate),
-                "aggregation": "weekly",
-            }
+
+            def fetch(start, end):
+                url = f"{self.garmin_connect_endurance_score_url}/stats"
+                params = {
+                    "startDate": start,
+                    "endDate": end,
+                    "aggregation": "weekly",
+                }
+                return self.connectapi(url, params=params)
+
             logger.debug("Requesting endurance score data for a range of days")
 
-            return self.connectapi(url, params=params)
+            return self._fetch_range_chunks(
+                "get_endurance_score", fetch, startdate, enddate
+            )
 
     def get_race_predictions(self, startdate=None, enddate=None, _type=None):
         """
@@ -839,15 +1367,18 @@ class Garmin:
         elif (
             _type is not None and startdate is not None and enddate is not None
         ):
-            url = (
-                self.garmin_connect_race_predictor_url
-                + f"/{_type}/{self.display_name}"
+
+            def fetch(start, end):
+                url = (
+                    self.garmin_connect_race_predictor_url
+                    + f"/{_type}/{self.display_name}"
+                )
+                params = {"fromCalendarDate": start, "toCalendarDate": end}
+                return self.connectapi(url, params=params)
+
+            return self._fetch_range_chunks(
+                "get_race_predictions", fetch, startdate, enddate
             )
-            params = {
-                "fromCalendarDate": str(startdate),
-                "toCalendarDate": str(enddate),
-            }
-            return self.connectapi(url, params=params)
 
         else:
             raise ValueError(
@@ -884,15 +1415,21 @@ class Garmin:
             return self.connectapi(url, params=params)
 
         else:
-            url = f"{self.garmin_connect_hill_score_url}/stats"
-            params = {
-                "startDate": str(startdate),
-                "endDate": str(enddate),
-                "aggregation": "daily",
-            }
+
+            def fetch(start, end):
+                url = f"{self.garmin_connect_hill_score_url}/stats"
+                params = {
+                    "startDate": start,
+                    "endDate": end,
+                    "aggregation": "daily",
+                }
+                return self.connectapi(url, params=params)
+
             logger.debug("Requesting hill score data for a range of days")
 
-            return self.connectapi(url, params=params)
+            return self._fetch_range_chunks(
+                "get_hill_score", fetch, startdate, enddate
+            )
 
     def get_devices(self) -> List[Dict[str, Any]]:
         """Return available devices for the current user account."""
@@ -958,20 +1495,56 @@ class Garmin:
 
         return self.connectapi(url)
 
-    def get_activities(self, start: int = 0, limit: int = 20):
+    def get_activities(
+        self, start: int = 0, limit: int = 20, activitytype=None
+    ):
         """
         Return available activities.
         :param start: Starting activity offset, where 0 means the most recent activity
         :param limit: Number of activities to return
+        :param activitytype: (Optional) Only return activities of this type,
+                             filtered by the server
         :return: List of activities from Garmin
         """
 
         url = self.garmin_connect_activities
         params = {"start": str(start), "limit": str(limit)}
+        if activitytype:
+            params["activityType"] = str(activitytype)
         logger.debug("Requesting activities")
 
         return self.connectapi(url, params=params)
 
+    def iter_activities(
+        self, start=0, page_size=20, predicate=None, activitytype=None
+    ):
+        """
+        Lazily yield activities, most recent first, fetching one page of
+        'page_size' at a time only as the caller consumes them.
+        :param start: Starting activity offset, where 0 means the most recent activity
+        :param page_size: Number of activities requested per page
+        :param predicate: (Optional) Callable; only activities for which it
+                          returns true are yielded
+        :param activitytype: (Optional) Only list activities of this type,
+                             filtered by the server so that pages hold
+                             nothing but matches
+        :return: Generator of activities, e.g. take the first N runs with
+                 itertools.islice(api.iter_activities(activitytype="running"), N)
+        """
+
+        url = self.garmin_connect_activities
+        params = {}
+        if activitytype:
+            params["activityType"] = str(activitytype)
+        logger.debug("Iterating activities")
+
+        for page in self._iter_pages(
+            url, params, start=start, page_size=page_size
+        ):
+            for activity in page:
+                if predicate is None or predicate(activity):
+                    yield activity
+
     def get_activities_fordate(self, fordate: str):
         """Return available activities for date."""
 
@@ -986,7 +1559,7 @@ class Garmin:
         url = f"{self.garmin_connect_activity}/{activity_id}"
         payload = {"activityId": activity_id, "activityName": title}
 
-        return self.garth.put("connectapi", url, json=payload, api=True)
+        return self._request("PUT", url, json=payload)
 
     def set_activity_type(
         self, activity_id, type_id, type_key, parent_type_id
@@ -1001,12 +1574,12 @@ class Garmin:
             },
         }
         logger.debug(f"Changing activity type: {str(payload)}")
-        return self.garth.put("connectapi", url, json=payload, api=True)
+        return self._request("PUT", url, json=payload)
 
     def create_manual_activity_from_json(self, payload):
         url = f"{self.garmin_connect_activity}"
         logger.debug(f"Uploading manual activity: {str(payload)}")
-        return self.garth.post("connectapi", url, json=payload, api=True)
+        return self._request("POST", url, json=payload)
 
     def create_manual_activity(
         self,
@@ -1063,31 +1636,143 @@ class Garmin:
         )
 
         if allowed_file_extension:
-            files = {
-                "file": (file_base_name, open(activity_path, "rb" or "r")),
-            }
-            url = self.garmin_connect_upload
-            return self.garth.post("connectapi", url, files=files, api=True)
+            with open(activity_path, "rb") as activity_file:
+                files = {
+                    "file": (file_base_name, activity_file),
+                }
+                url = self.garmin_connect_upload
+                return self._request("POST", url, files=files)
         else:
             raise GarminConnectInvalidFileFormatError(
                 f"Could not upload {activity_path}"
             )
 
+    def upload_activities(
+        self,
+        paths,
+        workers: int = 4,
+        ledger: Optional[UploadLedger] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload many activity files on a pool of 'workers' threads. 'paths'
+        may name files or directories, which are searched recursively for
+        files in an ActivityUploadFormat.
+        Files whose content hash is in 'ledger', or repeats a file already
+        sent in the batch, are skipped; a copy waits for the upload of its
+        content and is tried itself if that upload fails. Uploads and 409
+        duplicates are recorded in the ledger. Returns a report with one
+        result per file ('path', 'sha256', 'status' of uploaded, duplicate,
+        skipped or failed, 'bytes', 'seconds' and 'error') plus totals and
+        throughput.
+        """
+
+        files = []
+        for path in map(os.fspath, paths):
+            if not os.path.isdir(path):
+                files.append(path)
+                continue
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.rsplit(".", 1)[-1].upper()
+                    in Garmin.ActivityUploadFormat.__members__
+                )
+        logger.debug(f"Uploading {len(files)} activity files")
+
+        # Content hashes uploaded in this batch, and the uploads in flight
+        # that identical files wait on
+        sent_hashes: Set[str] = set()
+        claims: Dict[str, threading.Event] = {}
+        claim_lock = threading.Lock()
+
+        def claim(digest):
+            """Return True to upload 'digest', False if a copy was sent."""
+            while True:
+                with claim_lock:
+                    if digest in sent_hashes:
+                        return False
+                    pending = claims.get(digest)
+                    if pending is None:
+                        claims[digest] = threading.Event()
+                        return True
+                pending.wait()
+
+        def release(digest, succeeded):
+            with claim_lock:
+                if succeeded:
+                    sent_hashes.add(digest)
+                claims.pop(digest).set()
+
+        def upload(path):
+            result = {"path": path, "sha256": None, "bytes": 0, "error": None}
+            started = time.perf_counter()
+            try:
+                result["bytes"] = os.path.getsize(path)
+                digest = result["sha256"] = file_sha256(path)
+                in_ledger = ledger is not None and digest in ledger
+                if in_ledger or not claim(digest):
+                    result["status"] = "skipped"
+                    return result
+                # A failed upload releases the claim so a copy is retried
+                succeeded = False
+                try:
+                    self.upload_activity(path)
+                    result["status"] = "uploaded"
+                    succeeded = True
+                except GarthHTTPError as err:
+                    if ratelimit.status_code(err) != 409:
+                        raise
+                    result["status"] = "duplicate"
+                    succeeded = True
+                finally:
+                    release(digest, succeeded)
+                if ledger is not None:
+                    ledger.record(
+                        digest, path, result["bytes"], result["status"]
+                    )
+            except Exception as err:
+                logger.warning(f"Failed to upload {path}: {err}")
+                result["status"] = "failed"
+                result["error"] = err
+            finally:
+                result["seconds"] = time.perf_counter() - started
+            return result
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(upload, files))
+        elapsed = time.perf_counter() - started
+
+        sent = [r for r in results if r["status"] in ("uploaded", "duplicate")]
+        sent_bytes = sum(r["bytes"] for r in sent)
+        report = {
+            "results": results,
+            "seconds": elapsed,
+            "bytes": sent_bytes,
+            "files_per_second": len(sent) / elapsed if elapsed else 0.0,
+            "bytes_per_second": sent_bytes / elapsed if elapsed else 0.0,
+        }
+        for status in ("uploaded", "duplicate", "skipped", "failed"):
+            report[status] = sum(r["status"] == status for r in results)
+        return report
+
     def delete_activity(self, activity_id):
         """Delete activity with specified id"""
 
         url = f"{self.garmin_connect_delete_activity_url}/{activity_id}"
         logger.debug("Deleting activity with id %s", activity_id)
 
-        return self.garth.request(
-            "DELETE",
-            "connectapi",
-            url,
-            api=True,
-        )
+        return self._request("DELETE", url)
 
     def get_activities_by_date(
-        self, startdate, enddate=None, activitytype=None, sortorder=None
+        self,
+        startdate,
+        enddate=None,
+        activitytype=None,
+        sortorder=None,
+        page_size=20,
+        prefetch=1,
     ):
         """
         Fetch available activities between specific dates
@@ -1098,21 +1783,18 @@ class Garmin:
                              multi_sport, fitness_equipment, hiking, walking, other]
         :param sortorder: (Optional) sorting direction. By default, Garmin uses descending order by startLocal field.
                           Use "asc" to get activities from oldest to newest.
+        :param page_size: (Optional) Number of activities requested per page
+        :param prefetch: (Optional) Number of pages fetched concurrently.
+                         The result keeps the server's order either way.
         :return: list of JSON activities
         """
 
         activities = []
-        start = 0
-        limit = 20
         # mimicking the behavior of the web interface that fetches
         # 20 activities at a time
         # and automatically loads more on scroll
         url = self.garmin_connect_activities
-        params = {
-            "startDate": str(startdate),
-            "start": str(start),
-            "limit": str(limit),
-        }
+        params = {"startDate": str(startdate)}
         if enddate:
             params["endDate"] = str(enddate)
         if activitytype:
@@ -1123,15 +1805,10 @@ class Garmin:
         logger.debug(
             f"Requesting activities by date from {startdate} to {enddate}"
         )
-        while True:
-            params["start"] = str(start)
-            logger.debug(f"Requesting activities {start} to {start+limit}")
-            act = self.connectapi(url, params=params)
-            if act:
-                activities.extend(act)
-                start = start + limit
-            else:
-                break
+        for page in self._iter_pages(
+            url, params, page_size=page_size, prefetch=prefetch
+        ):
+            activities.extend(page)
 
         return activities
 
@@ -1179,29 +1856,28 @@ class Garmin:
         :return: list of goals in JSON format
         """
 
-        goals = []
-        url = self.garmin_connect_goals_url
-        params = {
-            "status": status,
-            "start": str(start),
-            "limit": str(limit),
-            "sortOrder": "asc",
-        }
-
         logger.debug(f"Requesting {status} goals")
-        while True:
-            params["start"] = str(start)
-            logger.debug(
-                f"Requesting {status} goals {start} to {start + limit - 1}"
-            )
-            goals_json = self.connectapi(url, params=params)
-            if goals_json:
-                goals.extend(goals_json)
-                start = start + limit
-            else:
-                break
 
-        return goals
+        return list(self.iter_goals(status, start=start, page_size=limit))
+
+    def iter_goals(self, status="active", start=1, page_size=30, prefetch=1):
+        """
+        Lazily yield goals based on status, one page of 'page_size' at a
+        time, with 'prefetch' pages requested concurrently ahead of the
+        caller.
+        :param status: Status of goals (valid options are "active", "future", or "past")
+        :param start: Initial goal index
+        :return: Generator of goals in JSON format
+        """
+
+        url = self.garmin_connect_goals_url
+        params = {"status": status, "sortOrder": "asc"}
+        logger.debug(f"Iterating {status} goals")
+
+        for page in self._iter_pages(
+            url, params, start=start, page_size=page_size, prefetch=prefetch
+        ):
+            yield from page
 
     def get_gear(self, userProfileNumber):
         """Return all user gear."""
@@ -1230,7 +1906,7 @@ class Garmin:
             f"{self.garmin_connect_gear_baseurl}{gearUUID}/"
             f"activityType/{activityType}{defaultGearString}"
         )
-        return self.garth.request(method_override, "connectapi", url, api=True)
+        return self._request(method_override, url)
 
     class ActivityDownloadFormat(Enum):
         """Activity variables."""
@@ -1246,14 +1922,7 @@ class Garmin:
         GPX = auto()
         TCX = auto()
 
-    def download_activity(
-        self, activity_id, dl_fmt=ActivityDownloadFormat.TCX
-    ):
-        """
-        Downloads activity in requested format and returns the raw bytes. For
-        "Original" will return the zip file content, up to user to extract it.
-        "CSV" will return a csv of the splits.
-        """
+    def _activity_download_url(self, activity_id, dl_fmt):
         activity_id = str(activity_id)
         urls = {
             Garmin.ActivityDownloadFormat.ORIGINAL: f"{self.garmin_connect_fit_download}/{activity_id}",  # noqa
@@ -1264,12 +1933,104 @@ class Garmin:
         }
         if dl_fmt not in urls:
             raise ValueError(f"Unexpected value {dl_fmt} for dl_fmt")
-        url = urls[dl_fmt]
+        return urls[dl_fmt]
+
+    def download_activity(
+        self, activity_id, dl_fmt=ActivityDownloadFormat.TCX
+    ):
+        """
+        Downloads activity in requested format and returns the raw bytes. For
+        "Original" will return the zip file content, up to user to extract it.
+        "CSV" will return a csv of the splits.
+        """
+        url = self._activity_download_url(activity_id, dl_fmt)
 
         logger.debug("Downloading activities from %s", url)
 
         return self.download(url)
 
+    def download_activity_to(
+        self,
+        activity_id,
+        destination,
+        dl_fmt=ActivityDownloadFormat.ORIGINAL,
+        extract_fit=True,
+        chunk_size=64 * 1024,
+    ):
+        """
+        Stream an activity download in chunks to 'destination', a file path
+        or a writable binary file object, without holding it in memory.
+        For "Original" the FIT file is extracted from the zip as it streams
+        unless 'extract_fit' is False. The written size is verified against
+        the zip headers or Content-Length, and a path is only replaced once
+        the download is complete. Returns the number of bytes written.
+        """
+        url = self._activity_download_url(activity_id, dl_fmt)
+        logger.debug("Streaming activity download from %s", url)
+
+        if hasattr(destination, "write"):
+            return self._stream_download(
+                url, destination, extract_fit, chunk_size
+            )
+
+        partial = f"{destination}.part"
+        try:
+            with open(partial, "wb") as out:
+                written = self._stream_download(
+                    url, out, extract_fit, chunk_size
+                )
+            os.replace(partial, destination)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(partial)
+            raise
+        return written
+
+    def _stream_download(self, url, out, extract_fit, chunk_size):
+        with self._request("GET", url, stream=True) as response:
+            try:
+                return self._write_download(
+                    response, url, out, extract_fit, chunk_size
+                )
+            except requests.RequestException as err:
+                # The connection broke off mid-body, after _request and
+                # its retries had returned
+                raise GarminConnectConnectionError(
+                    f"Download from {url} broke off: {err}"
+                ) from err
+
+    def _write_download(self, response, url, out, extract_fit, chunk_size):
+        chunks = response.iter_content(chunk_size)
+        first = next(chunks, b"")
+        chunks = itertools.chain([first], chunks)
+
+        if extract_fit and first.startswith(stream.ZIP_MAGIC):
+            try:
+                name, written = stream.extract_member(chunks, out)
+            except KeyError as err:
+                raise GarminConnectInvalidFileFormatError(
+                    f"No FIT file in download from {url}"
+                ) from err
+            except zipfile.BadZipFile as err:
+                raise GarminConnectConnectionError(
+                    f"Corrupt download from {url}: {err}"
+                ) from err
+            logger.debug("Extracted %s (%d bytes)", name, written)
+            return written
+
+        written = 0
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+        expected = response.headers.get("Content-Length")
+        encoding = response.headers.get("Content-Encoding", "identity")
+        if expected and encoding == "identity" and written != int(expected):
+            raise GarminConnectConnectionError(
+                f"Incomplete download from {url}: "
+                f"{written} of {expected} bytes"
+            )
+        return written
+
     def get_activity_splits(self, activity_id):
         """Return activity splits."""
 
@@ -1344,6 +2105,20 @@ class Garmin:
 
         return self.connectapi(url, params=params)
 
+    def get_activity_details_arrays(
+        self, activity_id, maxchart=2000, maxpoly=4000, dataframe=False
+    ):
+        """
+        Return activity details decoded into NumPy arrays per metric, or a
+        pandas DataFrame with dataframe=True, see
+        details.decode_activity_details. Requires numpy (and pandas).
+        """
+
+        return details.decode_activity_details(
+            self.get_activity_details(activity_id, maxchart, maxpoly),
+            dataframe=dataframe,
+        )
+
     def get_activity_exercise_sets(self, activity_id):
         """Return activity exercise sets."""
 
@@ -1367,6 +2142,65 @@ class Garmin:
 
         return self.connectapi(url, params=params)
 
+    def hydrate_activities(
+        self,
+        activity_ids,
+        parts: Optional[List[str]] = None,
+        workers: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch several parts of many activities concurrently on a pool of
+        'workers' threads. 'parts' are keys of ACTIVITY_PARTS and default
+        to DEFAULT_ACTIVITY_PARTS.
+        Returns one record per activity id, in order, holding 'activityId',
+        each part that was fetched, and an 'errors' dict mapping each part
+        that failed to its exception.
+        """
+
+        parts = list(parts or self.DEFAULT_ACTIVITY_PARTS)
+        unknown = set(parts) - set(self.ACTIVITY_PARTS)
+        if unknown:
+            raise ValueError(
+                f"parts must be among {sorted(self.ACTIVITY_PARTS)}, "
+                f"not {sorted(unknown)}"
+            )
+        activity_ids = [str(activity_id) for activity_id in activity_ids]
+        logger.debug(
+            f"Hydrating {len(activity_ids)} activities with parts {parts}"
+        )
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [
+                (
+                    activity_id,
+                    {
+                        part: pool.submit(
+                            getattr(self, self.ACTIVITY_PARTS[part]),
+                            activity_id,
+                        )
+                        for part in parts
+                    },
+                )
+                for activity_id in activity_ids
+            ]
+
+        records = []
+        for activity_id, part_futures in futures:
+            record = {"activityId": activity_id, "errors": {}}
+            for part, future in part_futures.items():
+                error = future.exception()
+                if error is None:
+                    record[part] = future.result()
+                else:
+                    logger.warning(
+                        f"Failed to fetch {part} of activity "
+                        f"{activity_id}: {error}"
+                    )
+                    record["errors"][part] = error
+            records.append(record)
+
+        return records
+
     def get_gear_ativities(self, gearUUID):
         """Return activities where gear uuid was used."""
 
@@ -1377,6 +2211,25 @@ class Garmin:
 
         return self.connectapi(url)
 
+    def iter_gear_activities(
+        self, gearUUID, start=0, page_size=100, prefetch=1
+    ):
+        """
+        Lazily yield activities where gear uuid was used, one page of
+        'page_size' at a time, with 'prefetch' pages requested
+        concurrently ahead of the caller.
+        """
+
+        gearUUID = str(gearUUID)
+
+        url = f"{self.garmin_connect_activities_baseurl}{gearUUID}/gear"
+        logger.debug("Iterating activities for gearUUID %s", gearUUID)
+
+        for page in self._iter_pages(
+            url, {}, start=start, page_size=page_size, prefetch=prefetch
+        ):
+            yield from page
+
     def get_user_profile(self):
         """Get all users settings."""
 
@@ -1402,7 +2255,7 @@ class Garmin:
         url = f"{self.garmin_request_reload_url}/{cdate}"
         logger.debug(f"Requesting reload of data for {cdate}.")
 
-        return self.garth.post("connectapi", url, api=True)
+        return self._request("POST", url)
 
     def get_workouts(self, start=0, end=100):
         """Return workouts from start till end."""
@@ -1412,6 +2265,20 @@ class Garmin:
         params = {"start": start, "limit": end}
         return self.connectapi(url, params=params)
 
+    def iter_workouts(self, start=0, page_size=100, prefetch=1):
+        """
+        Lazily yield workouts, one page of 'page_size' at a time, with
+        'prefetch' pages requested concurrently ahead of the caller.
+        """
+
+        url = f"{self.garmin_workouts}/workouts"
+        logger.debug("Iterating workouts")
+
+        for page in self._iter_pages(
+            url, {}, start=start, page_size=page_size, prefetch=prefetch
+        ):
+            yield from page
+
     def get_workout_by_id(self, workout_id):
         """Return workout by id."""
 
@@ -1466,9 +2333,82 @@ class Garmin:
 
         logger.debug(f"Querying Garmin GraphQL Endpoint with query: {query}")
 
-        return self.garth.post(
-            "connectapi", self.garmin_graphql_endpoint, json=query
-        ).json()
+        return _json_loads(
+            self._request(
+                "POST", self.garmin_graphql_endpoint, json=query
+            ).content
+        )
+
+    def query_garmin_graphql_batch(
+        self,
+        queries: List[Any],
+        max_document_size: int = 8192,
+        workers: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run many GraphQL queries with few requests. Each query is a dict as
+        taken by query_garmin_graphql or a bare query string. The top-level
+        fields of queries without variables are aliased and merged into
+        documents of at most 'max_document_size' characters, which are
+        sent on a pool of 'workers' threads; queries that cannot be merged
+        are sent on their own.
+        Returns one response per query, in order, shaped as if that query
+        had been sent alone. A request that fails only fails its own
+        queries: each gets a response with null data and the error.
+        """
+
+        queries = [
+            query if isinstance(query, dict) else {"query": query}
+            for query in queries
+        ]
+        # Only a bare query document can share a request; variables or an
+        # operation name mean the query is sent as given
+        fields = [
+            (
+                graphql.split_fields(query.get("query") or "")
+                if not (set(query) - {"query", "variables"})
+                and not query.get("variables")
+                else None
+            )
+            for query in queries
+        ]
+        batches = graphql.build_batches(fields, max_document_size)
+        alone = [i for i, split in enumerate(fields) if split is None]
+        logger.debug(
+            f"Sending {len(queries)} GraphQL queries as {len(batches)} "
+            f"batches and {len(alone)} single queries"
+        )
+
+        results: Dict[int, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            batch_futures = [
+                (
+                    pool.submit(self.query_garmin_graphql, {"query": doc}),
+                    aliases,
+                )
+                for doc, aliases in batches
+            ]
+            alone_futures = [
+                (i, pool.submit(self.query_garmin_graphql, queries[i]))
+                for i in alone
+            ]
+
+        def outcome(future):
+            try:
+                return future.result()
+            except Exception as err:
+                logger.warning(f"GraphQL request failed: {err}")
+                return graphql.failed_result(err)
+
+        for future, aliases in batch_futures:
+            for i, result in graphql.split_result(
+                outcome(future), aliases
+            ).items():
+                results[i] = result
+        for i, future in alone_futures:
+            results[i] = outcome(future)
+
+        return [results[i] for i in range(len(queries))]
 
     def logout(self):
         """Log user out of session."""
@@ -1478,10 +2418,34 @@ class Garmin:
         )
 
 
+class _Flight:
+    """A connectapi call in progress that identical calls can wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _rewind_files(files):
+    """Rewind file objects of a multipart upload before it is resent."""
+
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+
+
 class GarminConnectConnectionError(Exception):
     """Raised when communication ended in error."""
 
 
+class GarminConnectServiceUnavailableError(GarminConnectConnectionError):
+    """Raised when a service family is failing and requests are refused."""
+
+
 class GarminConnectTooManyRequestsError(Exception):
     """Raised when rate limit is exceeded."""
 
@@ -1492,3 +2456,6 @@ class GarminConnectAuthenticationError(Exception):
 
 class GarminConnectInvalidFileFormatError(Exception):
     """Raised when an invalid file format is passed to upload."""
+
+
+from .aio import AsyncGarmin  # noqa: E402, F401  isort:skip
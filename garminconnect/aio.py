@@ -0,0 +1,115 @@
+"""Asyncio front-end for the Garmin Connect API wrapper."""
+
+import asyncio
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from . import Garmin
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 32
+
+
+class AsyncGarmin:
+    """
+    Asyncio client exposing every public ``Garmin`` method as a coroutine
+    (generator methods such as ``iter_activities`` become async generators).
+
+    Calls are dispatched on the pooled garth session of a wrapped ``Garmin``
+    instance, so tokens loaded, refreshed or dumped through either client are
+    shared. At most ``concurrency`` requests are in flight at once; the HTTP
+    connection pool is sized to match.
+    """
+
+    ActivityDownloadFormat = Garmin.ActivityDownloadFormat
+    ActivityUploadFormat = Garmin.ActivityUploadFormat
+
+    def __init__(
+        self,
+        email=None,
+        password=None,
+        is_cn=False,
+        prompt_mfa=None,
+        *,
+        client: Optional[Garmin] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        """Create a new instance, optionally wrapping an existing client."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.garmin = client or Garmin(
+            email, password, is_cn=is_cn, prompt_mfa=prompt_mfa
+        )
+        self.concurrency = concurrency
+        self.garmin.garth.configure(
+            pool_connections=concurrency, pool_maxsize=concurrency
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="garminconnect"
+        )
+
+    @property
+    def garth(self):
+        """Return the garth client shared with the wrapped ``Garmin``."""
+
+        return self.garmin.garth
+
+    def __getattr__(self, name):
+        # Plain attributes such as display_name come from the wrapped client.
+        if name == "garmin":
+            raise AttributeError(name)
+        return getattr(self.garmin, name)
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def close(self):
+        """Wait for in-flight calls and release the worker threads."""
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _mirror(name, func):
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self.garmin, name), *args, **kwargs)
+
+    return method
+
+
+def _mirror_generator(name, func):
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        iterator = getattr(self.garmin, name)(*args, **kwargs)
+        done = object()
+        while True:
+            item = await self._run(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    return method
+
+
+for _name, _func in inspect.getmembers(Garmin, inspect.isfunction):
+    if not _name.startswith("_") and not hasattr(AsyncGarmin, _name):
+        if inspect.isgeneratorfunction(_func):
+            setattr(AsyncGarmin, _name, _mirror_generator(_name, _func))
+        else:
+            setattr(AsyncGarmin, _name, _mirror(_name, _func))
@@ -0,0 +1,138 @@
+"""Circuit breaker per Garmin Connect service family."""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def service_family(path: str) -> str:
+    """Return the service family of a path, e.g. 'wellness-service'."""
+
+    return path.split("?", 1)[0].strip("/").split("/", 1)[0]
+
+
+class _Circuit:
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breakers keyed by service family.
+
+    A family opens after 'failure_threshold' consecutive failures
+    (connection errors, timeouts and 'failure_statuses'), and requests to
+    it then fail fast. After 'reset_timeout' seconds one probe request is
+    let through (half-open): success closes the circuit, failure opens it
+    for another 'reset_timeout'. Other families are unaffected.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        failure_statuses: Tuple[int, ...] = (500, 502, 503, 504),
+        families: Iterable[str] = (),
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_statuses = failure_statuses
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {
+            family: _Circuit() for family in families
+        }
+
+    def _circuit(self, family: str) -> _Circuit:
+        circuit = self._circuits.get(family)
+        if circuit is None:
+            circuit = self._circuits[family] = _Circuit()
+        return circuit
+
+    def allow(self, family: str) -> Optional[float]:
+        """
+        Claim permission to send a request to 'family'. Returns None when
+        allowed, otherwise the seconds until a probe will be let through.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(family)
+            if circuit.state == CLOSED:
+                return None
+            # Open, or half-open with a probe in flight
+            remaining = circuit.opened_at + self.reset_timeout - now
+            if remaining > 0:
+                return remaining
+            # Let one probe through; restarting the clock means a probe
+            # that never reports back is replaced after another timeout
+            circuit.state = HALF_OPEN
+            circuit.opened_at = now
+            logger.info("Probing %s", family)
+            return None
+
+    def is_failure(self, status: Optional[int]) -> bool:
+        """Whether a response status (None for no response) counts."""
+
+        return status is None or status in self.failure_statuses
+
+    def record_success(self, family: str):
+        with self._lock:
+            circuit = self._circuit(family)
+            if circuit.state != CLOSED:
+                logger.info("Circuit for %s closed", family)
+            circuit.state = CLOSED
+            circuit.failures = 0
+
+    def record_failure(self, family: str):
+        with self._lock:
+            circuit = self._circuit(family)
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or (
+                circuit.state == CLOSED
+                and circuit.failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    "Circuit for %s opened after %d failures",
+                    family,
+                    circuit.failures,
+                )
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+
+    def reset(self, family: Optional[str] = None):
+        """Close one family's circuit, or every circuit."""
+
+        with self._lock:
+            for name in [family] if family else list(self._circuits):
+                self._circuits[name] = _Circuit()
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return each family's state ('closed', 'open' or 'half_open'),
+        consecutive failure count and seconds until the next probe.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            health = {}
+            for family, circuit in sorted(self._circuits.items()):
+                retry_in = 0.0
+                if circuit.state != CLOSED:
+                    retry_in = max(
+                        0.0, circuit.opened_at + self.reset_timeout - now
+                    )
+                health[family] = {
+                    "state": circuit.state,
+                    "failures": circuit.failures,
+                    "retry_in": retry_in,
+                }
+            return health
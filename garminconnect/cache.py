@@ -0,0 +1,196 @@
+"""SQLite-backed response cache for Garmin Connect API calls."""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "~/.garminconnect/cache.sqlite"
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class CacheRule:
+    """
+    Caching policy for the endpoints whose path starts with 'prefix'.
+
+    Responses expire after 'ttl' seconds. When 'immutable_after_days' is
+    set, responses for a calendar date at least that many days in the past
+    (taken from the path or params) never expire.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        ttl: float,
+        immutable_after_days: Optional[int] = None,
+    ):
+        self.prefix = "/" + prefix.lstrip("/")
+        self.ttl = ttl
+        self.immutable_after_days = immutable_after_days
+
+    def expires_at(self, path: str, params: Optional[Dict], now: float):
+        """Return the expiry timestamp for a response, None for never."""
+
+        if self.immutable_after_days is not None:
+            dates = _DATE_RE.findall(path)
+            dates += _DATE_RE.findall(
+                " ".join(map(str, (params or {}).values()))
+            )
+            if dates:
+                age = (date.today() - date.fromisoformat(max(dates))).days
+                if age >= self.immutable_after_days:
+                    return None
+        return now + self.ttl
+
+
+DEFAULT_RULES = (
+    CacheRule("/wellness-service", ttl=300, immutable_after_days=3),
+    CacheRule("/usersummary-service", ttl=300, immutable_after_days=3),
+    CacheRule("/userstats-service", ttl=300, immutable_after_days=3),
+    CacheRule("/hrv-service", ttl=300, immutable_after_days=3),
+    CacheRule("/metrics-service", ttl=300, immutable_after_days=3),
+)
+
+
+class ResponseCache:
+    """
+    Disk cache of decoded connectapi responses keyed by path and params.
+
+    Only paths matched by one of 'rules' are cached; the longest matching
+    prefix wins. Safe to share between threads and between Garmin instances.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        rules: Sequence[CacheRule] = DEFAULT_RULES,
+    ):
+        self.path = os.path.expanduser(path)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.rules = sorted(rules, key=lambda r: len(r.prefix), reverse=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, path TEXT NOT NULL, body TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._db.commit()
+
+    def rule_for(self, path: str) -> Optional[CacheRule]:
+        """Return the rule that applies to 'path', if any."""
+
+        path = "/" + path.lstrip("/")
+        for rule in self.rules:
+            if path.startswith(rule.prefix):
+                return rule
+        return None
+
+    @staticmethod
+    def _key(path: str, params: Optional[Dict], namespace: str) -> str:
+        path = "/" + path.lstrip("/")
+        params = {k: str(v) for k, v in (params or {}).items()}
+        return json.dumps([namespace, path, params], sort_keys=True)
+
+    def lookup(
+        self, path: str, params: Optional[Dict] = None, namespace: str = ""
+    ) -> Tuple[bool, Any]:
+        """Return (hit, response) for a request."""
+
+        if self.rule_for(path) is None:
+            return False, None
+
+        key = self._key(path, params, namespace)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= time.time()):
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        logger.debug("Cache hit for %s", path)
+        return True, json.loads(row[0])
+
+    def store(
+        self,
+        path: str,
+        params: Optional[Dict],
+        response: Any,
+        namespace: str = "",
+    ):
+        """Store a response if a rule covers its path."""
+
+        rule = self.rule_for(path)
+        if rule is None:
+            return
+
+        now = time.time()
+        row = (
+            self._key(path, params, namespace),
+            "/" + path.lstrip("/"),
+            json.dumps(response),
+            now,
+            rule.expires_at(path, params, now),
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", row
+            )
+            self._db.commit()
+
+    def invalidate(self, prefix: str = "/") -> int:
+        """Drop cached responses whose path starts with 'prefix'."""
+
+        prefix = "/" + prefix.lstrip("/")
+        escaped = re.sub(r"([\\%_])", r"\\\1", prefix)
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM responses WHERE path LIKE ? ESCAPE '\\'",
+                (escaped + "%",),
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def clear(self) -> int:
+        """Drop every cached response."""
+
+        return self.invalidate("/")
+
+    def purge_expired(self) -> int:
+        """Drop cached responses that have expired."""
+
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of stored entries."""
+
+        with self._lock:
+            (entries,) = self._db.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
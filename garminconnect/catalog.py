@@ -0,0 +1,291 @@
+"""Local columnar catalog of activity summaries, stored as Parquet."""
+
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Catalog column, type and the activity search field it is read from
+FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ("activity_id", "int64", "activityId"),
+    ("start_time", "timestamp", "startTimeLocal"),
+    ("start_time_gmt", "timestamp", "startTimeGMT"),
+    ("activity_type", "string", "activityType"),
+    ("activity_name", "string", "activityName"),
+    ("distance", "float64", "distance"),
+    ("duration", "float64", "duration"),
+    ("moving_duration", "float64", "movingDuration"),
+    ("elevation_gain", "float64", "elevationGain"),
+    ("elevation_loss", "float64", "elevationLoss"),
+    ("average_speed", "float64", "averageSpeed"),
+    ("max_speed", "float64", "maxSpeed"),
+    ("average_hr", "float64", "averageHR"),
+    ("max_hr", "float64", "maxHR"),
+    ("calories", "float64", "calories"),
+    ("steps", "float64", "steps"),
+    ("gear", "list", "gear"),
+)
+
+_OPERATORS = {
+    "==": "equal",
+    "!=": "not_equal",
+    "<": "less",
+    "<=": "less_equal",
+    ">": "greater",
+    ">=": "greater_equal",
+}
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise ImportError(
+            "The activity catalog needs pyarrow: "
+            "pip install garminconnect[catalog]"
+        ) from err
+    return pa, pc, pq
+
+
+def _schema(pa):
+    types = {
+        "int64": pa.int64(),
+        "timestamp": pa.timestamp("s"),
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "list": pa.list_(pa.string()),
+    }
+    return pa.schema(
+        [(name, types[kind]) for name, kind, _ in FIELDS],
+    )
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace("Z", ""))
+
+
+def summary_row(activity: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an activity search result to a catalog row."""
+
+    row = {}
+    for name, kind, field in FIELDS:
+        value = activity.get(field)
+        if name == "activity_type":
+            value = (value or {}).get("typeKey")
+        elif name == "gear":
+            value = [gear["uuid"] for gear in value] if value else None
+        elif kind == "timestamp":
+            value = _timestamp(value)
+        elif kind == "float64" and value is not None:
+            value = float(value)
+        row[name] = value
+    return row
+
+
+def _is_day(value) -> bool:
+    if isinstance(value, str):
+        return len(value) == 10
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+
+def _bound(value, end=False) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    day = _is_day(value)
+    parsed = datetime.fromisoformat(str(value))
+    # A bare end date includes the whole day
+    if end and day:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+class ActivityCatalog:
+    """
+    Parquet catalog of activity summaries (distance, duration, heart rate,
+    type, gear, start time...) from the activity search endpoint, updated
+    incrementally and queried locally. Requires pyarrow.
+
+    Example, all runs over 15 km in 2024:
+        catalog.query(
+            activity_type="running",
+            start="2024-01-01",
+            end="2024-12-31",
+            where=[("distance", ">", 15000)],
+        )
+    """
+
+    def __init__(
+        self, path: str = os.path.join("workouts", "catalog.parquet")
+    ):
+        self.pa, self.pc, self.pq = _arrow()
+        self.path = path
+        self.schema = _schema(self.pa)
+        if os.path.exists(path):
+            self.table = self.pq.read_table(path).cast(self.schema)
+        else:
+            self.table = self.schema.empty_table()
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __contains__(self, activity_id) -> bool:
+        matches = self.pc.equal(self.table["activity_id"], int(activity_id))
+        return bool(self.pc.any(matches).as_py())
+
+    def high_water_mark(self) -> Optional[datetime]:
+        """Return the newest start time in the catalog, if any."""
+
+        return self.pc.max(self.table["start_time"]).as_py()
+
+    def add(self, activities: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add or replace activity search results, keyed by activity ID.
+        Returns the number of activities that were new.
+        """
+
+        rows = {
+            row["activity_id"]: row for row in map(summary_row, activities)
+        }
+        if not rows:
+            return 0
+        added = self.pa.Table.from_pylist(list(rows.values()), self.schema)
+        known = self.pc.is_in(
+            self.table["activity_id"], value_set=added["activity_id"]
+        )
+        replaced = self.pc.sum(known.cast(self.pa.int64())).as_py() or 0
+        self.table = self.pa.concat_tables(
+            [self.table.filter(self.pc.invert(known)), added]
+        ).sort_by([("start_time", "descending")])
+        return len(rows) - replaced
+
+    def update(
+        self,
+        garmin,
+        full: bool = False,
+        gear: bool = False,
+        page_size: int = 100,
+        save: bool = True,
+    ) -> int:
+        """
+        List activities newer than the catalog's newest (every activity
+        with 'full'), add them and save. With 'gear' the gear of each new
+        activity is fetched too, one request per activity. Returns the
+        number of new activities.
+        """
+
+        newest = None if full else self.high_water_mark()
+        activities = []
+        for activity in garmin.iter_activities(page_size=page_size):
+            started = _timestamp(activity.get("startTimeLocal"))
+            if newest and started and started < newest:
+                break
+            activities.append(activity)
+        if gear:
+            for activity in activities:
+                activity["gear"] = garmin.get_activity_gear(
+                    activity["activityId"]
+                )
+        added = self.add(activities)
+        logger.debug("Catalog: %d new activities", added)
+        if save:
+            self.save()
+        return added
+
+    def save(self):
+        """Write the catalog, replacing the file only once complete."""
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        partial = f"{self.path}.part"
+        self.pq.write_table(self.table, partial, compression="zstd")
+        os.replace(partial, self.path)
+
+    def query(
+        self,
+        activity_type: Optional[str] = None,
+        start=None,
+        end=None,
+        where: Sequence[Tuple[str, str, Any]] = (),
+        columns: Optional[List[str]] = None,
+    ):
+        """
+        Return the matching activities as a pyarrow Table, most recent
+        first. 'start' and 'end' are inclusive dates or datetimes; 'where'
+        holds (column, operator, value) filters with operator one of
+        ==, !=, <, <=, >, >= or 'in'.
+        """
+
+        pc = self.pc
+        conditions = []
+        if activity_type:
+            conditions.append(
+                pc.equal(self.table["activity_type"], activity_type)
+            )
+        if start:
+            conditions.append(
+                pc.greater_equal(
+                    self.table["start_time"],
+                    self.pa.scalar(_bound(start), self.pa.timestamp("s")),
+                )
+            )
+        if end:
+            compare = pc.less if _is_day(end) else pc.less_equal
+            conditions.append(
+                compare(
+                    self.table["start_time"],
+                    self.pa.scalar(
+                        _bound(end, end=True), self.pa.timestamp("s")
+                    ),
+                )
+            )
+        for column, operator, value in where:
+            if operator == "in":
+                conditions.append(
+                    pc.is_in(
+                        self.table[column], value_set=self.pa.array(value)
+                    )
+                )
+            else:
+                compare = getattr(pc, _OPERATORS[operator])
+                conditions.append(compare(self.table[column], value))
+
+        table = self.table
+        if conditions:
+            mask = conditions[0]
+            for condition in conditions[1:]:
+                mask = pc.and_(mask, condition)
+            table = table.filter(mask)
+        if columns:
+            table = table.select(columns)
+        return table
+
+    def aggregate(
+        self,
+        by: str = "activity_type",
+        metrics: Sequence[str] = ("distance", "duration"),
+        **query,
+    ):
+        """
+        Return the count and total of each metric per group of the
+        activities matching 'query' (see query()), as a pyarrow Table.
+        'by' is a column name, or 'year' (e.g. 2024) or 'month' (e.g.
+        '2024-01') of the start time.
+        """
+
+        table = self.query(**query)
+        if by == "year":
+            table = table.append_column(by, self.pc.year(table["start_time"]))
+        elif by == "month":
+            table = table.append_column(
+                by, self.pc.strftime(table["start_time"], format="%Y-%m")
+            )
+        grouped = table.group_by(by).aggregate(
+            [("activity_id", "count")]
+            + [(metric, "sum") for metric in metrics]
+        )
+        return grouped.sort_by(by)
@@ -0,0 +1,74 @@
+"""Columnar decoding of activity details into NumPy arrays."""
+
+from operator import itemgetter
+from typing import Any, Dict
+
+_LAT_LON = itemgetter("lat", "lon")
+
+
+def decode_activity_details(details: Dict[str, Any], dataframe=False):
+    """
+    Decode a get_activity_details payload into one array per metric.
+
+    Returns a dict mapping each metric descriptor key to a float64 array
+    with NaN for missing samples, timestamp metrics ('...Timestamp') as
+    datetime64[ms] arrays with NaT, plus 'polyline' as an (N, 2) array of
+    latitude and longitude. With dataframe=True a pandas DataFrame of the
+    metric columns is returned instead, with the polyline in
+    DataFrame.attrs['polyline'].
+    """
+
+    import numpy as np
+
+    descriptors = details.get("metricDescriptors") or []
+    rows = [
+        row["metrics"] for row in details.get("activityDetailMetrics") or []
+    ]
+    width = max(
+        [len(descriptors)]
+        + [descriptor["metricsIndex"] + 1 for descriptor in descriptors]
+    )
+
+    # One conversion for the whole table, None becomes NaN
+    try:
+        table = np.array(rows, dtype=np.float64).reshape(len(rows), -1)
+    except ValueError:
+        # Ragged rows, or none at all
+        table = np.full((len(rows), width), np.nan)
+        for i, row in enumerate(rows):
+            table[i, : len(row)] = np.array(row[:width], dtype=np.float64)
+    if table.shape[1] < width:
+        table = np.pad(
+            table,
+            ((0, 0), (0, width - table.shape[1])),
+            constant_values=np.nan,
+        )
+
+    columns = {}
+    for descriptor in sorted(descriptors, key=itemgetter("metricsIndex")):
+        column = table[:, descriptor["metricsIndex"]]
+        if descriptor["key"].endswith("Timestamp"):
+            stamps = np.full(
+                len(column), np.datetime64("NaT"), "datetime64[ms]"
+            )
+            present = ~np.isnan(column)
+            stamps[present] = column[present].astype(np.int64)
+            column = stamps
+        else:
+            column = np.ascontiguousarray(column)
+        columns[descriptor["key"]] = column
+
+    points = (details.get("geoPolylineDTO") or {}).get("polyline") or []
+    polyline = np.array(
+        [_LAT_LON(point) for point in points], dtype=np.float64
+    ).reshape(-1, 2)
+
+    if dataframe:
+        import pandas as pd
+
+        frame = pd.DataFrame(columns)
+        frame.attrs["polyline"] = polyline
+        return frame
+
+    columns["polyline"] = polyline
+    return columns
@@ -0,0 +1,209 @@
+"""Merge GraphQL queries into aliased batch documents and split results."""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_NAME = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+_IGNORED = " \t\r\n,\ufeff"
+_CLOSING = {"(": ")", "{": "}", "[": "]"}
+
+
+def _skip_ignored(text: str, i: int) -> int:
+    while i < len(text):
+        if text[i] in _IGNORED:
+            i += 1
+        elif text[i] == "#":
+            while i < len(text) and text[i] not in "\r\n":
+                i += 1
+        else:
+            break
+    return i
+
+
+def _skip_string(text: str, i: int) -> int:
+    """Return the index just past the string literal starting at 'i'."""
+
+    if text.startswith('"""', i):
+        end = text.find('"""', i + 3)
+        while end != -1 and text[end - 1] == "\\":
+            end = text.find('"""', end + 3)
+        if end == -1:
+            raise ValueError("unterminated block string")
+        return end + 3
+    i += 1
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+        elif text[i] == '"':
+            return i + 1
+        elif text[i] in "\r\n":
+            break
+        else:
+            i += 1
+    raise ValueError("unterminated string")
+
+
+def _skip_group(text: str, i: int) -> int:
+    """Return the index just past the bracketed group opening at 'i'."""
+
+    stack = [_CLOSING[text[i]]]
+    i += 1
+    while stack:
+        if i >= len(text):
+            raise ValueError("unbalanced brackets")
+        char = text[i]
+        if char == '"':
+            i = _skip_string(text, i)
+            continue
+        if char == "#":
+            i = _skip_ignored(text, i)
+            continue
+        if char in _CLOSING:
+            stack.append(_CLOSING[char])
+        elif char in ")}]":
+            if char != stack.pop():
+                raise ValueError("unbalanced brackets")
+        i += 1
+    return i
+
+
+def split_fields(document: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    Split an anonymous or named query without variables into its top-level
+    fields, as (response key, field text without alias) pairs.
+
+    Returns None for anything that cannot safely share a document with
+    other queries: mutations and subscriptions, variable definitions,
+    fragments, directives on the operation or several operations.
+    """
+
+    try:
+        i = _skip_ignored(document, 0)
+        match = _NAME.match(document, i)
+        if match:
+            if match.group() != "query":
+                return None
+            i = _skip_ignored(document, match.end())
+            name = _NAME.match(document, i)
+            if name:
+                i = _skip_ignored(document, name.end())
+        if i >= len(document) or document[i] != "{":
+            return None
+        end = _skip_group(document, i)
+        if _skip_ignored(document, end) != len(document):
+            return None
+
+        fields = []
+        i = _skip_ignored(document, i + 1)
+        while document[i] != "}":
+            match = _NAME.match(document, i)
+            if not match:
+                return None
+            key = match.group()
+            j = _skip_ignored(document, match.end())
+            if document[j] == ":":
+                j = _skip_ignored(document, j + 1)
+                match = _NAME.match(document, j)
+                if not match:
+                    return None
+                j = match.end()
+            start = match.start()
+            j = _skip_ignored(document, j)
+            if document[j] == "(":
+                j = _skip_ignored(document, _skip_group(document, j))
+            if document[j] == "@":
+                return None
+            if document[j] == "{":
+                j = _skip_group(document, j)
+            if "$" in document[start:j]:
+                return None
+            fields.append((key, document[start:j].strip()))
+            i = _skip_ignored(document, j)
+    except (ValueError, IndexError):
+        return None
+
+    return fields or None
+
+
+def build_batches(
+    documents: List[Optional[List[Tuple[str, str]]]], max_size: int
+) -> List[Tuple[str, Dict[str, Tuple[int, str]]]]:
+    """
+    Pack split queries into aliased documents of at most 'max_size'
+    characters (a single larger query gets a document of its own).
+
+    Returns (document, aliases) pairs where 'aliases' maps each alias to
+    the (query index, original response key) it answers.
+    """
+
+    batches = []
+    parts: List[str] = []
+    aliases: Dict[str, Tuple[int, str]] = {}
+    size = len("query{}")
+
+    for index, fields in enumerate(documents):
+        if fields is None:
+            continue
+        chunk = [
+            (f"q{index}_{n}", key, text)
+            for n, (key, text) in enumerate(fields)
+        ]
+        chunk_size = sum(
+            len(alias) + len(text) + 2 for alias, _, text in chunk
+        )
+        if parts and size + chunk_size > max_size:
+            batches.append((f"query{{{' '.join(parts)}}}", aliases))
+            parts, aliases, size = [], {}, len("query{}")
+        for alias, key, text in chunk:
+            parts.append(f"{alias}:{text}")
+            aliases[alias] = (index, key)
+        size += chunk_size
+
+    if parts:
+        batches.append((f"query{{{' '.join(parts)}}}", aliases))
+    return batches
+
+
+def failed_result(error: Exception) -> Dict[str, Any]:
+    """Build the response for a request that failed with 'error'."""
+
+    return {
+        "data": None,
+        "errors": [
+            {
+                "message": str(error) or type(error).__name__,
+                "extensions": {"exception": type(error).__name__},
+            }
+        ],
+    }
+
+
+def split_result(
+    result: Dict[str, Any], aliases: Dict[str, Tuple[int, str]]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Split the response to a batch document into one response per query,
+    shaped as if the query had been sent on its own.
+    """
+
+    data = result.get("data") or {}
+    split: Dict[int, Dict[str, Any]] = {}
+    for alias, (index, key) in aliases.items():
+        entry = split.setdefault(index, {"data": {}})
+        if alias in data:
+            entry["data"][key] = data[alias]
+
+    for error in result.get("errors") or []:
+        path = error.get("path") or []
+        if path and path[0] in aliases:
+            index, key = aliases[path[0]]
+            targets = [(index, {**error, "path": [key, *path[1:]]})]
+        else:
+            targets = [(index, error) for index in split]
+        for index, entry_error in targets:
+            split[index].setdefault("errors", []).append(entry_error)
+
+    if result.get("data") is None:
+        for entry in split.values():
+            entry["data"] = None
+    return split
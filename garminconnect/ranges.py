@@ -0,0 +1,191 @@
+"""Split long date ranges into server-legal chunks and merge the results."""
+
+import re
+from datetime import date, timedelta
+from numbers import Number
+from typing import Any, List, Optional, Tuple
+
+_DATE_KEY = re.compile(r"^\d{4}-\d{2}-\d{2}")
+# Range bounds: the start comes from the first chunk, the end from the last
+_FIRST_KEYS = {
+    "startDate",
+    "startCalendarDate",
+    "from",
+    "fromCalendarDate",
+    "fromDate",
+}
+_LAST_KEYS = {
+    "endDate",
+    "endCalendarDate",
+    "until",
+    "untilDate",
+    "toDate",
+    "toCalendarDate",
+}
+# Identifiers and points in time, never aggregated
+_IDENTITY = re.compile(r"(Pk|PK|Id|ID)$|^date$|[Tt]imestamp")
+# Number of samples behind a summary, which weights its averages
+_COUNTS = ("numOfMeasurements", "numOfWeightEntries")
+# Body composition metrics reported as plain period averages
+_AVERAGED = {
+    "weight",
+    "bmi",
+    "bodyFat",
+    "bodyWater",
+    "boneMass",
+    "muscleMass",
+    "physiqueRating",
+    "visceralFat",
+    "metabolicAge",
+}
+
+
+def split_range(
+    start, end, max_days: int, align: Optional[str] = None
+) -> List[Tuple[date, date]]:
+    """
+    Split the inclusive range 'start' through 'end' into consecutive
+    (first, last) chunks of at most 'max_days' days. With align='week'
+    every chunk but the last spans whole weeks counted from 'start'; with
+    align='month' chunks end on the last day of a month where possible.
+    """
+
+    start = date.fromisoformat(str(start))
+    end = date.fromisoformat(str(end))
+    if align == "week":
+        max_days = max(7, max_days - max_days % 7)
+
+    chunks = []
+    first = start
+    while first <= end:
+        last = min(end, first + timedelta(days=max_days - 1))
+        if align == "month" and (last + timedelta(days=1)).day != 1:
+            month_end = last.replace(day=1) - timedelta(days=1)
+            if last < end and month_end >= first:
+                last = month_end
+        chunks.append((first, last))
+        first = last + timedelta(days=1)
+    return chunks
+
+
+def _count(value: Any) -> Optional[int]:
+    if isinstance(value, dict):
+        for key in _COUNTS:
+            if isinstance(value.get(key), Number):
+                return value[key]
+    return None
+
+
+def _samples(value: Any) -> Optional[int]:
+    """
+    The number of samples a chunk's response summarises: its own count
+    field, else the samples of the first list it holds, one per item that
+    does not say. None if the response does not tell.
+    """
+
+    count = _count(value)
+    if count is not None:
+        return count
+    if isinstance(value, list):
+        return sum(
+            1 if samples is None else samples
+            for samples in map(_samples, value)
+        )
+    if isinstance(value, dict):
+        for item in value.values():
+            if isinstance(item, list):
+                return _samples(item)
+    return None
+
+
+def _aggregate(key: str) -> Optional[str]:
+    """How a numeric summary metric combines across chunks, if it does."""
+
+    if _IDENTITY.search(key):
+        return None
+    lowered = key.lower()
+    if lowered.startswith(("max", "high")) or lowered.endswith("max"):
+        return "max"
+    if lowered.startswith(("min", "low")) or lowered.endswith("min"):
+        return "min"
+    if lowered.startswith(("total", "count", "sum", "numof")):
+        return "sum"
+    if "avg" in lowered or "average" in lowered or key in _AVERAGED:
+        return "mean"
+    return None
+
+
+def _combine(key: str, values: List[Any], weights: List[Optional[int]]) -> Any:
+    if key in _FIRST_KEYS or key.startswith("previous"):
+        return values[0]
+    if key in _LAST_KEYS or key.startswith("next"):
+        return values[-1]
+    present = [(v, w) for v, w in zip(values, weights) if v is not None]
+    if not present:
+        return values[-1]
+    if all(isinstance(v, list) for v, _ in present):
+        return [item for v, _ in present for item in v]
+    if all(isinstance(v, dict) for v, _ in present):
+        if all(_DATE_KEY.match(k) for v, _ in present for k in v):
+            return {k: item for v, _ in present for k, item in v.items()}
+        return _merge_dicts([v for v, _ in present], [w for _, w in present])
+    if all(
+        isinstance(v, Number) and not isinstance(v, bool) for v, _ in present
+    ):
+        numbers = [v for v, _ in present]
+        if len(set(numbers)) == 1:
+            return numbers[0]
+        how = _aggregate(key)
+        if how == "max":
+            return max(numbers)
+        if how == "min":
+            return min(numbers)
+        if how == "sum":
+            return sum(numbers)
+        if how == "mean":
+            # Weighted by samples; unknown without a count for every chunk
+            counts = [w for _, w in present if w is not None]
+            total = sum(counts)
+            if len(counts) < len(present) or not total:
+                return None
+            return sum(v * w for v, w in zip(numbers, counts)) / total
+        return present[-1][0]
+    if _IDENTITY.search(key) or all(v == present[0][0] for v, _ in present):
+        return present[-1][0]
+    # A category or other label that differs between chunks has no value
+    # for the whole range
+    return None
+
+
+def _merge_dicts(chunks: List[dict], weights: List[Optional[int]]) -> dict:
+    # A summary that counts its own samples weighs its averages by them
+    weights = [
+        w if _count(chunk) is None else _count(chunk)
+        for chunk, w in zip(chunks, weights)
+    ]
+    keys = list(dict.fromkeys(k for chunk in chunks for k in chunk))
+    return {
+        key: _combine(key, [chunk.get(key) for chunk in chunks], weights)
+        for key in keys
+    }
+
+
+def merge_chunks(results: List[Any]) -> Any:
+    """
+    Merge the responses for consecutive chunks into one response.
+
+    Lists are concatenated in order and dicts keyed by date are combined.
+    In other dicts the start of the range and 'previous...' values come
+    from the first chunk, its end and 'next...' values from the last.
+    Known summary metrics are combined by name: 'max...'/'high...' by
+    maximum, 'min...'/'low...' by minimum, 'total...'/'numOf...' by sum
+    and averages by a mean weighted by the samples in each chunk, taken
+    from 'numOfMeasurements'/'numOfWeightEntries' or the length of the
+    chunk's list; an average is None when a chunk does not tell. Other
+    numbers, IDs, 'date' and timestamps are taken from the last chunk
+    that has them, and labels that differ between chunks are None.
+    """
+
+    if len(results) == 1:
+        return results[0]
+    return _combine("", results, [_samples(result) for result in results])
@@ -0,0 +1,153 @@
+"""Adaptive rate limiting and retry policy for Garmin Connect requests."""
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+import requests
+from garth.exc import GarthHTTPError
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """Return the HTTP status carried by a garth/requests error, if any."""
+
+    if isinstance(error, GarthHTTPError):
+        error = error.error
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Return the Retry-After delay in seconds carried by an error."""
+
+    if isinstance(error, GarthHTTPError):
+        error = error.error
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every request of one or more clients.
+
+    With 'adaptive' set the rate is halved on each 429 response (down to
+    'min_rate') and creeps back up by 'increase' requests per second on
+    each success (up to 'max_rate'), so the client settles just below the
+    server's actual limit. A Retry-After delay pauses every caller.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 10,
+        adaptive: bool = True,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        increase: float = 0.1,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase = increase
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(
+                    self._paused_until - now, (1 - self._tokens) / self.rate
+                )
+            time.sleep(wait)
+
+    def on_success(self):
+        if self.adaptive:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, delay: Optional[float] = None):
+        with self._lock:
+            if self.adaptive:
+                self.rate = max(self.min_rate, self.rate / 2)
+                logger.info("Throttled, lowering rate to %.2f/s", self.rate)
+            if delay:
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + delay
+                )
+            self._tokens = min(self._tokens, 0.0)
+
+
+class RetryPolicy:
+    """
+    Decide which failed requests are retried and how long to wait.
+
+    429 responses are always retryable. Connection errors, timeouts and
+    the other 'retry_statuses' are only retried for idempotent methods,
+    since a POST may already have been applied. Delays honour Retry-After
+    and otherwise use exponential backoff with full jitter; both are
+    capped at 'max_backoff'.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+
+    def is_retryable(self, error: BaseException, method: str) -> bool:
+        status = status_code(error)
+        if status == 429:
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        if status is not None:
+            return status in self.retry_statuses
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None):
+        """Return the delay in seconds before retry number 'attempt'."""
+
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        cap = min(self.max_backoff, self.backoff * 2**attempt)
+        return random.uniform(0, cap)
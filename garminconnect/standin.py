@@ -0,0 +1,409 @@
+"""
+Local stand-in for the Garmin Connect API, for offline load and latency
+testing.
+
+The stand-in is an in-process HTTP server answering the connectapi
+endpoints the client uses most with synthetic but realistically shaped
+data: paginated activity search, FIT zip and export downloads, activity
+summaries, wellness dailies and the user profile. Latency, server errors
+and 429 throttling can be injected::
+
+    with StandIn(activities=500, latency=0.02, throttle_rate=0.05) as api:
+        garmin = api.attach(Garmin())
+        garmin.get_activities_by_date("2024-01-01", "2024-12-31")
+        print(api.hits.most_common(3))
+"""
+
+import io
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from garth.auth_tokens import OAuth1Token, OAuth2Token
+from requests.adapters import HTTPAdapter
+
+ACTIVITY_TYPES = ("running", "cycling", "walking", "lap_swimming", "hiking")
+_HOST = "127.0.0.1"
+
+
+def synthetic_fit(activity_id: int, size: int) -> bytes:
+    """Return a FIT-shaped blob: a 14 byte header and seeded payload."""
+
+    payload = random.Random(activity_id).randbytes(size)
+    header = struct.pack("<BBHI4sH", 14, 0x20, 2132, size, b".FIT", 0)
+    return header + payload + b"\x00\x00"
+
+
+class StandIn:
+    """
+    In-process Garmin Connect stand-in.
+
+    'activities' synthetic activities are served newest first, one per
+    day before 'last_day'. Every request waits 'latency' seconds (plus up
+    to 'jitter'), then fails with a 503 with probability 'error_rate' or
+    a 429 carrying Retry-After: 'retry_after' with probability
+    'throttle_rate'. throttle_next() forces the next 429s
+    deterministically. Served paths are counted in 'hits'.
+    """
+
+    def __init__(
+        self,
+        activities: int = 100,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 0,
+        fit_size: int = 16 * 1024,
+        display_name: str = "standin",
+        last_day: date = date(2024, 12, 31),
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fit_size = fit_size
+        self.display_name = display_name
+        self.activities = [
+            self._activity(n, last_day - timedelta(days=n))
+            for n in range(activities)
+        ]
+        self.hits: Counter = Counter()
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._forced_throttles = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes = [
+            (re.compile(pattern), getattr(self, name))
+            for pattern, name in (
+                (
+                    r"^/activitylist-service/activities/search/activities$",
+                    "_search",
+                ),
+                (r"^/download-service/files/activity/(\d+)$", "_fit_zip"),
+                (
+                    r"^/download-service/export/(\w+)/activity/(\d+)$",
+                    "_export",
+                ),
+                (r"^/activity-service/activity/(\d+)$", "_summary"),
+                (r"^/userprofile-service/socialProfile$", "_profile"),
+                (
+                    r"^/userprofile-service/userprofile/user-settings$",
+                    "_settings",
+                ),
+                (
+                    r"^/usersummary-service/usersummary/daily/[^/]+$",
+                    "_user_summary",
+                ),
+                (
+                    r"^/wellness-service/wellness/dailySleepData/[^/]+$",
+                    "_sleep",
+                ),
+                (
+                    r"^/wellness-service/wellness/dailyHeartRate/[^/]+$",
+                    "_heart_rate",
+                ),
+                (
+                    r"^/wellness-service/wellness/dailyStress/([\d-]+)$",
+                    "_stress",
+                ),
+                (r"^/hrv-service/hrv/([\d-]+)$", "_hrv"),
+            )
+        ]
+
+    # Server lifecycle
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The stand-in is not running")
+        return f"http://{_HOST}:{self._server.server_port}"
+
+    def start(self) -> "StandIn":
+        stand_in = self
+
+        class Handler(_Handler):
+            api = stand_in
+
+        self._server = ThreadingHTTPServer((_HOST, 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def attach(self, garmin):
+        """
+        Point a Garmin client at the stand-in: install never-expiring fake
+        tokens, route its connectapi traffic here and fill in the profile
+        fields login() would set. Returns the client.
+        """
+
+        client = garmin.garth
+        client.configure(
+            oauth1_token=OAuth1Token(
+                oauth_token="standin",
+                oauth_token_secret="standin",
+                domain=client.domain,
+            ),
+            oauth2_token=OAuth2Token(
+                scope="CONNECT_READ CONNECT_WRITE",
+                jti="standin",
+                token_type="Bearer",
+                access_token="standin",
+                refresh_token="standin",
+                expires_in=10**9,
+                expires_at=int(time.time()) + 10**9,
+                refresh_token_expires_in=10**9,
+                refresh_token_expires_at=int(time.time()) + 10**9,
+            ),
+        )
+        adapter = _RedirectAdapter(
+            self.url,
+            pool_connections=client.pool_connections,
+            pool_maxsize=client.pool_maxsize,
+        )
+        client.sess.mount(f"https://connectapi.{client.domain}", adapter)
+        client._user_profile = self._profile(None, None)
+        garmin.display_name = self.display_name
+        garmin.full_name = client._user_profile["fullName"]
+        garmin.unit_system = "metric"
+        return garmin
+
+    def throttle_next(self, count: int = 1):
+        """Answer the next 'count' requests with 429."""
+
+        with self._lock:
+            self._forced_throttles += count
+
+    # Request handling
+
+    def _handle(self, path: str, query: Dict[str, str]):
+        """Return (status, headers, body) for a request."""
+
+        delay = self.latency
+        with self._lock:
+            self.hits[path] += 1
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            throttle = self._forced_throttles > 0
+            if throttle:
+                self._forced_throttles -= 1
+            else:
+                throttle = self._random.random() < self.throttle_rate
+            error = not throttle and self._random.random() < self.error_rate
+            self.throttled += throttle
+        if delay:
+            time.sleep(delay)
+
+        if throttle:
+            headers = {"Retry-After": str(self.retry_after)}
+            return 429, headers, _json({"message": "Too Many Requests"})
+        if error:
+            return 503, {}, _json({"message": "Service Unavailable"})
+        for pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match:
+                body = handler(match, query)
+                if isinstance(body, bytes):
+                    return 200, {"Content-Type": "application/zip"}, body
+                return 200, {"Content-Type": "application/json"}, _json(body)
+        return 404, {}, _json({"message": f"No stand-in for {path}"})
+
+    def _activity(self, n: int, day: date) -> Dict[str, Any]:
+        rng = random.Random(n)
+        kind = ACTIVITY_TYPES[n % len(ACTIVITY_TYPES)]
+        started = datetime.combine(day, datetime.min.time()) + timedelta(
+            hours=6 + rng.randrange(12), minutes=rng.randrange(60)
+        )
+        duration = rng.uniform(1200, 7200)
+        return {
+            "activityId": 10_000_000 + n,
+            "activityName": f"Synthetic {kind.replace('_', ' ')}",
+            "activityType": {"typeKey": kind},
+            "startTimeLocal": started.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration": duration,
+            "distance": duration * rng.uniform(1.5, 8.0),
+            "averageHR": rng.uniform(110, 165),
+            "calories": duration * rng.uniform(0.1, 0.25),
+        }
+
+    def _search(self, match, query) -> List[Dict[str, Any]]:
+        selected = self.activities
+        kind = query.get("activityType")
+        if kind:
+            selected = [
+                a for a in selected if a["activityType"]["typeKey"] == kind
+            ]
+        first, last = query.get("startDate"), query.get("endDate")
+        if first or last:
+            selected = [
+                a
+                for a in selected
+                if (first or "") <= a["startTimeLocal"][:10] <= (last or "~")
+            ]
+        start = int(query.get("start", 0))
+        limit = int(query.get("limit", 20))
+        return selected[start : start + limit]
+
+    def _fit_zip(self, match, query) -> bytes:
+        activity_id = int(match.group(1))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(
+                f"{activity_id}_ACTIVITY.fit",
+                synthetic_fit(activity_id, self.fit_size),
+            )
+        return buffer.getvalue()
+
+    def _export(self, match, query) -> bytes:
+        fmt, activity_id = match.group(1), match.group(2)
+        return f"{fmt} export of activity {activity_id}\n".encode()
+
+    def _summary(self, match, query) -> Dict[str, Any]:
+        activity_id = int(match.group(1))
+        for activity in self.activities:
+            if activity["activityId"] == activity_id:
+                return {"summaryDTO": dict(activity), **activity}
+        return {"activityId": activity_id}
+
+    def _profile(self, match, query) -> Dict[str, Any]:
+        return {
+            "displayName": self.display_name,
+            "fullName": "Stand In",
+            "userName": f"{self.display_name}@example.com",
+        }
+
+    def _settings(self, match, query) -> Dict[str, Any]:
+        return {"userData": {"measurementSystem": "metric"}}
+
+    def _daily(self, day: str) -> random.Random:
+        return random.Random(day)
+
+    def _user_summary(self, match, query) -> Dict[str, Any]:
+        day = query.get("calendarDate", "")
+        rng = self._daily(day)
+        return {
+            "calendarDate": day,
+            "privacyProtected": False,
+            "totalSteps": rng.randrange(2000, 20000),
+            "totalKilocalories": rng.randrange(1800, 3500),
+            "restingHeartRate": rng.randrange(45, 70),
+            "averageStressLevel": rng.randrange(15, 60),
+        }
+
+    def _sleep(self, match, query) -> Dict[str, Any]:
+        day = query.get("date", "")
+        rng = self._daily(day)
+        return {
+            "dailySleepDTO": {
+                "calendarDate": day,
+                "sleepTimeSeconds": rng.randrange(5, 9) * 3600,
+                "deepSleepSeconds": rng.randrange(3600, 7200),
+            }
+        }
+
+    def _heart_rate(self, match, query) -> Dict[str, Any]:
+        day = query.get("date", "")
+        rng = self._daily(day)
+        start = int(datetime.fromisoformat(day).timestamp() * 1000)
+        return {
+            "calendarDate": day,
+            "restingHeartRate": rng.randrange(45, 70),
+            "heartRateValues": [
+                [start + i * 120_000, rng.randrange(50, 150)]
+                for i in range(720)
+            ],
+        }
+
+    def _stress(self, match, query) -> Dict[str, Any]:
+        day = match.group(1)
+        rng = self._daily(day)
+        return {
+            "calendarDate": day,
+            "avgStressLevel": rng.randrange(15, 60),
+            "maxStressLevel": rng.randrange(60, 100),
+        }
+
+    def _hrv(self, match, query) -> Dict[str, Any]:
+        day = match.group(1)
+        rng = self._daily(day)
+        return {
+            "hrvSummary": {
+                "calendarDate": day,
+                "lastNightAvg": rng.randrange(30, 90),
+                "status": "BALANCED",
+            }
+        }
+
+
+def _json(body: Any) -> bytes:
+    return json.dumps(body).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: StandIn
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, headers, body = self.api._handle(url.path, query)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _RedirectAdapter(HTTPAdapter):
+    """Send requests for the mounted prefix to the stand-in instead."""
+
+    def __init__(self, base_url: str, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        request.url = (
+            self.base_url + url.path + (f"?{url.query}" if url.query else "")
+        )
+        return super().send(request, **kwargs)
@@ -0,0 +1,138 @@
+"""Incremental extraction of ZIP members from a stream of byte chunks."""
+
+import struct
+import zipfile
+import zlib
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+ZIP_MAGIC = b"PK\x03\x04"
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_DESCRIPTOR_MAGIC = b"PK\x07\x08"
+_HAS_DESCRIPTOR = 0x08
+
+
+class _ChunkReader:
+    """Buffered reader over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._buffer = b""
+
+    def fill(self) -> bool:
+        """Append the next non-empty chunk to the buffer."""
+
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += chunk
+                return True
+        return False
+
+    def take(self, size: Optional[int] = None) -> bytes:
+        """Return up to 'size' buffered bytes, reading a chunk if empty."""
+
+        if not self._buffer and not self.fill():
+            return b""
+        size = len(self._buffer) if size is None else size
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def take_exact(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            if not self.fill():
+                raise zipfile.BadZipFile("Truncated ZIP stream")
+        return self.take(size)
+
+    def peek(self, size: int) -> bytes:
+        while len(self._buffer) < size and self.fill():
+            pass
+        return self._buffer[:size]
+
+    def push_back(self, data: bytes):
+        self._buffer = data + self._buffer
+
+
+def _copy_member(reader, method, compressed_size, sink) -> Tuple[int, int]:
+    """Copy one member's data to 'sink', returning (size, crc32)."""
+
+    size = crc = 0
+    if method == zipfile.ZIP_DEFLATED:
+        inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        while not inflater.eof:
+            data = reader.take()
+            if not data:
+                raise zipfile.BadZipFile("Truncated ZIP stream")
+            out = inflater.decompress(data)
+            size += len(out)
+            crc = zlib.crc32(out, crc)
+            if sink is not None:
+                sink.write(out)
+        reader.push_back(inflater.unused_data)
+    elif method == zipfile.ZIP_STORED and compressed_size is not None:
+        remaining = compressed_size
+        while remaining:
+            out = reader.take(remaining)
+            if not out:
+                raise zipfile.BadZipFile("Truncated ZIP stream")
+            remaining -= len(out)
+            size += len(out)
+            crc = zlib.crc32(out, crc)
+            if sink is not None:
+                sink.write(out)
+    else:
+        raise zipfile.BadZipFile(f"Unsupported ZIP compression {method}")
+    return size, crc
+
+
+def extract_member(
+    chunks: Iterable[bytes], out: BinaryIO, suffix: str = ".fit"
+) -> Tuple[str, int]:
+    """
+    Write the first member of a streamed ZIP archive whose name ends with
+    'suffix' to 'out' without buffering the archive or the member.
+
+    The member's CRC and uncompressed size are verified against its local
+    header or data descriptor. Returns (member name, bytes written).
+    Raises zipfile.BadZipFile for corrupt or truncated streams and KeyError
+    when no member matches.
+    """
+
+    reader = _ChunkReader(chunks)
+    while reader.peek(4) == ZIP_MAGIC:
+        (
+            _,
+            _,
+            flags,
+            method,
+            _,
+            _,
+            crc,
+            compressed_size,
+            size,
+            name_length,
+            extra_length,
+        ) = _LOCAL_HEADER.unpack(reader.take_exact(_LOCAL_HEADER.size))
+        name = reader.take_exact(name_length).decode("utf-8", "replace")
+        reader.take_exact(extra_length)
+
+        wanted = name.lower().endswith(suffix.lower())
+        deferred = flags & _HAS_DESCRIPTOR
+        written, actual_crc = _copy_member(
+            reader,
+            method,
+            None if deferred else compressed_size,
+            out if wanted else None,
+        )
+        if deferred:
+            if reader.peek(4) == _DESCRIPTOR_MAGIC:
+                reader.take_exact(4)
+            crc, _, size = struct.unpack("<III", reader.take_exact(12))
+        if wanted:
+            if actual_crc != crc or written != size:
+                raise zipfile.BadZipFile(
+                    f"{name}: expected {size} bytes (crc {crc:08x}), "
+                    f"got {written} bytes (crc {actual_crc:08x})"
+                )
+            return name, written
+
+    raise KeyError(f"No member ending with {suffix!r} in ZIP stream")
@@ -0,0 +1,192 @@
+"""Per-endpoint request telemetry for the Garmin Connect client."""
+
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+_BUCKET_LABELS = tuple(
+    "+Inf" if math.isinf(bound) else repr(bound) for bound in LATENCY_BUCKETS
+)
+
+_PLACEHOLDERS = (
+    (re.compile(r"^\d{4}-\d{2}-\d{2}$"), "{date}"),
+    (
+        re.compile(r"^[0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}[0-9a-fA-F]{12}$"),
+        "{uuid}",
+    ),
+    (re.compile(r"^\d+$"), "{id}"),
+)
+
+
+def endpoint_template(path: str, display_name: Optional[str] = None) -> str:
+    """
+    Reduce a request path to its endpoint template, e.g.
+    '/hrv-service/hrv/2024-01-01' becomes '/hrv-service/hrv/{date}'.
+    """
+
+    segments = []
+    for segment in path.split("?", 1)[0].strip("/").split("/"):
+        if display_name and segment == display_name:
+            segment = "{displayName}"
+        else:
+            for pattern, placeholder in _PLACEHOLDERS:
+                if pattern.match(segment):
+                    segment = placeholder
+                    break
+        segments.append(segment)
+    return "/" + "/".join(segments)
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.status: Dict[str, int] = {}
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class RequestMetrics:
+    """
+    Thread-safe counters keyed by (HTTP method, endpoint template).
+
+    For every request attempt it records the count, the latency histogram,
+    response bytes and status code ('error' when no response arrived), and
+    how many attempts were retried.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _EndpointStats] = {}
+
+    def record(
+        self,
+        method: str,
+        endpoint: str,
+        latency: float,
+        status: Optional[int],
+        nbytes: int = 0,
+        retried: bool = False,
+    ):
+        with self._lock:
+            stats = self._stats.get((method, endpoint))
+            if stats is None:
+                stats = self._stats[(method, endpoint)] = _EndpointStats()
+            stats.requests += 1
+            stats.retries += retried
+            stats.bytes += nbytes
+            key = str(status) if status is not None else "error"
+            stats.status[key] = stats.status.get(key, 0) + 1
+            stats.latency_sum += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats.latency_buckets[i] += 1
+                    break
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a copy of the counters keyed by 'METHOD /endpoint'. Latency
+        buckets are keyed by their upper bound in seconds.
+        """
+
+        with self._lock:
+            items = sorted(self._stats.items())
+            return {
+                f"{method} {endpoint}": {
+                    "requests": stats.requests,
+                    "retries": stats.retries,
+                    "bytes": stats.bytes,
+                    "status": dict(stats.status),
+                    "latency_sum": stats.latency_sum,
+                    "latency_buckets": dict(
+                        zip(_BUCKET_LABELS, stats.latency_buckets)
+                    ),
+                }
+                for (method, endpoint), stats in items
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_prometheus(self, prefix: str = "garminconnect") -> str:
+        """Render the counters in the Prometheus text exposition format."""
+
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        rows = []
+        for key, stats in self.snapshot().items():
+            method, endpoint = key.split(" ", 1)
+            rows.append((_labels(method=method, endpoint=endpoint), stats))
+
+        family("requests_total", "counter", "Requests sent to Garmin Connect.")
+        for labels, stats in rows:
+            for status, count in sorted(stats["status"].items()):
+                status_label = _labels(status=status)
+                lines.append(
+                    f"{prefix}_requests_total{{{labels},{status_label}}} {count}"
+                )
+        family(
+            "retries_total", "counter", "Request attempts that were retried."
+        )
+        for labels, stats in rows:
+            lines.append(
+                f"{prefix}_retries_total{{{labels}}} {stats['retries']}"
+            )
+        family(
+            "response_bytes_total", "counter", "Response body bytes received."
+        )
+        for labels, stats in rows:
+            lines.append(
+                f"{prefix}_response_bytes_total{{{labels}}} {stats['bytes']}"
+            )
+        family(
+            "request_duration_seconds",
+            "histogram",
+            "Request latency in seconds.",
+        )
+        for labels, stats in rows:
+            cumulative = 0
+            for le, count in stats["latency_buckets"].items():
+                cumulative += count
+                lines.append(
+                    f"{prefix}_request_duration_seconds_bucket"
+                    f'{{{labels},le="{le}"}} {cumulative}'
+                )
+            lines.append(
+                f"{prefix}_request_duration_seconds_sum{{{labels}}} "
+                f"{stats['latency_sum']}"
+            )
+            lines.append(
+                f"{prefix}_request_duration_seconds_count{{{labels}}} "
+                f"{stats['requests']}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "garminconnect"):
+        """Atomically write the Prometheus text format to 'path'."""
+
+        partial = f"{path}.tmp"
+        with open(partial, "w") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(partial, path)
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n")
+        )
+
+    return ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
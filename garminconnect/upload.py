@@ -0,0 +1,82 @@
+"""SQLite ledger of activity files already uploaded to Garmin Connect."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_LEDGER_PATH = "~/.garminconnect/uploads.sqlite"
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in chunks without reading it into memory at once."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadLedger:
+    """
+    Record of uploaded activity files keyed by the SHA-256 of their
+    content, so a file is uploaded once whatever its name or location.
+    Safe to share between threads and between Garmin instances.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        self.path = os.path.expanduser(path)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            "sha256 TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER, "
+            "status TEXT NOT NULL, uploaded_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def __contains__(self, sha256: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM uploads WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM uploads"
+            ).fetchone()
+        return count
+
+    def get(self, sha256: str) -> Optional[Dict]:
+        """Return the ledger entry for a content hash, if any."""
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path, size, status, uploaded_at FROM uploads "
+                "WHERE sha256 = ?",
+                (sha256,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("path", "size", "status", "uploaded_at"), row))
+
+    def record(self, sha256: str, path: str, size: int, status: str):
+        """Record a file as uploaded ('uploaded' or 'duplicate')."""
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?)",
+                (sha256, path, size, status, time.time()),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Incrementally sync activities from Garmin Connect as .FIT files.
+
+A SQLite manifest next to the downloads records every activity seen (ID,
+start time, type), its sync status, the file it was saved to and the
+SHA-256 of that file. Each run only lists activities newer than the
+newest one already in the manifest (the high-water mark), so a daily sync
+costs a single list call plus the new downloads. Downloads that failed on
+an earlier run are retried.
+
+Usage:
+    python sync_workouts.py [--output-dir workouts] [--type running]
+        [--full] [--max-attempts 5]
+
+    Credentials are read as in Get_workouts_data.py: from
+    USERNAMEPASSWORD.txt, the EMAIL and PASSWORD environment variables,
+    or a prompt.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+from garminconnect.upload import file_sha256
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SYNCED = "synced"
+FAILED = "failed"
+
+
+class Manifest:
+    """SQLite manifest of the activities seen and their sync status."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS activities ("
+            "activity_id INTEGER PRIMARY KEY, start_time TEXT NOT NULL, "
+            "activity_type TEXT, status TEXT NOT NULL, filename TEXT, "
+            "sha256 TEXT, attempts INTEGER NOT NULL DEFAULT 0, error TEXT, "
+            "updated_at TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def high_water_mark(self):
+        """Return the newest start time in the manifest, if any."""
+        (newest,) = self._db.execute(
+            "SELECT MAX(start_time) FROM activities"
+        ).fetchone()
+        return newest
+
+    def add(self, activity):
+        """
+        Record a listed activity as pending; False if already known. Not
+        committed until commit(), so an interrupted listing leaves the
+        high-water mark where it was.
+        """
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO activities (activity_id, start_time, "
+            "activity_type, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (
+                int(activity["activityId"]),
+                activity["startTimeLocal"],
+                activity["activityType"]["typeKey"],
+                PENDING,
+                _now(),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def to_download(self, activity_type=None, max_attempts=5):
+        """Return (activity_id, activity_type) rows still to be synced."""
+        query = (
+            "SELECT activity_id, activity_type FROM activities "
+            "WHERE status IN (?, ?) AND attempts < ?"
+        )
+        params = [PENDING, FAILED, max_attempts]
+        if activity_type:
+            query += " AND activity_type = ?"
+            params.append(activity_type)
+        return self._db.execute(
+            query + " ORDER BY start_time", params
+        ).fetchall()
+
+    def mark_synced(self, activity_id, filename, sha256):
+        self._db.execute(
+            "UPDATE activities SET status = ?, filename = ?, sha256 = ?, "
+            "attempts = attempts + 1, error = NULL, updated_at = ? "
+            "WHERE activity_id = ?",
+            (SYNCED, filename, sha256, _now(), activity_id),
+        )
+        self._db.commit()
+
+    def mark_failed(self, activity_id, error):
+        self._db.execute(
+            "UPDATE activities SET status = ?, attempts = attempts + 1, "
+            "error = ?, updated_at = ? WHERE activity_id = ?",
+            (FAILED, str(error), _now(), activity_id),
+        )
+        self._db.commit()
+
+    def counts(self):
+        """Return the number of activities per sync status."""
+        return dict(
+            self._db.execute(
+                "SELECT status, COUNT(*) FROM activities GROUP BY status"
+            ).fetchall()
+        )
+
+    def close(self):
+        self._db.close()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def list_new_activities(api, manifest, full=False, page_size=20):
+    """
+    Record activities newer than the manifest's high-water mark, newest
+    first, stopping at the first older one (or listing everything with
+    'full'). The listing is committed in one transaction once it reaches
+    the high-water mark or the end, so a failed run adds nothing and the
+    next one lists the same range again. Returns the number of activities
+    added to the manifest.
+    """
+    high_water_mark = None if full else manifest.high_water_mark()
+    added = 0
+    try:
+        for activity in api.iter_activities(page_size=page_size):
+            if (
+                high_water_mark
+                and activity["startTimeLocal"] < high_water_mark
+            ):
+                break
+            added += manifest.add(activity)
+    except BaseException:
+        manifest.rollback()
+        raise
+    manifest.commit()
+    logger.info(f"Found {added} new activities")
+    return added
+
+
+def download_activity(api, manifest, output_dir, activity_id, activity_type):
+    """Download one activity to output_dir and record the outcome."""
+    filename = os.path.join(output_dir, f"{activity_type}_{activity_id}.fit")
+    try:
+        api.download_activity_to(activity_id, filename)
+    except Exception as err:
+        logger.error(f"Error downloading activity {activity_id}: {err}")
+        manifest.mark_failed(activity_id, err)
+        return False
+    manifest.mark_synced(activity_id, filename, file_sha256(filename))
+    logger.info(f"Saved {filename}")
+    return True
+
+
+def sync_activities(
+    api,
+    output_dir="workouts",
+    activity_type=None,
+    full=False,
+    max_attempts=5,
+    manifest=None,
+):
+    """
+    List new activities and download every activity still to be synced,
+    including earlier failures with fewer than 'max_attempts' attempts.
+
+    Returns:
+        dict: Counts of new, downloaded and failed activities
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = Manifest(os.path.join(output_dir, "manifest.sqlite"))
+    try:
+        new = list_new_activities(api, manifest, full=full)
+        downloaded = failed = 0
+        for activity_id, kind in manifest.to_download(
+            activity_type, max_attempts
+        ):
+            if download_activity(api, manifest, output_dir, activity_id, kind):
+                downloaded += 1
+            else:
+                failed += 1
+        return {"new": new, "downloaded": downloaded, "failed": failed}
+    finally:
+        if own_manifest:
+            manifest.close()
+
+
+def main():
+    """Main function."""
+    from Get_workouts_data import get_credentials, init_api
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output-dir", default="workouts")
+    parser.add_argument("--type", help="only download this activity type")
+    parser.add_argument(
+        "--full", action="store_true", help="list every activity again"
+    )
+    parser.add_argument("--max-attempts", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    email, password = get_credentials()
+    api = init_api(email, password)
+
+    result = sync_activities(
+        api,
+        output_dir=args.output_dir,
+        activity_type=args.type,
+        full=args.full,
+        max_attempts=args.max_attempts,
+    )
+    logger.info(
+        f"{result['new']} new, {result['downloaded']} downloaded, "
+        f"{result['failed']} failed"
+    )
+    if result["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,16 @@ import os
 import re
 
 import pytest
+import requests
+from garth.exc import GarthHTTPError
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
+from garminconnect import Garmin
+
 
 @pytest.fixture
 def vcr(vcr):
@@ -172,3 +176,38 @@ def mock_environment(monkeypatch, tmp_path):
         "tokens_dir": tokens_dir,
         "tokens_file": tokens_file
     }
+
+
+@pytest.fixture
+def make_response():
+    """Build requests.Response objects to fake the garth transport"""
+    def make(body=None, status=200, headers=None, content=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        response._content = (
+            content if content is not None else json.dumps(body).encode()
+        )
+        response._content_consumed = True
+        return response
+    return make
+
+
+@pytest.fixture
+def http_error(make_response):
+    """Build the GarthHTTPError garth raises for an error status"""
+    def make(status, headers=None):
+        response = make_response({}, status=status, headers=headers)
+        return GarthHTTPError(
+            msg="Error in request",
+            error=requests.HTTPError(response=response),
+        )
+    return make
+
+
+@pytest.fixture
+def garmin():
+    """Create a Garmin client without logging in"""
+    client = Garmin()
+    client.display_name = "runner"
+    return client
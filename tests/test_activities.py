@@ -0,0 +1,89 @@
+import itertools
+import random
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+ACTIVITIES = [{"activityId": i} for i in range(95)]
+
+
+@pytest.fixture
+def server_calls():
+    """Serve ACTIVITIES through a fake paginated search endpoint"""
+    calls = []
+    lock = threading.Lock()
+
+    def search(url, params=None, **kwargs):
+        start, limit = int(params["start"]), int(params["limit"])
+        with lock:
+            calls.append(start)
+        time.sleep(random.uniform(0, 0.01))
+        return ACTIVITIES[start : start + limit]
+
+    search.calls = calls
+    return search
+
+
+def test_activities_by_date_serial(garmin, server_calls):
+    """Test the default serial walk over pages of 20"""
+    with patch.object(garmin, "connectapi", side_effect=server_calls):
+        activities = garmin.get_activities_by_date("2020-01-01")
+
+    assert activities == ACTIVITIES
+    assert server_calls.calls == [0, 20, 40, 60, 80, 100]
+
+
+def test_activities_by_date_prefetch_keeps_order(garmin, server_calls):
+    """Test that concurrent prefetch returns pages in server order"""
+    with patch.object(garmin, "connectapi", side_effect=server_calls):
+        activities = garmin.get_activities_by_date(
+            "2020-01-01", page_size=10, prefetch=4
+        )
+
+    assert activities == ACTIVITIES
+    # Never more than one window past the first empty page
+    assert max(server_calls.calls) <= 100 + 3 * 10
+
+
+def test_activities_by_date_passes_filters(garmin):
+    """Test that date, type and sort filters reach every page request"""
+    with patch.object(garmin, "connectapi", return_value=[]) as call:
+        garmin.get_activities_by_date(
+            "2020-01-01", "2020-12-31", "running", "asc"
+        )
+
+    params = call.call_args.kwargs["params"]
+    assert params == {
+        "startDate": "2020-01-01",
+        "endDate": "2020-12-31",
+        "activityType": "running",
+        "sortOrder": "asc",
+        "start": "0",
+        "limit": "20",
+    }
+
+
+def test_iter_activities_stops_paging_early(garmin, server_calls):
+    """Test that iteration only fetches the pages the caller consumes"""
+    odd = garmin.iter_activities(
+        page_size=10, predicate=lambda a: a["activityId"] % 2
+    )
+
+    with patch.object(garmin, "connectapi", side_effect=server_calls):
+        first = list(itertools.islice(odd, 7))
+
+    assert [a["activityId"] for a in first] == [1, 3, 5, 7, 9, 11, 13]
+    assert server_calls.calls == [0, 10]
+
+
+def test_iter_activities_exhausts_sparse_matches(garmin, server_calls):
+    """Test that a sparse predicate pages to the end of the history"""
+    with patch.object(garmin, "connectapi", side_effect=server_calls):
+        rare = list(
+            garmin.iter_activities(predicate=lambda a: a["activityId"] > 90)
+        )
+
+    assert [a["activityId"] for a in rare] == [91, 92, 93, 94]
+    assert server_calls.calls == [0, 20, 40, 60, 80, 100]
@@ -0,0 +1,69 @@
+import asyncio
+import inspect
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import AsyncGarmin
+
+
+def test_async_methods_mirror_sync_client(garmin):
+    """Test that sync methods are exposed as coroutines on the shared client"""
+    api = AsyncGarmin(client=garmin, concurrency=4)
+
+    assert api.garth is garmin.garth
+    assert api.display_name == "runner"
+    assert inspect.iscoroutinefunction(AsyncGarmin.get_sleep_data)
+
+    with patch.object(garmin, "connectapi", return_value={"id": 1}) as call:
+        result = asyncio.run(api.get_sleep_data("2024-01-01"))
+
+    assert result == {"id": 1}
+    call.assert_called_once()
+
+
+def test_concurrency_limit(garmin):
+    """Test that no more than `concurrency` calls run at the same time"""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def slow_call(*args, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return []
+
+    async def run():
+        async with AsyncGarmin(client=garmin, concurrency=3) as api:
+            return await asyncio.gather(
+                *(api.get_activities(i, 1) for i in range(12))
+            )
+
+    with patch.object(garmin, "connectapi", side_effect=slow_call):
+        results = asyncio.run(run())
+
+    assert len(results) == 12
+    assert 1 < state["peak"] <= 3
+
+
+def test_invalid_concurrency(garmin):
+    """Test that a non-positive concurrency limit is rejected"""
+    with pytest.raises(ValueError):
+        AsyncGarmin(client=garmin, concurrency=0)
+
+
+def test_generator_methods_become_async_generators(garmin):
+    """Test that iter_* methods can be consumed with async for"""
+    pages = [[{"activityId": 1}, {"activityId": 2}], [{"activityId": 3}], []]
+
+    async def collect(api):
+        return [a["activityId"] async for a in api.iter_activities()]
+
+    api = AsyncGarmin(client=garmin, concurrency=2)
+    with patch.object(garmin, "connectapi", side_effect=pages):
+        assert asyncio.run(collect(api)) == [1, 2, 3]
@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+import pytest
+from garth.exc import GarthHTTPError
+
+from garminconnect import (
+    CircuitBreaker,
+    Garmin,
+    GarminConnectConnectionError,
+    GarminConnectServiceUnavailableError,
+    RetryPolicy,
+)
+
+
+@pytest.fixture
+def garmin():
+    """Create a client whose breaker opens after 2 failures, no retries"""
+    return Garmin(
+        retry_policy=RetryPolicy(max_retries=0),
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+
+
+def test_open_family_fails_fast_others_keep_working(
+    garmin, make_response, http_error
+):
+    """Test that a failing family is refused while another is served"""
+
+    def request(method, subdomain, path, **kwargs):
+        if path.startswith("/wellness-service"):
+            raise http_error(503)
+        return make_response({"ok": True})
+
+    with patch.object(garmin.garth, "request", side_effect=request) as mock:
+        for _ in range(2):
+            with pytest.raises(GarthHTTPError):
+                garmin.get_stress_data("2024-01-01")
+        with pytest.raises(GarminConnectServiceUnavailableError) as raised:
+            garmin.get_stress_data("2024-01-01")
+        assert garmin.get_hrv_data("2024-01-01") == {"ok": True}
+
+    assert isinstance(raised.value, GarminConnectConnectionError)
+    assert mock.call_count == 3
+    health = garmin.service_health()
+    assert health["wellness-service"]["state"] == "open"
+    assert health["wellness-service"]["retry_in"] > 0
+    assert health["hrv-service"]["state"] == "closed"
+    assert health["download-service"]["state"] == "closed"
+
+
+def test_half_open_probe_closes_or_reopens(garmin, make_response, http_error):
+    """Test that one probe is let through after the reset timeout"""
+    breaker = garmin.circuit_breaker
+    replies = [http_error(503), http_error(503), http_error(502)]
+
+    with patch("garminconnect.breaker.time.monotonic", return_value=100.0):
+        with patch.object(garmin.garth, "request", side_effect=replies):
+            for _ in range(2):
+                with pytest.raises(GarthHTTPError):
+                    garmin.get_stress_data("2024-01-01")
+
+    with patch("garminconnect.breaker.time.monotonic", return_value=161.0):
+        with patch.object(garmin.garth, "request", side_effect=replies[2:]):
+            with pytest.raises(GarthHTTPError):
+                garmin.get_stress_data("2024-01-01")
+        assert breaker.health()["wellness-service"]["state"] == "open"
+
+    with patch("garminconnect.breaker.time.monotonic", return_value=222.0):
+        assert breaker.allow("wellness-service") is None
+        assert breaker.health()["wellness-service"]["state"] == "half_open"
+        assert breaker.allow("wellness-service") == pytest.approx(60.0)
+        breaker.record_success("wellness-service")
+
+    assert breaker.health()["wellness-service"] == {
+        "state": "closed",
+        "failures": 0,
+        "retry_in": 0.0,
+    }
+
+
+def test_client_errors_do_not_trip_the_breaker(garmin, http_error):
+    """Test that 4xx responses count as a healthy service"""
+    with patch.object(garmin.garth, "request", side_effect=http_error(404)):
+        for _ in range(3):
+            with pytest.raises(GarthHTTPError):
+                garmin.get_stress_data("2024-01-01")
+
+    assert garmin.service_health()["wellness-service"]["state"] == "closed"
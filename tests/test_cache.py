@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import CacheRule, Garmin, ResponseCache
+
+OLD_DAY = str(date.today() - timedelta(days=30))
+TODAY = str(date.today())
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a response cache in a temporary directory"""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def garmin(cache):
+    """Create a Garmin client that uses the temporary cache"""
+    client = Garmin(cache=cache)
+    client.display_name = "runner"
+    return client
+
+
+def test_past_wellness_data_is_served_from_cache(garmin, cache, make_response):
+    """Test that a repeated call for an old date never hits the network"""
+    with patch.object(
+        garmin.garth, "request", return_value=make_response({"sleep": 1})
+    ) as call:
+        first = garmin.get_sleep_data(OLD_DAY)
+        second = garmin.get_sleep_data(OLD_DAY)
+
+    assert first == second == {"sleep": 1}
+    call.assert_called_once()
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_rules_control_expiry():
+    """Test TTL and immutable-after rules for recent and old dates"""
+    rule = CacheRule("/hrv-service", ttl=60, immutable_after_days=3)
+
+    assert rule.expires_at(f"/hrv-service/hrv/{OLD_DAY}", None, 0) is None
+    assert rule.expires_at(f"/hrv-service/hrv/{TODAY}", None, 0) == 60
+    assert rule.expires_at("/hrv-service/hrv", {"date": TODAY}, 0) == 60
+
+
+def test_uncovered_and_write_calls_bypass_cache(garmin, cache, make_response):
+    """Test that endpoints without a rule and non-GET calls are not cached"""
+    with patch.object(
+        garmin.garth, "request", return_value=make_response([])
+    ) as call:
+        garmin.get_devices()
+        garmin.get_devices()
+        garmin.connectapi("/wellness-service/x", method="POST", json={})
+
+    assert call.call_count == 3
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_by_prefix(cache):
+    """Test dropping cached responses for one endpoint family"""
+    cache.store(f"/hrv-service/hrv/{OLD_DAY}", None, {"hrv": 1})
+    cache.store("/wellness-service/wellness/dailyStress/x", None, {"s": 1})
+
+    assert cache.invalidate("/hrv-service") == 1
+    assert cache.lookup(f"/hrv-service/hrv/{OLD_DAY}") == (False, None)
+    assert cache.stats()["entries"] == 1
+
+
+def test_cache_is_namespaced_per_account(cache):
+    """Test that two accounts sharing a cache file do not see each other"""
+    path = f"/hrv-service/hrv/{OLD_DAY}"
+    cache.store(path, None, {"hrv": "a"}, namespace="athlete-a")
+
+    assert cache.lookup(path, namespace="athlete-b") == (False, None)
+    assert cache.lookup(path, namespace="athlete-a") == (True, {"hrv": "a"})
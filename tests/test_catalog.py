@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+
+from garminconnect import Garmin, RetryPolicy
+from garminconnect.standin import StandIn
+
+pytest.importorskip("pyarrow")
+
+from garminconnect.catalog import ActivityCatalog  # noqa: E402
+
+SEARCH = "/activitylist-service/activities/search/activities"
+
+
+@pytest.fixture
+def api():
+    """Run a stand-in server with two years of activities"""
+    with StandIn(activities=730) as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def garmin(api):
+    """Create a Garmin client attached to the stand-in"""
+    return api.attach(Garmin(retry_policy=RetryPolicy(backoff=0)))
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Create an empty catalog"""
+    return ActivityCatalog(str(tmp_path / "catalog.parquet"))
+
+
+def test_update_is_incremental_and_persisted(api, garmin, catalog):
+    """Test that a second update only lists the first page"""
+    assert catalog.update(garmin) == 730
+    api.hits.clear()
+    api.activities[:0] = [api._activity(1000, date(2025, 1, 1))]
+
+    assert catalog.update(garmin) == 1
+
+    assert api.hits[SEARCH] == 1
+    reopened = ActivityCatalog(catalog.path)
+    assert len(reopened) == 731
+    assert 10_001_000 in reopened and 42 not in reopened
+    assert reopened.high_water_mark().date() == date(2025, 1, 1)
+
+
+def test_query_matches_a_plain_filter(api, garmin, catalog):
+    """Test 'all runs over 15 km in 2024' against the raw summaries"""
+    catalog.update(garmin)
+
+    runs = catalog.query(
+        activity_type="running",
+        start="2024-01-01",
+        end="2024-12-31",
+        where=[("distance", ">", 15000)],
+        columns=["activity_id", "distance"],
+    )
+
+    expected = [
+        activity["activityId"]
+        for activity in api.activities
+        if activity["activityType"]["typeKey"] == "running"
+        and activity["startTimeLocal"].startswith("2024")
+        and activity["distance"] > 15000
+    ]
+    assert runs.column_names == ["activity_id", "distance"]
+    assert runs["activity_id"].to_pylist() == expected
+    assert (
+        catalog.query(where=[("activity_id", "in", expected[:2])])[
+            "activity_id"
+        ].to_pylist()
+        == expected[:2]
+    )
+
+
+def test_aggregate_by_year(api, garmin, catalog):
+    """Test counting and summing distance per year"""
+    catalog.update(garmin)
+
+    totals = catalog.aggregate(by="year", metrics=["distance"]).to_pylist()
+
+    assert [row["year"] for row in totals] == [2023, 2024]
+    assert sum(row["activity_id_count"] for row in totals) == 730
+    assert sum(row["distance_sum"] for row in totals) == pytest.approx(
+        sum(activity["distance"] for activity in api.activities)
+    )
+
+
+def test_aggregate_by_month_keeps_years_apart(api, garmin, catalog):
+    """Test that the same month of two years is grouped separately"""
+    catalog.update(garmin)
+
+    totals = catalog.aggregate(by="month", metrics=["distance"]).to_pylist()
+
+    months = [row["month"] for row in totals]
+    assert months[0] == "2023-01" and months[-1].startswith("2024-")
+    assert "2024-01" in months
+    assert len(months) == len(set(months)) == 24
+    assert sum(row["activity_id_count"] for row in totals) == 730
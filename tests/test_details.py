@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import Garmin
+from garminconnect.details import decode_activity_details
+
+np = pytest.importorskip("numpy")
+
+DETAILS = {
+    "metricDescriptors": [
+        {"metricsIndex": 1, "key": "directHeartRate"},
+        {"metricsIndex": 0, "key": "directTimestamp"},
+        {"metricsIndex": 2, "key": "directSpeed"},
+    ],
+    "activityDetailMetrics": [
+        {"metrics": [1704103200000.0, 120.0, 2.5]},
+        {"metrics": [1704103201000.0, None, 2.6]},
+        {"metrics": [None, 125.0, None]},
+    ],
+    "geoPolylineDTO": {
+        "polyline": [
+            {"lat": 52.1, "lon": 4.3, "time": 1704103200000},
+            {"lat": 52.2, "lon": 4.4, "time": 1704103201000},
+        ]
+    },
+}
+
+
+def test_decode_activity_details_arrays():
+    """Test decoding metric streams into typed arrays"""
+    columns = decode_activity_details(DETAILS)
+
+    heart_rate = columns["directHeartRate"]
+    assert heart_rate.dtype == np.float64
+    np.testing.assert_array_equal(heart_rate, [120.0, np.nan, 125.0])
+    stamps = columns["directTimestamp"]
+    assert stamps.dtype == np.dtype("datetime64[ms]")
+    assert stamps[0] == np.datetime64("2024-01-01T10:00:00", "ms")
+    assert np.isnat(stamps[2])
+    np.testing.assert_array_equal(
+        columns["polyline"], [[52.1, 4.3], [52.2, 4.4]]
+    )
+
+
+def test_decode_ragged_and_empty_payloads():
+    """Test short rows padded with NaN and a payload without samples"""
+    ragged = dict(
+        DETAILS,
+        activityDetailMetrics=[
+            {"metrics": [1704103200000.0, 120.0, 2.5]},
+            {"metrics": [1704103201000.0]},
+        ],
+    )
+
+    columns = decode_activity_details(ragged)
+    np.testing.assert_array_equal(columns["directSpeed"], [2.5, np.nan])
+
+    empty = decode_activity_details({"metricDescriptors": []})
+    assert empty["polyline"].shape == (0, 2)
+
+
+def test_get_activity_details_dataframe():
+    """Test the DataFrame form fetched through the client"""
+    pytest.importorskip("pandas")
+    garmin = Garmin()
+
+    with patch.object(garmin, "connectapi", return_value=DETAILS):
+        frame = garmin.get_activity_details_arrays(1, dataframe=True)
+
+    assert list(frame.columns) == [
+        "directTimestamp",
+        "directHeartRate",
+        "directSpeed",
+    ]
+    assert len(frame) == 3
+    assert frame.attrs["polyline"].shape == (2, 2)
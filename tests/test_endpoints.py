@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+from garminconnect import Garmin
+
+
+def test_endpoints_are_shared_class_attributes():
+    """Test that endpoint URLs live on the class, not on each instance"""
+    garmin = Garmin()
+
+    assert "garmin_connect_activities" not in vars(garmin)
+    assert (
+        garmin.garmin_connect_activities
+        == Garmin.ENDPOINTS["garmin_connect_activities"]
+    )
+    with pytest.raises(TypeError):
+        Garmin.ENDPOINTS["garmin_connect_activities"] = "/elsewhere"
+
+
+def test_withings_is_imported_lazily():
+    """Test that importing the package does not load withings_sync"""
+    code = (
+        "import sys, garminconnect; garminconnect.Garmin(); "
+        "print('withings_sync' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+import pytest
+
+
+def test_fetch_range_keys_results_by_date_in_order(garmin):
+    """Test that per-day results come back ordered by date"""
+
+    def hrv(url, **kwargs):
+        return {"day": url.rsplit("/", 1)[-1]}
+
+    with patch.object(garmin, "connectapi", side_effect=hrv):
+        results, failures = garmin.fetch_range(
+            "get_hrv_data", "2024-02-27", "2024-03-02", workers=3
+        )
+
+    assert failures == {}
+    assert list(results) == [
+        "2024-02-27",
+        "2024-02-28",
+        "2024-02-29",
+        "2024-03-01",
+        "2024-03-02",
+    ]
+    assert all(results[day] == {"day": day} for day in results)
+
+
+def test_fetch_range_reports_failed_days(garmin):
+    """Test that one failing day does not abort the whole range"""
+
+    def flaky(url, **kwargs):
+        if url.endswith("2024-01-02"):
+            raise ConnectionError("boom")
+        return {}
+
+    with patch.object(garmin, "connectapi", side_effect=flaky):
+        results, failures = garmin.fetch_range(
+            "get_spo2_data", "2024-01-01", "2024-01-03"
+        )
+
+    assert list(results) == ["2024-01-01", "2024-01-03"]
+    assert list(failures) == ["2024-01-02"]
+    assert isinstance(failures["2024-01-02"], ConnectionError)
+
+
+def test_fetch_range_rejects_unknown_metric(garmin):
+    """Test that only single-day methods are accepted"""
+    with pytest.raises(ValueError):
+        garmin.fetch_range("delete_activity", "2024-01-01", "2024-01-02")
@@ -0,0 +1,106 @@
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from decode_fit import (  # noqa: E402
+    decode_fit_file,
+    get_archived_fits,
+    process_fit_files,
+)
+from fit_archive import FitArchive  # noqa: E402
+
+SAMPLE = Path(__file__).parent / "12129115726_ACTIVITY.fit"
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Create an empty archive"""
+    with FitArchive(str(tmp_path / "archive")) as archive:
+        yield archive
+
+
+def test_identical_content_is_stored_once(archive):
+    """Test that two activities with the same bytes share one blob"""
+    data = b"\x0e\x10\x00\x00\x04\x00\x00\x00.FIT" + bytes(4096)
+
+    first = archive.add_bytes(data, 1, "running", "2024-01-01 10:00:00")
+    second = archive.add_bytes(data, 2, "running", "2024-01-02 10:00:00")
+
+    assert first == second
+    assert len(archive) == 2 and 1 in archive and 3 not in archive
+    assert archive.read(1) == archive.read(first) == data
+    assert [entry["activity_id"] for entry in archive.entries()] == [2, 1]
+    stats = archive.stats()
+    assert stats["blobs"] == 1
+    assert stats["bytes"] == len(data)
+    assert stats["stored_bytes"] < len(data) // 10
+    with pytest.raises(KeyError):
+        archive.open(3)
+
+
+def test_import_directory_parses_script_names(archive, tmp_path):
+    """Test importing files named by both download scripts"""
+    loose = tmp_path / "workouts"
+    loose.mkdir()
+    (loose / "lap_swimming_42.fit").write_bytes(b"swim")
+    (loose / "20240101_100000_running.fit").write_bytes(b"run")
+    (loose / "notes.txt").write_text("not a FIT file")
+
+    (loose / "20240102_100000_running.fit").write_bytes(b"indexed run")
+    archive.add_bytes(b"indexed run", 7, "running")
+
+    assert archive.import_directory(str(loose), remove=True) == 3
+
+    assert archive.entries(activity_type="lap_swimming") == [
+        {
+            "activity_id": 42,
+            "activity_type": "lap_swimming",
+            "start_time": None,
+            "sha256": archive.add_bytes(b"swim"),
+            "size": 4,
+        }
+    ]
+    assert archive.read(archive.add_bytes(b"run")) == b"run"
+    assert sorted(p.name for p in loose.iterdir()) == [
+        "20240101_100000_running.fit",
+        "notes.txt",
+    ]
+
+
+@pytest.mark.skipif(not SAMPLE.exists(), reason="Sample FIT file not found")
+def test_decode_fit_file_reads_compressed_copies(archive, tmp_path):
+    """Test decoding a .fit.gz file and an archive entry"""
+    compressed = tmp_path / "run.fit.gz"
+    compressed.write_bytes(gzip.compress(SAMPLE.read_bytes()))
+    archive.add_file(str(SAMPLE), 12129115726, "running")
+
+    plain = decode_fit_file(str(SAMPLE), str(tmp_path / "plain.csv"))
+    from_gz = decode_fit_file(str(compressed), str(tmp_path / "gz.csv"))
+    from_archive = decode_fit_file(
+        archive.open(12129115726), str(tmp_path / "archive.csv")
+    )
+
+    assert len(plain) > 0
+    assert from_gz.equals(plain)
+    assert from_archive.equals(plain)
+
+
+@pytest.mark.skipif(not SAMPLE.exists(), reason="Sample FIT file not found")
+def test_process_fit_files_includes_archived_activities(tmp_path, monkeypatch):
+    """Test batch decoding of archived activities without a loose copy"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "workouts").mkdir()
+    with FitArchive(str(tmp_path / "workouts" / "archive")) as archive:
+        archive.add_file(str(SAMPLE), 12129115726, "running")
+
+    process_fit_files()
+
+    csv_dir = tmp_path / "workouts" / "CSV"
+    assert [p.name for p in csv_dir.iterdir()] == ["running_12129115726.csv"]
+
+    assert get_archived_fits(["running_12129115726.fit"]) == []
+    assert len(get_archived_fits(["20240101_100000_running.fit"])) == 1
@@ -0,0 +1,135 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from garminconnect import (
+    GarminConnectConnectionError,
+    GarminConnectInvalidFileFormatError,
+    GarminConnectTooManyRequestsError,
+)
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fit_archive import FitArchive  # noqa: E402
+from fit_downloads import download_activities  # noqa: E402
+
+FIT = b"\x0e\x10\x00\x00\x04\x00\x00\x00.FIT" + bytes(16)
+
+
+def write_fit(activity_id, destination):
+    """Fake download_activity_to writing a FIT file"""
+    Path(destination).write_bytes(FIT)
+    return len(FIT)
+
+
+@pytest.fixture
+def api():
+    """Mock Garmin client streaming FIT files to disk"""
+    client = MagicMock()
+    client.download_activity_to.side_effect = write_fit
+    return client
+
+
+def test_downloads_are_streamed_to_each_file(api, tmp_path):
+    """Test that every job is downloaded with download_activity_to"""
+    jobs = [(n, str(tmp_path / f"{n}.fit")) for n in range(10)]
+
+    report = download_activities(api, jobs, workers=3)
+
+    assert report == {
+        "downloaded": 10,
+        "skipped": 0,
+        "failed": 0,
+        "bytes": 10 * len(FIT),
+    }
+    assert (tmp_path / "3.fit").read_bytes() == FIT
+    api.download_activity.assert_not_called()
+
+
+def test_valid_copies_are_skipped(api, tmp_path):
+    """Test that only missing or truncated files are downloaded again"""
+    (tmp_path / "1.fit").write_bytes(FIT)
+    (tmp_path / "2.fit").write_bytes(FIT[:5])
+    jobs = [(n, str(tmp_path / f"{n}.fit")) for n in (1, 2, 3)]
+
+    report = download_activities(api, jobs)
+
+    assert report["skipped"] == 1
+    assert report["downloaded"] == 2
+    downloaded = [call.args[0] for call in api.download_activity_to.mock_calls]
+    assert sorted(downloaded) == [2, 3]
+    assert (tmp_path / "2.fit").read_bytes() == FIT
+
+
+def test_only_transient_errors_are_retried(api, tmp_path, http_error):
+    """Test that connection, 429 and 5xx errors are retried, others not"""
+    errors = {
+        1: [GarminConnectConnectionError("reset")],
+        2: [GarminConnectTooManyRequestsError("slow down")],
+        3: [http_error(404)],
+        4: [GarminConnectInvalidFileFormatError("no .fit in archive")],
+        5: [http_error(503), requests.ConnectionError("refused")],
+        6: [requests.exceptions.ChunkedEncodingError("reset")],
+    }
+
+    def download(activity_id, destination):
+        if errors[activity_id]:
+            raise errors[activity_id].pop(0)
+        return write_fit(activity_id, destination)
+
+    api.download_activity_to.side_effect = download
+    jobs = [(n, str(tmp_path / f"{n}.fit")) for n in errors]
+
+    report = download_activities(api, jobs, retries=2, backoff=0)
+
+    assert report["downloaded"] == 4
+    assert report["failed"] == 2
+    attempts = [call.args[0] for call in api.download_activity_to.mock_calls]
+    assert sorted(attempts) == [1, 1, 2, 2, 3, 4, 5, 5, 5, 6, 6]
+    assert not (tmp_path / "3.fit").exists()
+
+
+def test_downloads_are_archived(api, tmp_path):
+    """Test that downloads are indexed and archived ones not fetched again"""
+    jobs = [
+        (n, str(tmp_path / f"{n}.fit"), "running", f"2024-01-0{n} 10:00:00")
+        for n in (1, 2)
+    ]
+
+    with FitArchive(str(tmp_path / "archive")) as archive:
+        download_activities(api, jobs, archive=archive)
+        for _, path, _, _ in jobs:
+            Path(path).unlink()
+        report = download_activities(api, jobs, archive=archive)
+
+        assert report["skipped"] == 2
+        assert [e["activity_id"] for e in archive.entries()] == [2, 1]
+        assert archive.read(1) == FIT
+    assert api.download_activity_to.call_count == 2
+
+
+def test_downloads_go_to_the_archive_only(api, tmp_path):
+    """Test that jobs without a filename leave no loose file behind"""
+    jobs = [(n, None, "running", f"2024-01-0{n} 10:00:00") for n in (1, 2)]
+
+    with FitArchive(str(tmp_path / "archive")) as archive:
+        report = download_activities(api, jobs, archive=archive)
+
+        assert report["downloaded"] == 2
+        assert archive.read(1) == FIT
+        assert sorted(p.name for p in (tmp_path / "archive").iterdir()) == [
+            "index.sqlite",
+            "objects",
+        ]
+
+        wanted = tmp_path / "1.fit"
+        report = download_activities(
+            api, [(1, str(wanted), "running", None)], archive=archive
+        )
+
+    assert report["skipped"] == 1
+    assert wanted.read_bytes() == FIT
+    assert api.download_activity_to.call_count == 2
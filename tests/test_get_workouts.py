@@ -2,7 +2,7 @@ import pytest
 import os
 import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock, PropertyMock
+from unittest.mock import patch, MagicMock, PropertyMock, ANY
 import json
 import logging
 
@@ -31,7 +31,7 @@ def mock_garmin_client():
     """Mock Garmin client for testing"""
     client = MagicMock()
     # Mock activities list
-    client.get_activities.return_value = [
+    client.activities = [
         {
             'activityId': '12345678',
             'activityType': {'typeKey': 'running'},
@@ -43,6 +43,16 @@ def mock_garmin_client():
             'startTimeLocal': '2024-01-01 11:00:00'
         }
     ]
+
+    def iter_activities(start=0, page_size=20, predicate=None, activitytype=None):
+        # Filter by type server-side, then apply the client predicate
+        for activity in client.activities[start:]:
+            if activitytype and activity['activityType']['typeKey'] != activitytype:
+                continue
+            if predicate is None or predicate(activity):
+                yield activity
+
+    client.iter_activities.side_effect = iter_activities
     return client
 
 @pytest.fixture
@@ -128,23 +138,49 @@ def test_download_workouts(mock_garmin_client, temp_workouts_dir):
     with patch('os.path.exists') as mock_exists:
         mock_exists.return_value = True
         
-        # Mock the download_activity method
-        mock_garmin_client.download_activity.return_value = b"mock_fit_data"
-        mock_garmin_client.ActivityDownloadFormat = MagicMock()
-        mock_garmin_client.ActivityDownloadFormat.ORIGINAL = 'fit'
+        # Mock the download_activity_to method
+        mock_garmin_client.download_activity_to.return_value = len(b"mock_fit_data")
         
-        downloaded = download_workouts(mock_garmin_client, workout_type, count)
+        downloaded = download_workouts(mock_garmin_client, workout_type, count, output_dir=str(temp_workouts_dir))
         
         assert downloaded == 1
-        mock_garmin_client.get_activities.assert_called_once()
-        mock_garmin_client.download_activity.assert_called_once_with('12345678', dl_fmt='fit')
+        mock_garmin_client.iter_activities.assert_called_once_with(
+            page_size=count, activitytype=workout_type, predicate=ANY
+        )
+        mock_garmin_client.get_activities.assert_not_called()
+        mock_garmin_client.download_activity_to.assert_called_once_with(
+            '12345678', f"{temp_workouts_dir}/running_12345678.fit"
+        )
 
 def test_download_workouts_no_activities(mock_garmin_client, temp_workouts_dir):
     """Test downloading workouts when no activities are found"""
-    mock_garmin_client.get_activities.return_value = []
+    mock_garmin_client.activities = []
     
     with patch('os.path.exists') as mock_exists:
         mock_exists.return_value = True
         
         downloaded = download_workouts(mock_garmin_client, "running", 1)
-        assert downloaded == 0 
\ No newline at end of file
+        assert downloaded == 0
+
+def test_download_workouts_finds_rare_types(mock_garmin_client, temp_workouts_dir):
+    """Test that a type rarer than one in three still yields N workouts"""
+    mock_garmin_client.activities = [
+        {
+            'activityId': str(n),
+            'activityType': {'typeKey': 'swimming' if n % 10 == 0 else 'running'},
+            'startTimeLocal': '2024-01-01 10:00:00'
+        }
+        for n in range(100)
+    ]
+    def download_activity_to(activity_id, destination):
+        Path(destination).write_bytes(b"mock_fit_data")
+        return len(b"mock_fit_data")
+
+    mock_garmin_client.download_activity_to.side_effect = download_activity_to
+
+    downloaded = download_workouts(mock_garmin_client, "swimming", 5, output_dir=str(temp_workouts_dir))
+
+    assert downloaded == 5
+    assert sorted(p.name for p in temp_workouts_dir.iterdir()) == [
+        f"swimming_{n}.fit" for n in (0, 10, 20, 30, 40)
+    ]
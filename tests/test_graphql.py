@@ -0,0 +1,141 @@
+import re
+from unittest.mock import patch
+
+
+from garminconnect import GarminConnectConnectionError
+from garminconnect.graphql import build_batches, split_fields
+
+
+def sleep_query(day):
+    """Build a per-day sleep summary query"""
+    return {
+        "query": f'query{{sleepSummariesScalar(startDate:"{day}", '
+        f'endDate:"{day}")}}'
+    }
+
+
+def fake_server(sent):
+    """Fake GraphQL endpoint echoing each aliased field's arguments"""
+
+    def query_garmin_graphql(query):
+        sent.append(query)
+        document = query["query"]
+        data = {
+            alias: {"args": args}
+            for alias, args in re.findall(
+                r"(q\d+_\d+):\w+\(([^)]*)\)", document
+            )
+        }
+        errors = [
+            {"message": "not allowed", "path": [alias, "value"]}
+            for alias, args in data.items()
+            if "forbidden" in args["args"]
+        ]
+        return {"data": data, "errors": errors} if errors else {"data": data}
+
+    return query_garmin_graphql
+
+
+def test_split_fields():
+    """Test splitting top-level fields and rejecting unsafe documents"""
+    document = """
+        query Dashboard {
+            steps: dailySteps(date: "2024-01-01") { total }
+            # a comment with } brace
+            sleep(note: "a } in a string")
+        }
+    """
+
+    assert split_fields(document) == [
+        ("steps", 'dailySteps(date: "2024-01-01") { total }'),
+        ("sleep", 'sleep(note: "a } in a string")'),
+    ]
+    assert split_fields("query($d: String){steps(date: $d)}") is None
+    assert split_fields("mutation{deleteAll}") is None
+    assert split_fields("{...Fragment}") is None
+    assert split_fields("{steps(date: 1)") is None
+
+
+def test_build_batches_respects_size_cap():
+    """Test that queries are packed without exceeding the document size"""
+    fields = [split_fields(sleep_query(n)["query"]) for n in range(10)]
+
+    batches = build_batches(fields, max_size=200)
+
+    assert all(len(document) <= 200 for document, _ in batches)
+    assert sorted(
+        index for _, aliases in batches for index, _ in aliases.values()
+    ) == list(range(10))
+
+
+def test_batch_merges_queries_and_splits_results(garmin):
+    """Test that many queries use few requests and keep their own results"""
+    sent = []
+    queries = [sleep_query(f"2024-01-{day:02}") for day in range(1, 31)]
+    queries.append('{sleepSummariesScalar(startDate:"forbidden")}')
+    with patch.object(
+        garmin, "query_garmin_graphql", side_effect=fake_server(sent)
+    ):
+        results = garmin.query_garmin_graphql_batch(queries)
+
+    assert len(sent) == 1
+    assert results[0] == {
+        "data": {
+            "sleepSummariesScalar": {
+                "args": 'startDate:"2024-01-01", endDate:"2024-01-01"'
+            }
+        }
+    }
+    assert "errors" not in results[29]
+    assert results[30]["errors"] == [
+        {"message": "not allowed", "path": ["sleepSummariesScalar", "value"]}
+    ]
+
+
+def test_queries_with_variables_are_sent_alone(garmin):
+    """Test that a query with variables is passed through unchanged"""
+    sent = []
+    with_variables = {
+        "query": "query($d: String){steps(date: $d)}",
+        "variables": {"d": "2024-01-01"},
+    }
+    with patch.object(
+        garmin, "query_garmin_graphql", side_effect=fake_server(sent)
+    ):
+        garmin.query_garmin_graphql_batch(
+            [sleep_query("2024-01-01"), with_variables]
+        )
+
+    assert len(sent) == 2
+    assert with_variables in sent
+
+
+def test_failed_batch_only_fails_its_own_queries(garmin):
+    """Test that a failing request errors only the queries it carried"""
+    sent = []
+    server = fake_server(sent)
+    queries = [sleep_query(f"2024-01-{day:02}") for day in range(1, 11)]
+
+    def flaky(query):
+        if "2024-01-05" in query["query"]:
+            raise GarminConnectConnectionError("Error in request: reset")
+        return server(query)
+
+    with patch.object(garmin, "query_garmin_graphql", side_effect=flaky):
+        results = garmin.query_garmin_graphql_batch(
+            queries, max_document_size=200
+        )
+
+    failed = [i for i, result in enumerate(results) if result["data"] is None]
+    assert 4 in failed
+    assert 0 < len(failed) < len(queries)
+    for i in failed:
+        assert results[i]["errors"] == [
+            {
+                "message": "Error in request: reset",
+                "extensions": {"exception": "GarminConnectConnectionError"},
+            }
+        ]
+    for i in set(range(len(queries))) - set(failed):
+        assert results[i]["data"]["sleepSummariesScalar"]["args"]
+        assert "errors" not in results[i]
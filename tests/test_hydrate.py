@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import Garmin
+
+
+def fake_connectapi(path, params=None):
+    """Fake connectapi answering activity endpoints, weather always fails"""
+    if path.endswith("/weather"):
+        raise ConnectionError("weather unavailable")
+    if params and "activityId" in params:
+        return [{"gear": params["activityId"]}]
+    return {"path": path}
+
+
+def test_hydrate_activities_returns_one_record_per_activity(garmin):
+    """Test fetching parts for several activities with per-part errors"""
+    with patch.object(garmin, "connectapi", side_effect=fake_connectapi):
+        records = garmin.hydrate_activities(
+            [1, 2, 3], parts=["summary", "splits", "weather", "gear"]
+        )
+
+    assert [record["activityId"] for record in records] == ["1", "2", "3"]
+    first = records[0]
+    assert first["summary"] == {"path": "/activity-service/activity/1"}
+    assert first["splits"] == {"path": "/activity-service/activity/1/splits"}
+    assert first["gear"] == [{"gear": "1"}]
+    assert "weather" not in first
+    assert list(first["errors"]) == ["weather"]
+    assert isinstance(first["errors"]["weather"], ConnectionError)
+
+
+def test_hydrate_activities_defaults_and_validation(garmin):
+    """Test the default parts and rejection of unknown parts"""
+    with patch.object(garmin, "connectapi", side_effect=fake_connectapi):
+        (record,) = garmin.hydrate_activities([1])
+
+    fetched = set(record) | set(record["errors"])
+    assert fetched - {"activityId", "errors"} == set(
+        Garmin.DEFAULT_ACTIVITY_PARTS
+    )
+    with pytest.raises(ValueError):
+        garmin.hydrate_activities([1], parts=["summary", "photos"])
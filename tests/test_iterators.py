@@ -0,0 +1,84 @@
+import itertools
+from unittest.mock import patch
+
+
+def paginated(items, first_index=0):
+    """Fake connectapi serving 'items' by start/limit, recording params"""
+    calls = []
+
+    def connectapi(url, params=None):
+        calls.append((url, dict(params)))
+        start = int(params["start"]) - first_index
+        return items[start : start + int(params["limit"])]
+
+    connectapi.calls = calls
+    return connectapi
+
+
+def test_get_goals_pages_through_iter_goals(garmin):
+    """Test that get_goals still returns every goal across pages"""
+    goals = [{"goalId": n} for n in range(65)]
+    fake = paginated(goals, first_index=1)
+
+    with patch.object(garmin, "connectapi", side_effect=fake):
+        assert garmin.get_goals("past") == goals
+
+    assert len(fake.calls) == 4
+    url, params = fake.calls[0]
+    assert url == "/goal-service/goal/goals"
+    assert params == {
+        "status": "past",
+        "sortOrder": "asc",
+        "limit": "30",
+        "start": "1",
+    }
+
+
+def test_iter_workouts_with_prefetch(garmin):
+    """Test that prefetched pages are yielded in order"""
+    workouts = [{"workoutId": n} for n in range(250)]
+    fake = paginated(workouts)
+
+    with patch.object(garmin, "connectapi", side_effect=fake):
+        streamed = list(garmin.iter_workouts(page_size=40, prefetch=3))
+
+    assert streamed == workouts
+
+
+def test_iter_gear_activities_is_lazy(garmin):
+    """Test that only the pages consumed are requested"""
+    activities = [{"activityId": n} for n in range(1000)]
+    fake = paginated(activities)
+
+    with patch.object(garmin, "connectapi", side_effect=fake):
+        first = list(
+            itertools.islice(
+                garmin.iter_gear_activities("abc123", page_size=10), 15
+            )
+        )
+
+    assert first == activities[:15]
+    assert len(fake.calls) == 2
+    assert fake.calls[0][0] == "/activitylist-service/activities/abc123/gear"
+
+
+def test_iter_activities_filters_type_on_the_server(garmin):
+    """Test that activitytype is sent as the activityType parameter"""
+    runs = [{"activityId": n} for n in range(5)]
+    fake = paginated(runs)
+
+    with patch.object(garmin, "connectapi", side_effect=fake):
+        first = list(
+            itertools.islice(
+                garmin.iter_activities(page_size=3, activitytype="running"),
+                3,
+            )
+        )
+
+    assert first == runs[:3]
+    assert fake.calls == [
+        (
+            "/activitylist-service/activities/search/activities",
+            {"activityType": "running", "limit": "3", "start": "0"},
+        )
+    ]
@@ -0,0 +1,101 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from garth.auth_tokens import OAuth1Token, OAuth2Token
+
+from garminconnect import Garmin
+
+PROFILE = {"displayName": "runner", "fullName": "Test Runner"}
+SETTINGS = {"userData": {"measurementSystem": "metric"}}
+
+
+@pytest.fixture
+def tokenstore(tmp_path):
+    """Create a tokenstore directory holding dummy OAuth tokens"""
+    client = Garmin()
+    client.garth.oauth1_token = OAuth1Token(
+        oauth_token="token", oauth_token_secret="secret", domain="garmin.com"
+    )
+    client.garth.oauth2_token = OAuth2Token(
+        scope="",
+        jti="",
+        token_type="Bearer",
+        access_token="access",
+        refresh_token="refresh",
+        expires_in=3600,
+        expires_at=int(time.time()) + 3600,
+        refresh_token_expires_in=7200,
+        refresh_token_expires_at=int(time.time()) + 7200,
+    )
+    client.garth.dump(str(tmp_path))
+    return str(tmp_path)
+
+
+def fake_connectapi(calls):
+    """Fake connectapi answering the profile and settings calls"""
+
+    def connectapi(path, **kwargs):
+        calls.append(path)
+        if path.endswith("socialProfile"):
+            return dict(PROFILE)
+        return SETTINGS
+
+    return connectapi
+
+
+def login(tokenstore, **kwargs):
+    """Log in from the tokenstore and return the client and its calls"""
+    calls = []
+    garmin = Garmin()
+    fake = fake_connectapi(calls)
+    with patch.object(garmin.garth, "connectapi", side_effect=fake):
+        with patch.object(garmin, "connectapi", side_effect=fake):
+            garmin.login(tokenstore, **kwargs)
+    return garmin, calls
+
+
+def test_second_login_makes_no_requests(tokenstore):
+    """Test that a saved profile lets login skip the network"""
+    _, first_calls = login(tokenstore)
+    garmin, calls = login(tokenstore)
+
+    assert len(first_calls) == 2
+    assert calls == []
+    assert garmin.display_name == "runner"
+    assert garmin.get_full_name() == "Test Runner"
+    assert garmin.get_unit_system() == "metric"
+    assert garmin.garth.profile == PROFILE
+
+
+def test_refresh_profile_forces_requests(tokenstore):
+    """Test that refresh_profile ignores the saved profile"""
+    login(tokenstore)
+    _, calls = login(tokenstore, refresh_profile=True)
+
+    assert len(calls) == 2
+
+
+def test_stale_or_foreign_profile_is_refetched(tokenstore):
+    """Test that an old profile or one for other tokens is not reused"""
+    login(tokenstore)
+    path = f"{tokenstore}/{Garmin.PROFILE_FILE}"
+    with open(path) as f:
+        saved = json.load(f)
+
+    saved["saved_at"] = (
+        datetime.now(timezone.utc) - Garmin.PROFILE_MAX_AGE - timedelta(1)
+    ).isoformat()
+    with open(path, "w") as f:
+        json.dump(saved, f)
+    _, calls = login(tokenstore)
+    assert len(calls) == 2
+
+    saved["saved_at"] = datetime.now(timezone.utc).isoformat()
+    saved["token"] = "someone-else"
+    with open(path, "w") as f:
+        json.dump(saved, f)
+    _, calls = login(tokenstore)
+    assert len(calls) == 2
@@ -0,0 +1,184 @@
+import re
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect.ranges import merge_chunks, split_range
+
+
+def test_split_range():
+    """Test plain, week-aligned and month-aligned chunking"""
+    assert split_range("2024-01-01", "2024-01-20", 28) == [
+        (date(2024, 1, 1), date(2024, 1, 20))
+    ]
+    assert split_range("2024-01-01", "2024-03-10", 28) == [
+        (date(2024, 1, 1), date(2024, 1, 28)),
+        (date(2024, 1, 29), date(2024, 2, 25)),
+        (date(2024, 2, 26), date(2024, 3, 10)),
+    ]
+    weeks = split_range("2024-01-01", "2024-03-10", 30, align="week")
+    assert [(last - first).days + 1 for first, last in weeks] == [28, 28, 14]
+    months = split_range("2023-01-15", "2024-03-10", 365, align="month")
+    assert months == [
+        (date(2023, 1, 15), date(2023, 12, 31)),
+        (date(2024, 1, 1), date(2024, 3, 10)),
+    ]
+
+
+def test_merge_chunks_combines_summaries():
+    """Test merging dict responses with lists, maps and summaries"""
+    spans = split_range("2024-01-01", "2024-01-30", 10)
+    chunks = [
+        {
+            "startDate": f"2024-01-{first.day:02}",
+            "endDate": f"2024-01-{last.day:02}",
+            "userProfilePK": 7,
+            "dateWeightList": [{"weight": weight}],
+            "groupMap": {f"2024-01-{first.day:02}": {"score": weight}},
+            "totalAverage": {"weight": weight, "maxWeight": weight},
+        }
+        for (first, last), weight in zip(spans, (70, 71, 75))
+    ]
+
+    merged = merge_chunks(chunks)
+
+    assert merged["startDate"] == "2024-01-01"
+    assert merged["endDate"] == "2024-01-30"
+    assert merged["userProfilePK"] == 7
+    assert [w["weight"] for w in merged["dateWeightList"]] == [70, 71, 75]
+    assert list(merged["groupMap"]) == [
+        "2024-01-01",
+        "2024-01-11",
+        "2024-01-21",
+    ]
+    assert merged["totalAverage"] == {"weight": 72, "maxWeight": 75}
+
+
+def test_long_step_range_is_chunked_and_ordered(garmin):
+    """Test that a 90 day steps range uses several ordered requests"""
+
+    def connectapi(url, **kwargs):
+        first, last = re.findall(r"\d{4}-\d{2}-\d{2}", url)
+        return [{"calendarDate": first}, {"calendarDate": last}]
+
+    with patch.object(garmin, "connectapi", side_effect=connectapi) as mock:
+        steps = garmin.get_daily_steps("2024-01-01", "2024-03-30")
+
+    assert mock.call_count == 4
+    dates = [day["calendarDate"] for day in steps]
+    assert dates == sorted(dates)
+    assert dates[0] == "2024-01-01" and dates[-1] == "2024-03-30"
+
+
+def test_short_range_is_a_single_request(garmin):
+    """Test that a range within the limit is passed through unchanged"""
+    with patch.object(garmin, "connectapi", return_value=[]) as mock:
+        garmin.get_race_predictions("2024-01-01", "2024-06-30", "monthly")
+
+    mock.assert_called_once_with(
+        "/metrics-service/metrics/racepredictions/monthly/runner",
+        params={
+            "fromCalendarDate": "2024-01-01",
+            "toCalendarDate": "2024-06-30",
+        },
+    )
+
+
+def weigh_ins(first, last, sample, weight, entries=1):
+    """Build a get_weigh_ins response for one chunk"""
+    return {
+        "dailyWeightSummaries": [
+            {
+                "summaryDate": first,
+                "numOfWeightEntries": entries,
+                "minWeight": weight,
+                "maxWeight": weight,
+                "latestWeight": {"samplePk": sample, "weight": weight},
+            }
+        ],
+        "totalAverage": {
+            "from": sample,
+            "until": sample + 1,
+            "weight": weight,
+            "bmi": weight / 3000,
+            "bodyFat": None,
+        },
+        "previousDateWeight": {
+            "samplePk": sample - 1,
+            "date": sample * 10,
+            "calendarDate": first,
+            "timestampGMT": sample * 10,
+            "weight": weight - 100,
+        },
+        "nextDateWeight": {
+            "samplePk": sample + 1,
+            "date": sample * 10 + 1,
+            "calendarDate": last,
+            "timestampGMT": sample * 10 + 1,
+            "weight": weight + 100,
+        },
+    }
+
+
+def test_merge_weigh_ins_keeps_ids_and_bounds():
+    """Test that IDs, dates and bounds are never averaged"""
+    first = weigh_ins("2023-01-01", "2023-12-31", 1_000, 70_000.0)
+    last = weigh_ins("2024-01-01", "2024-12-30", 2_000, 72_000.0, 3)
+
+    merged = merge_chunks([first, last])
+
+    assert merged["previousDateWeight"] == first["previousDateWeight"]
+    assert merged["nextDateWeight"] == last["nextDateWeight"]
+    assert merged["totalAverage"]["from"] == 1_000
+    assert merged["totalAverage"]["until"] == 2_001
+    assert merged["totalAverage"]["weight"] == pytest.approx(71_500)
+    assert merged["totalAverage"]["bodyFat"] is None
+    assert [
+        day["latestWeight"]["samplePk"]
+        for day in merged["dailyWeightSummaries"]
+    ] == [1_000, 2_000]
+
+
+def test_merge_blood_pressure_summaries():
+    """Test that high, low, counts and averages combine by name"""
+    chunks = [
+        {
+            "from": first,
+            "until": last,
+            "measurementSummaries": [{"startDate": first, "measurements": []}],
+            "categoryStats": {
+                "category": category,
+                "lowSystolic": low,
+                "highSystolic": high,
+                "averageSystolic": average,
+                "numOfMeasurements": count,
+            },
+        }
+        for first, last, category, low, high, average, count in (
+            ("2023-01-01", "2023-12-31", "NORMAL", 110, 125, 118.0, 10),
+            ("2024-01-01", "2024-12-30", "ELEVATED", 115, 135, 124.0, 30),
+        )
+    ]
+
+    merged = merge_chunks(chunks)
+
+    assert merged["from"] == "2023-01-01"
+    assert merged["until"] == "2024-12-30"
+    assert len(merged["measurementSummaries"]) == 2
+    stats = merged["categoryStats"]
+    assert stats["category"] is None
+    assert stats["lowSystolic"] == 110
+    assert stats["highSystolic"] == 135
+    assert stats["numOfMeasurements"] == 40
+    assert stats["averageSystolic"] == pytest.approx(122.5)
+
+
+def test_average_without_sample_counts_is_unknown():
+    """Test that averages are not guessed without a count per chunk"""
+    chunks = [
+        {"from": "2024-01-01", "averageSystolic": 118.0},
+        {"from": "2024-02-01", "averageSystolic": 124.0},
+    ]
+
+    assert merge_chunks(chunks)["averageSystolic"] is None
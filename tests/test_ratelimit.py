@@ -0,0 +1,126 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from garminconnect import (
+    Garmin,
+    GarminConnectTooManyRequestsError,
+    RateLimiter,
+    RetryPolicy,
+)
+
+
+@pytest.fixture
+def garmin():
+    """Create a Garmin client whose retries do not sleep"""
+    client = Garmin(retry_policy=RetryPolicy(max_retries=2, backoff=0))
+    with patch("garminconnect.time.sleep") as sleep:
+        client.sleep = sleep
+        yield client
+
+
+def test_429_is_retried_honouring_retry_after(
+    garmin, make_response, http_error
+):
+    """Test that a throttled GET waits for Retry-After and succeeds"""
+    replies = [http_error(429, {"Retry-After": "7"}), make_response([1])]
+    with patch.object(garmin.garth, "request", side_effect=replies) as call:
+        assert garmin.get_devices() == [1]
+
+    assert call.call_count == 2
+    garmin.sleep.assert_called_once_with(7.0)
+
+
+def test_exhausted_429_raises_too_many_requests(garmin, http_error):
+    """Test that GarminConnectTooManyRequestsError is raised after retries"""
+    with patch.object(
+        garmin.garth, "request", side_effect=http_error(429)
+    ) as call:
+        with pytest.raises(GarminConnectTooManyRequestsError):
+            garmin.get_devices()
+
+    assert call.call_count == 3
+
+
+def test_long_retry_after_is_not_waited_for(garmin, http_error):
+    """Test that a Retry-After past max_backoff raises instead of sleeping"""
+    error = http_error(429, {"Retry-After": "3600"})
+    with patch.object(garmin.garth, "request", side_effect=error) as call:
+        with pytest.raises(GarminConnectTooManyRequestsError):
+            garmin.get_devices()
+
+    call.assert_called_once()
+    garmin.sleep.assert_not_called()
+
+
+def test_long_retry_after_pauses_the_limiter_briefly(garmin, http_error):
+    """Test that a long Retry-After pauses the limiter for max_backoff"""
+    garmin.rate_limiter = limiter = RateLimiter(rate=50)
+    error = http_error(429, {"Retry-After": "3600"})
+    with patch.object(garmin.garth, "request", side_effect=error):
+        with pytest.raises(GarminConnectTooManyRequestsError):
+            garmin.get_devices()
+
+    paused = limiter._paused_until - time.monotonic()
+    assert 0 < paused <= garmin.retry_policy.max_backoff
+
+
+def test_transport_does_not_retry():
+    """Test that urllib3 leaves retries to the retry policy"""
+    adapter = Garmin().garth.sess.get_adapter("https://connectapi.garmin.com")
+
+    assert adapter.max_retries.total == 0
+
+
+def test_post_is_not_retried_on_server_error(garmin, http_error):
+    """Test that non-idempotent requests only retry on 429"""
+    error = http_error(503)
+    with patch.object(garmin.garth, "request", side_effect=error) as call:
+        with pytest.raises(type(error)):
+            garmin.request_reload("2024-01-01")
+
+    call.assert_called_once()
+
+
+def test_connection_errors_are_retried_for_gets(garmin, make_response):
+    """Test that dropped connections are retried for idempotent requests"""
+    replies = [requests.ConnectionError("reset"), make_response({"a": 1})]
+    with patch.object(garmin.garth, "request", side_effect=replies):
+        assert garmin.get_hrv_data("2024-01-01") == {"a": 1}
+
+
+def test_client_errors_are_not_retried(garmin, http_error):
+    """Test that 4xx errors other than 429 fail immediately"""
+    with patch.object(
+        garmin.garth, "request", side_effect=http_error(404)
+    ) as call:
+        with pytest.raises(Exception):
+            garmin.get_devices()
+
+    call.assert_called_once()
+
+
+def test_rate_limiter_adapts_to_throttling():
+    """Test that the limiter halves its rate on 429 and recovers slowly"""
+    limiter = RateLimiter(rate=8, burst=1, min_rate=1, increase=0.5)
+
+    limiter.on_throttle()
+    assert limiter.rate == 4
+    limiter.on_success()
+    assert limiter.rate == 4.5
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == limiter.max_rate == 32
+
+
+def test_rate_limiter_paces_requests():
+    """Test that requests beyond the burst are spread over time"""
+    limiter = RateLimiter(rate=50, burst=1, adaptive=False)
+
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 0.09
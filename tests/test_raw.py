@@ -0,0 +1,22 @@
+from unittest.mock import patch
+
+from garminconnect import Garmin, ResponseCache
+
+
+def test_raw_returns_undecoded_bytes(make_response):
+    """Test that raw=True skips decoding and the cache"""
+    garmin = Garmin(cache=ResponseCache(":memory:"))
+    body = b'{"hrvSummary": {"lastNightAvg": 50}}'
+
+    with patch.object(
+        garmin.garth, "request", return_value=make_response(content=body)
+    ) as request:
+        assert (
+            garmin.connectapi("/hrv-service/hrv/2020-01-01", raw=True) == body
+        )
+        assert garmin.connectapi("/hrv-service/hrv/2020-01-01") == {
+            "hrvSummary": {"lastNightAvg": 50}
+        }
+        garmin.connectapi("/hrv-service/hrv/2020-01-01")
+
+    assert request.call_count == 2
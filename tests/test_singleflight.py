@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+
+def slow(result, delay=0.05):
+    """Fake transport that counts calls and answers after a delay"""
+    calls = []
+
+    def request(*args, **kwargs):
+        calls.append(args)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    request.calls = calls
+    return request
+
+
+def test_concurrent_identical_calls_share_one_request(garmin):
+    """Test that identical in-flight calls are coalesced"""
+    fake = slow({"activityId": 1})
+
+    with patch.object(garmin, "_connectapi", side_effect=fake):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(lambda _: garmin.get_activity(1), range(8))
+            )
+
+    assert len(fake.calls) == 1
+    assert all(result == {"activityId": 1} for result in results)
+    assert garmin._inflight == {}
+
+
+def test_different_params_are_not_coalesced(garmin):
+    """Test that calls for different dates each reach the server"""
+    fake = slow({})
+
+    with patch.object(garmin, "_connectapi", side_effect=fake):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(garmin.get_sleep_data, ["2024-01-01", "2024-01-02"]))
+
+    assert len(fake.calls) == 2
+
+
+def test_waiting_callers_receive_the_error(garmin):
+    """Test that a failure is raised in every coalesced caller"""
+    fake = slow(ConnectionError("down"))
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def call():
+        barrier.wait()
+        try:
+            garmin.get_activity(1)
+        except ConnectionError as err:
+            errors.append(err)
+
+    with patch.object(garmin, "_connectapi", side_effect=fake):
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(errors) == 4
+    assert len(fake.calls) == 1
+    assert garmin._inflight == {}
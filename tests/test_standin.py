@@ -0,0 +1,131 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from garth.auth_tokens import OAuth2Token
+from garth.exc import GarthHTTPError
+
+from garminconnect import (
+    Garmin,
+    GarminConnectTooManyRequestsError,
+    RetryPolicy,
+)
+from garminconnect.standin import StandIn, synthetic_fit
+
+
+@pytest.fixture
+def api():
+    """Run a stand-in server for the duration of a test"""
+    with StandIn(activities=45) as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def garmin(api):
+    """Create a Garmin client attached to the stand-in, retrying instantly"""
+    return api.attach(Garmin(retry_policy=RetryPolicy(backoff=0)))
+
+
+def test_activity_search_is_paginated(api, garmin):
+    """Test that a date range is served over several pages"""
+    activities = garmin.get_activities_by_date("2024-01-01", "2024-12-31")
+
+    assert len(activities) == 45
+    assert activities[0]["activityId"] == 10_000_000
+    assert api.hits["/activitylist-service/activities/search/activities"] == 4
+
+
+def test_fit_download_extracts(api, garmin, tmp_path):
+    """Test downloading a synthetic FIT zip and extracting the FIT file"""
+    path = tmp_path / "run.fit"
+    written = garmin.download_activity_to(10_000_003, path)
+
+    data = path.read_bytes()
+    assert written == len(data)
+    assert data == synthetic_fit(10_000_003, api.fit_size)
+    assert data[8:12] == b".FIT"
+
+
+def test_wellness_dailies_are_stable(garmin):
+    """Test that the same day always yields the same synthetic data"""
+    first = garmin.get_user_summary("2024-03-01")
+
+    assert garmin.get_user_summary("2024-03-01") == first
+    assert garmin.get_sleep_data("2024-03-01")["dailySleepDTO"]
+    assert len(garmin.get_heart_rates("2024-03-01")["heartRateValues"]) == 720
+
+
+def test_throttling_is_retried_then_raised(api, garmin):
+    """Test injected 429s against the client's retry policy"""
+    api.throttle_next(2)
+    assert garmin.get_hrv_data("2024-02-02")["hrvSummary"]
+    assert api.throttled == 2
+
+    api.throttle_next(garmin.retry_policy.max_retries + 1)
+    with pytest.raises(GarminConnectTooManyRequestsError):
+        garmin.get_hrv_data("2024-02-03")
+
+
+def test_error_rate_and_unknown_paths(api, garmin):
+    """Test injected server errors and unserved endpoints"""
+    api.error_rate = 1.0
+    with pytest.raises(GarthHTTPError):
+        garmin.get_stress_data("2024-02-02")
+
+    api.error_rate = 0.0
+    with pytest.raises(GarthHTTPError):
+        garmin.get_devices()
+
+
+def test_concurrent_requests_get_their_own_response(garmin):
+    """Test that each thread gets its own response from the shared client"""
+    session = garmin.garth.sess
+    real = session.request
+    barrier = threading.Barrier(2)
+
+    def request(*args, **kwargs):
+        response = real(*args, **kwargs)
+        check = response.raise_for_status
+
+        def raise_for_status():
+            # Hold the response until a second request has come back too
+            barrier.wait(timeout=5)
+            check()
+
+        response.raise_for_status = raise_for_status
+        return response
+
+    with patch.object(session, "request", side_effect=request):
+        results, failures = garmin.fetch_range(
+            "get_hrv_data", "2024-02-01", "2024-02-08", workers=4
+        )
+
+    assert failures == {}
+    assert {
+        day: result["hrvSummary"]["calendarDate"]
+        for day, result in results.items()
+    } == {day: day for day in results}
+
+
+def test_expired_token_is_refreshed_once(garmin):
+    """Test that concurrent requests share one OAuth2 token refresh"""
+    fresh = garmin.garth.oauth2_token
+    garmin.garth.oauth2_token = OAuth2Token(
+        **{**vars(fresh), "expires_at": 0, "refresh_token_expires_at": 0}
+    )
+    refreshes = []
+
+    def exchange(oauth1, client):
+        refreshes.append(oauth1)
+        time.sleep(0.05)
+        return fresh
+
+    with patch("garth.sso.exchange", side_effect=exchange):
+        results, failures = garmin.fetch_range(
+            "get_hrv_data", "2024-02-01", "2024-02-08", workers=4
+        )
+
+    assert failures == {}
+    assert len(results) == 8
+    assert len(refreshes) == 1
@@ -0,0 +1,139 @@
+import io
+import os
+import zipfile
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from garminconnect import (
+    Garmin,
+    GarminConnectConnectionError,
+    GarminConnectInvalidFileFormatError,
+)
+from garminconnect.stream import extract_member
+
+FIT_DATA = os.urandom(50_000) + b".FIT" * 20_000
+
+
+def make_zip(streamed=False, members=(("notes.txt", b"hi"),)):
+    """Build an activity zip, optionally with trailing data descriptors"""
+    buffer = io.BytesIO()
+    target = buffer
+    if streamed:
+        # Writing to a non-seekable file makes zipfile use data descriptors
+        target = type(
+            "Unseekable",
+            (),
+            {"write": buffer.write, "flush": buffer.flush},
+        )()
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+        archive.writestr("12345_ACTIVITY.fit", FIT_DATA)
+    return buffer.getvalue()
+
+
+def chunked(data, size=997):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_extract_member_from_chunks(streamed):
+    """Test extracting the FIT member from a chunked zip stream"""
+    out = io.BytesIO()
+
+    name, written = extract_member(chunked(make_zip(streamed)), out)
+
+    assert name == "12345_ACTIVITY.fit"
+    assert written == len(FIT_DATA)
+    assert out.getvalue() == FIT_DATA
+
+
+def test_truncated_stream_is_rejected():
+    """Test that a cut-off download fails verification"""
+    data = make_zip()
+
+    with pytest.raises(zipfile.BadZipFile):
+        extract_member(chunked(data[: len(data) // 2]), io.BytesIO())
+
+
+def test_download_activity_to_path(tmp_path, make_response):
+    """Test streaming an ORIGINAL download straight to a FIT file"""
+    garmin = Garmin()
+    target = tmp_path / "activity.fit"
+    response = make_response(content=make_zip())
+
+    with patch.object(garmin.garth, "request", return_value=response) as call:
+        written = garmin.download_activity_to(12345, str(target))
+
+    assert call.call_args.kwargs["stream"] is True
+    assert written == len(FIT_DATA)
+    assert target.read_bytes() == FIT_DATA
+    assert os.listdir(tmp_path) == ["activity.fit"]
+
+
+def test_download_activity_to_keeps_nothing_on_failure(
+    tmp_path, make_response
+):
+    """Test that a failed download leaves no partial file behind"""
+    garmin = Garmin()
+    target = tmp_path / "activity.fit"
+    bad = make_zip(members=())[:-4000]
+
+    with patch.object(
+        garmin.garth, "request", return_value=make_response(content=bad)
+    ):
+        with pytest.raises(GarminConnectConnectionError):
+            garmin.download_activity_to(12345, str(target))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_activity_to_without_fit_member(make_response):
+    """Test that a zip without a FIT file is reported as a format error"""
+    garmin = Garmin()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("activity.gpx", b"<gpx/>")
+
+    with patch.object(
+        garmin.garth,
+        "request",
+        return_value=make_response(content=archive.getvalue()),
+    ):
+        with pytest.raises(GarminConnectInvalidFileFormatError):
+            garmin.download_activity_to(1, io.BytesIO())
+
+
+def test_download_activity_to_checks_content_length(make_response):
+    """Test that non-zip downloads are checked against Content-Length"""
+    garmin = Garmin()
+    response = make_response(
+        content=b"<gpx/>", headers={"Content-Length": "100"}
+    )
+
+    with patch.object(garmin.garth, "request", return_value=response):
+        with pytest.raises(GarminConnectConnectionError):
+            garmin.download_activity_to(
+                1, io.BytesIO(), Garmin.ActivityDownloadFormat.GPX
+            )
+
+
+def test_broken_stream_is_a_connection_error(tmp_path, make_response):
+    """Test that a connection dropped mid-body raises a connection error"""
+    garmin = Garmin()
+    target = tmp_path / "activity.fit"
+    response = make_response(content=make_zip())
+
+    def broken(chunk_size):
+        yield response.content[:chunk_size]
+        raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+    response.iter_content = broken
+    with patch.object(garmin.garth, "request", return_value=response):
+        with pytest.raises(GarminConnectConnectionError) as raised:
+            garmin.download_activity_to(12345, str(target), chunk_size=1024)
+
+    assert isinstance(raised.value.__cause__, requests.RequestException)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,102 @@
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import Garmin, RetryPolicy
+from garminconnect.standin import StandIn, synthetic_fit
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sync_workouts import Manifest, sync_activities  # noqa: E402
+
+SEARCH = "/activitylist-service/activities/search/activities"
+
+
+@pytest.fixture
+def api():
+    """Run a stand-in server with 30 activities"""
+    with StandIn(activities=30, fit_size=1024) as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def garmin(api):
+    """Create a Garmin client attached to the stand-in, retrying instantly"""
+    return api.attach(Garmin(retry_policy=RetryPolicy(backoff=0)))
+
+
+def test_first_sync_downloads_everything(api, garmin, tmp_path):
+    """Test that an empty manifest lists and downloads every activity"""
+    result = sync_activities(garmin, output_dir=tmp_path)
+
+    assert result == {"new": 30, "downloaded": 30, "failed": 0}
+    newest = api.activities[0]
+    path = tmp_path / f"{newest['activityType']['typeKey']}_10000000.fit"
+    assert path.read_bytes() == synthetic_fit(10_000_000, 1024)
+
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    assert manifest.counts() == {"synced": 30}
+    assert manifest.high_water_mark() == newest["startTimeLocal"]
+    manifest.close()
+
+
+def test_daily_sync_is_one_list_call(api, garmin, tmp_path):
+    """Test that a later sync only lists one page and downloads new ones"""
+    sync_activities(garmin, output_dir=tmp_path)
+    api.hits.clear()
+    api.activities[:0] = [
+        api._activity(100 + n, date(2025, 1, 2 - n)) for n in range(2)
+    ]
+
+    result = sync_activities(garmin, output_dir=tmp_path)
+
+    assert result == {"new": 2, "downloaded": 2, "failed": 0}
+    assert api.hits[SEARCH] == 1
+    assert sum(api.hits.values()) == 3
+
+
+def test_failed_downloads_are_retried(api, garmin, tmp_path):
+    """Test that failures are recorded and retried on the next run"""
+    real = garmin.download_activity_to
+
+    def flaky(activity_id, destination):
+        if activity_id == 10_000_005:
+            raise OSError("disk full")
+        return real(activity_id, destination)
+
+    with patch.object(garmin, "download_activity_to", side_effect=flaky):
+        result = sync_activities(garmin, output_dir=tmp_path)
+    assert result == {"new": 30, "downloaded": 29, "failed": 1}
+
+    result = sync_activities(garmin, output_dir=tmp_path)
+    assert result == {"new": 0, "downloaded": 1, "failed": 0}
+
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    assert manifest.counts() == {"synced": 30}
+    manifest.close()
+
+
+def test_interrupted_listing_is_listed_again(api, garmin, tmp_path):
+    """Test that a listing failing on page 2 does not move the mark"""
+    real = garmin.iter_activities
+
+    def failing(**kwargs):
+        for n, activity in enumerate(real(**kwargs)):
+            if n == 20:
+                raise ConnectionError("connection reset")
+            yield activity
+
+    with patch.object(garmin, "iter_activities", side_effect=failing):
+        with pytest.raises(ConnectionError):
+            sync_activities(garmin, output_dir=tmp_path)
+
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    assert manifest.counts() == {}
+    assert manifest.high_water_mark() is None
+    manifest.close()
+
+    result = sync_activities(garmin, output_dir=tmp_path)
+    assert result == {"new": 30, "downloaded": 30, "failed": 0}
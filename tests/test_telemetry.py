@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import Garmin, RetryPolicy
+from garminconnect.telemetry import RequestMetrics, endpoint_template
+
+
+@pytest.fixture
+def garmin():
+    """Create a Garmin client whose retries do not sleep"""
+    client = Garmin(retry_policy=RetryPolicy(max_retries=1, backoff=0))
+    client.display_name = "runner"
+    return client
+
+
+@pytest.mark.parametrize(
+    "path, template",
+    [
+        ("/hrv-service/hrv/2024-01-01", "/hrv-service/hrv/{date}"),
+        (
+            "/activity-service/activity/123/splits",
+            "/activity-service/activity/{id}/splits",
+        ),
+        (
+            "/wellness-service/wellness/dailySleepData/runner",
+            "/wellness-service/wellness/dailySleepData/{displayName}",
+        ),
+        (
+            "/gear-service/gear/stats/0f1e2d3c4b5a69788796a5b4c3d2e1f0",
+            "/gear-service/gear/stats/{uuid}",
+        ),
+        ("graphql-gateway/graphql", "/graphql-gateway/graphql"),
+    ],
+)
+def test_endpoint_template(path, template):
+    """Test that ids, dates and the display name are templated"""
+    assert endpoint_template(path, "runner") == template
+
+
+def test_metrics_cover_requests_retries_and_bytes(
+    garmin, make_response, http_error
+):
+    """Test per-endpoint counters for a retried and a plain request"""
+    replies = [
+        http_error(503),
+        make_response({"hrv": 1}),
+        make_response(content=b"fit-bytes"),
+    ]
+    with patch.object(garmin.garth, "request", side_effect=replies):
+        with patch("garminconnect.time.sleep"):
+            garmin.get_hrv_data("2024-01-01")
+            garmin.download_activity(1)
+
+    metrics = garmin.metrics()
+    hrv = metrics["GET /hrv-service/hrv/{date}"]
+    assert hrv["requests"] == 2
+    assert hrv["retries"] == 1
+    assert hrv["status"] == {"200": 1, "503": 1}
+    assert hrv["bytes"] == len(b'{"hrv": 1}')
+    assert sum(hrv["latency_buckets"].values()) == 2
+    download = metrics["GET /download-service/export/tcx/activity/{id}"]
+    assert download["bytes"] == len(b"fit-bytes")
+
+
+def test_prometheus_dump(tmp_path):
+    """Test the Prometheus text format written to a file"""
+    metrics = RequestMetrics()
+    metrics.record("GET", "/hrv-service/hrv/{date}", 0.2, 200, 10)
+    metrics.record("GET", "/hrv-service/hrv/{date}", 3.0, 429, retried=True)
+    path = tmp_path / "garmin.prom"
+
+    metrics.write_prometheus(str(path))
+
+    text = path.read_text()
+    labels = 'method="GET",endpoint="/hrv-service/hrv/{date}"'
+    assert f'garminconnect_requests_total{{{labels},status="429"}} 1' in text
+    assert f"garminconnect_retries_total{{{labels}}} 1" in text
+    assert (
+        f'garminconnect_request_duration_seconds_bucket{{{labels},le="0.25"}} 1'
+        in text
+    )
+    assert (
+        f'garminconnect_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2'
+        in text
+    )
+    assert (
+        f"garminconnect_request_duration_seconds_count{{{labels}}} 2" in text
+    )
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+import pytest
+
+from garminconnect import Garmin, RetryPolicy
+from garminconnect.upload import UploadLedger, file_sha256
+
+
+@pytest.fixture
+def garmin():
+    """Create a Garmin client whose retries do not sleep"""
+    return Garmin(retry_policy=RetryPolicy(max_retries=1, backoff=0))
+
+
+@pytest.fixture
+def backlog(tmp_path):
+    """Create a directory of activity files, including a copy and a note"""
+    (tmp_path / "2024").mkdir()
+    (tmp_path / "a.fit").write_bytes(b"fit-a")
+    (tmp_path / "b.gpx").write_bytes(b"<gpx/>")
+    (tmp_path / "2024" / "c.tcx").write_bytes(b"<tcx/>")
+    (tmp_path / "2024" / "copy-of-a.fit").write_bytes(b"fit-a")
+    (tmp_path / "notes.txt").write_text("not an activity")
+    return tmp_path
+
+
+def test_upload_activity_closes_the_file(garmin, tmp_path, make_response):
+    """Test that the uploaded file handle is closed afterwards"""
+    path = tmp_path / "run.fit"
+    path.write_bytes(b"fit")
+    sent = []
+
+    def request(method, subdomain, url, **kwargs):
+        sent.append(kwargs["files"]["file"][1])
+        return make_response({})
+
+    with patch.object(garmin.garth, "request", side_effect=request):
+        garmin.upload_activity(str(path))
+
+    assert sent[0].closed
+
+
+def test_upload_activities_dedupes_and_reports(
+    garmin, backlog, tmp_path, make_response, http_error
+):
+    """Test a directory upload with a 409, a batch copy and a ledger"""
+    ledger = UploadLedger(str(tmp_path / "uploads.sqlite"))
+    uploaded = []
+
+    def request(method, subdomain, url, **kwargs):
+        name = kwargs["files"]["file"][0]
+        uploaded.append(name)
+        if name == "b.gpx":
+            raise http_error(409)
+        return make_response({"detailedImportResult": {}})
+
+    with patch.object(garmin.garth, "request", side_effect=request):
+        report = garmin.upload_activities([backlog], workers=1, ledger=ledger)
+
+    statuses = {
+        r["path"].rsplit("/", 1)[-1]: r["status"] for r in report["results"]
+    }
+    assert statuses == {
+        "a.fit": "uploaded",
+        "b.gpx": "duplicate",
+        "c.tcx": "uploaded",
+        "copy-of-a.fit": "skipped",
+    }
+    assert sorted(uploaded) == ["a.fit", "b.gpx", "c.tcx"]
+    assert report["uploaded"] == 2
+    assert report["duplicate"] == 1
+    assert report["skipped"] == 1
+    assert report["files_per_second"] > 0
+    assert len(ledger) == 3
+    assert file_sha256(str(backlog / "a.fit")) in ledger
+
+    with patch.object(garmin.garth, "request", side_effect=request) as mock:
+        report = garmin.upload_activities([backlog], ledger=ledger)
+
+    assert mock.call_count == 0
+    assert report["skipped"] == 4
+
+
+def test_upload_failures_are_reported_per_file(garmin, tmp_path, http_error):
+    """Test that a failed upload does not abort the batch"""
+    good = tmp_path / "good.fit"
+    good.write_bytes(b"fit")
+
+    with patch.object(garmin.garth, "request", side_effect=http_error(400)):
+        report = garmin.upload_activities(
+            [good, tmp_path / "missing.fit", tmp_path / "bad.xyz"]
+        )
+
+    assert report["failed"] == 3
+    assert all(r["error"] is not None for r in report["results"])
+
+
+def test_copy_is_retried_when_the_first_upload_fails(
+    garmin, tmp_path, make_response, http_error
+):
+    """Test that a copy is uploaded, not skipped, after its original fails"""
+    for name in ("a.fit", "copy-of-a.fit", "again-a.fit"):
+        (tmp_path / name).write_bytes(b"fit-a")
+    responses = iter([http_error(500)])
+
+    def request(method, subdomain, url, **kwargs):
+        error = next(responses, None)
+        if error is not None:
+            raise error
+        return make_response({"detailedImportResult": {}})
+
+    with patch.object(garmin.garth, "request", side_effect=request) as mock:
+        report = garmin.upload_activities([tmp_path], workers=3)
+
+    assert mock.call_count == 2
+    assert report["failed"] == 1
+    assert report["uploaded"] == 1
+    assert report["skipped"] == 1